@@ -0,0 +1,113 @@
+""" Asyncio Event Loop
+This module contains the asyncio run mode of the game. In this mode the event
+loop of the renderer backend runs as a coroutine of an asyncio event loop,
+which polls the window events and ticks the clock at the display rate, so that
+network and disk work can run in coroutines between two frames instead of in
+threads of their own. Coroutines are started with spawn(), or scheduled on the
+clock of pyglet next to its callbacks with schedule_once() and
+schedule_interval(), which start a coroutine each time the clock calls them.
+The tasks of these coroutines are kept until they finish, and the exception
+that ends one is reported by the exception handler of the asyncio event loop.
+This module requires the 'render' module, as well as 'pyglet' to be installed.
+
+This module can be imported and contains the following functions:
+	* run - runs the game from a new asyncio event loop
+	* spawn - starts a coroutine in the running asyncio event loop
+	* schedule_once - starts a coroutine once, after a delay
+	* schedule_interval - starts a coroutine every interval
+"""
+
+import asyncio, pyglet.clock, render
+
+# THE EVENT LOOP ONLY KEEPS WEAK REFERENCES TO ITS TASKS, SO THE RUNNING TASKS ARE KEPT HERE
+_tasks = set()
+
+def run(frame_time=1 / 60):
+	""" Runs the event loop of the renderer backend from a new asyncio event
+	loop, until the game exits. The coroutines still running then are
+	cancelled.
+
+	Parameters
+	----------
+	frame_time : float, optional
+		time between two frames, in seconds
+	"""
+
+	asyncio.run(render.run_async(frame_time))
+
+def spawn(coroutine):
+	""" Starts a coroutine in the running asyncio event loop.
+
+	Parameters
+	----------
+	coroutine : obj
+		the coroutine to start
+
+	Returns
+	-------
+	obj
+		the asyncio task running the coroutine
+
+	Raises
+	------
+	RuntimeError
+		if the game is not running from an asyncio event loop
+	"""
+
+	task = asyncio.get_running_loop().create_task(coroutine)
+	_tasks.add(task)
+	task.add_done_callback(_task_done)
+	return task
+
+def _task_done(task):
+	_tasks.discard(task)
+	if not task.cancelled() and task.exception() is not None:
+		asyncio.get_running_loop().call_exception_handler({
+			"message": "Exception in a coroutine of the game",
+			"exception": task.exception(),
+			"task": task})
+
+def schedule_once(coroutine_function, delay, *args):
+	""" Starts a coroutine once, after a delay on the clock of pyglet.
+
+	Parameters
+	----------
+	coroutine_function : function
+		the coroutine function, called with the time since it was scheduled
+		and the other arguments, like the callbacks of pyglet.clock
+	delay : float
+		seconds to wait before starting the coroutine
+
+	Returns
+	-------
+	function
+		the callback scheduled on the clock, for pyglet.clock.unschedule()
+	"""
+
+	def start(dt):
+		spawn(coroutine_function(dt, *args))
+	pyglet.clock.schedule_once(start, delay)
+	return start
+
+def schedule_interval(coroutine_function, interval, *args):
+	""" Starts a coroutine every interval on the clock of pyglet. A coroutine
+	is started even if the one started before it has not finished yet.
+
+	Parameters
+	----------
+	coroutine_function : function
+		the coroutine function, called with the time since it was last started
+		and the other arguments, like the callbacks of pyglet.clock
+	interval : float
+		seconds between two starts of the coroutine
+
+	Returns
+	-------
+	function
+		the callback scheduled on the clock, for pyglet.clock.unschedule()
+	"""
+
+	def start(dt):
+		spawn(coroutine_function(dt, *args))
+	pyglet.clock.schedule_interval(start, interval)
+	return start
@@ -0,0 +1,116 @@
+""" Attract Mode
+This module contains the idle state of the game. Between two players the game
+sits on its title screen, and after some minutes there without any input it
+goes idle: the game releases what the title screen does not need, and the
+renderer backend slows its event loop down. The first key press, click or
+mouse motion wakes it up again, before the game itself handles that input, so
+the screen it shows is already whole. What is released must come back within a
+frame or two, so the game only releases what it can restore from memory or
+from the texture cache, and keeps the sound effects of the first click decoded.
+This module requires the 'render' module, as well as 'pyglet' to be installed.
+
+This module can be imported and contains the following:
+	* AttractMode - creates the idle timer of a window
+"""
+
+import pyglet.clock, render
+
+class AttractMode:
+	"""
+	A class used to put the game into its idle state after a time without
+	input, and to wake it up on the next input. The timer only wakes the clock
+	once per timeout, and never while the game is idle.
+
+	...
+
+	Attributes
+	----------
+	timeout : float
+		seconds without input before the game goes idle
+	can_idle : function
+		returns whether or not the game may go idle now
+	on_idle : function
+		releases the resources of the game when it goes idle
+	on_resume : function
+		restores the resources of the game when it wakes up
+	idle : bool
+		whether or not the game is idle
+	last_input : float
+		time of the last input, on the default clock of pyglet
+
+	Methods
+	-------
+	check(dt)
+		makes the game idle if the timeout has passed since the last input,
+		or else checks again once it will have
+	wake()
+		wakes the game up if it is idle
+	"""
+
+	__slots__ = ("timeout", "can_idle", "on_idle", "on_resume", "idle", "last_input", "_clock")
+
+	# EVENTS OF THE WINDOW THAT COUNT AS INPUT
+	input_events = ("on_key_press", "on_text", "on_mouse_motion", "on_mouse_press", "on_mouse_drag",
+		"on_mouse_scroll")
+
+	def __init__(self, window, timeout, can_idle, on_idle, on_resume):
+		""" Watches the input events of the window and starts the timer.
+
+		Parameters
+		----------
+		window : obj
+			the game window
+		timeout : float
+			seconds without input before the game goes idle
+		can_idle : function
+			returns whether or not the game may go idle now, checked when the
+			timeout has passed
+		on_idle : function
+			releases the resources of the game when it goes idle
+		on_resume : function
+			restores the resources of the game when it wakes up
+		"""
+
+		self.timeout = timeout
+		self.can_idle = can_idle
+		self.on_idle = on_idle
+		self.on_resume = on_resume
+		self.idle = False
+		self._clock = pyglet.clock.get_default()
+		self.last_input = self._clock.time()
+		# THE HANDLERS ARE PUSHED ABOVE THOSE OF THE GAME, AND LET EVERY EVENT THROUGH
+		window.push_handlers(**{event_type: self._on_input for event_type in self.input_events})
+		pyglet.clock.schedule_once(self.check, timeout)
+
+	def _on_input(self, *args):
+		self.last_input = self._clock.time()
+		self.wake()
+
+	def check(self, dt):
+		""" Makes the game idle if the timeout has passed since the last input
+		and the game may go idle, or else checks again when the timeout will
+		have passed.
+
+		Parameters
+		----------
+		dt : float
+			time since the check was scheduled
+		"""
+
+		remaining = self.last_input + self.timeout - self._clock.time()
+		if remaining > 0:
+			pyglet.clock.schedule_once(self.check, remaining)
+		elif not self.can_idle():
+			pyglet.clock.schedule_once(self.check, self.timeout)
+		else:
+			self.idle = True
+			self.on_idle()
+			render.set_idle(True)
+
+	def wake(self):
+		if not self.idle:
+			return
+		self.idle = False
+		render.set_idle(False)
+		self.on_resume()
+		pyglet.clock.schedule_once(self.check, self.timeout)
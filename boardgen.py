@@ -0,0 +1,197 @@
+""" Bulk Board Generator
+This script generates game boards in bulk for checking that boards are picked
+fairly and for tuning the difficulty from board statistics. It draws boards
+from the same distribution as tilesets.tileset_pick() for a difficulty, from
+the tile pairs of that difficulty in tilesets.difficulty_pairs when it has
+some, but a million at a time with NumPy, and writes them to a .npy file of
+4-byte records:
+
+	tileset - index of the tile set in tilesets.tileset_ids
+	common - tile ID of the common tile
+	odd - tile ID of the odd tile
+	position - position of the odd tile on the board
+
+It then prints how the tile sets, tile pairs and odd tile positions are spread,
+with a chi-square test of each against a uniform spread. This script requires
+the 'tilesets' module, as well as 'numpy' to be installed.
+
+This script contains the following functions:
+	* generate - generates a chunk of boards as an array of records
+	* chi_square - tests counts against a uniform spread
+	* report - prints the spread of the generated boards
+	* compare - times tilesets.tileset_pick() against generate()
+	* main - parses the command line and writes the boards
+
+Usage: python boardgen.py COUNT [--output FILE] [--seed SEED] [--difficulty MODE]
+	[--compare N]
+"""
+
+import argparse, math, sys, time, tilesets
+
+try:
+	import numpy
+except ImportError:
+	sys.exit("boardgen.py requires 'numpy' to be installed.")
+
+# ONE RECORD PER BOARD
+board_dtype = numpy.dtype([("tileset", "u1"), ("common", "u1"), ("odd", "u1"), ("position", "u1")])
+# TILE IDS OF EACH TILE SET, AS A TILE SET BY TILE TABLE
+tileset_table = numpy.array(tilesets.tileset_ids, dtype="u1")
+
+def generate(rng, count, difficulty=None):
+	""" Generates a chunk of boards.
+
+	Parameters
+	----------
+	rng : obj
+		the numpy.random.Generator to draw from
+	count : int
+		number of boards to generate
+	difficulty : str, optional
+		the difficulty of the game
+
+	Returns
+	-------
+	array
+		the boards as records of board_dtype
+	"""
+
+	sets, size = tileset_table.shape
+	boards = numpy.empty(count, dtype=board_dtype)
+	tileset = rng.integers(0, sets, count)
+	# THE ODD TILE IS ONE OF THE OTHER TILES OF THE SET, PICKED UNIFORMLY
+	common = rng.integers(0, size, count)
+	odd = (common + rng.integers(1, size, count)) % size
+	boards["tileset"] = tileset
+	boards["common"] = tileset_table[tileset, common]
+	boards["odd"] = tileset_table[tileset, odd]
+	pairs = tilesets.difficulty_pairs.get(difficulty)
+	if pairs:
+		# ON A SET WITH PAIRS OF THE DIFFICULTY, ONE OF THOSE PAIRS IS PICKED UNIFORMLY INSTEAD
+		pair_counts = numpy.array([len(tileset_pairs) for tileset_pairs in pairs], dtype="i8")
+		offsets = numpy.cumsum(pair_counts) - pair_counts
+		pair_table = numpy.array([pair for tileset_pairs in pairs for pair in tileset_pairs], dtype="u1")
+		picked = offsets[tileset] + (rng.random(count) * pair_counts[tileset]).astype("i8")
+		picked = pair_table[numpy.minimum(picked, len(pair_table) - 1)]
+		has_pairs = pair_counts[tileset] > 0
+		boards["common"] = numpy.where(has_pairs, picked[:, 0], boards["common"])
+		boards["odd"] = numpy.where(has_pairs, picked[:, 1], boards["odd"])
+	boards["position"] = rng.integers(0, tilesets.BOARD_SIZE, count)
+	return boards
+
+def chi_square(counts):
+	""" Tests counts against a uniform spread.
+
+	Parameters
+	----------
+	counts : array
+		number of boards in each category
+
+	Returns
+	-------
+	tuple
+		the chi-square statistic, the degrees of freedom, and the p-value,
+		approximated with the Wilson-Hilferty transformation
+	"""
+
+	expected = counts.sum() / len(counts)
+	statistic = float(((counts - expected) ** 2 / expected).sum())
+	freedom = len(counts) - 1
+	z = ((statistic / freedom) ** (1 / 3) - (1 - 2 / (9 * freedom))) / math.sqrt(2 / (9 * freedom))
+	return statistic, freedom, 0.5 * math.erfc(z / math.sqrt(2))
+
+def report(counts, title, labels):
+	""" Prints the spread of the boards over some categories.
+
+	Parameters
+	----------
+	counts : array
+		number of boards in each category
+	title : str
+		name of the categories
+	labels : list
+		name of each category
+	"""
+
+	total = counts.sum()
+	statistic, freedom, p = chi_square(counts)
+	print("{}: chi-square {:.1f} on {} degrees of freedom, p = {:.3f}".format(title, statistic, freedom, p))
+	expected = total / len(counts)
+	for label, count in zip(labels, counts):
+		print("  {:24} {:>12} {:>8.3%} {:>+8.3%}".format(label, int(count), count / total, count / expected - 1))
+
+def compare(count, difficulty=None):
+	""" Times tilesets.tileset_pick() in a loop against generate().
+
+	Parameters
+	----------
+	count : int
+		number of boards to time each way
+	difficulty : str, optional
+		the difficulty of the game
+	"""
+
+	random_tiles = tilesets.new_board()
+	start = time.perf_counter()
+	for index in range(count):
+		tilesets.tileset_pick(tilesets.tileset_ids, random_tiles, difficulty)
+	loop = time.perf_counter() - start
+	start = time.perf_counter()
+	generate(numpy.random.default_rng(), count, difficulty)
+	vectorized = time.perf_counter() - start
+	print("tileset_pick: {:.0f} boards/s, generate: {:.0f} boards/s, {:.0f}x faster".format(
+		count / loop, count / vectorized, loop / vectorized))
+
+def main():
+	parser = argparse.ArgumentParser(description="Generate game boards in bulk and check their spread.")
+	parser.add_argument("count", type=int, help="number of boards to generate")
+	parser.add_argument("--output", default="boards.npy", help="the .npy file to write the boards to")
+	parser.add_argument("--seed", type=int, help="seed of the random number generator")
+	parser.add_argument("--difficulty", choices=("EASY", "MEDIUM", "HARD"),
+		help="draw the boards of a difficulty, from its tile pairs")
+	parser.add_argument("--chunk", type=int, default=1 << 20, help="boards generated at once")
+	parser.add_argument("--compare", type=int, metavar="N",
+		help="also time N boards made by tileset_pick() in a loop")
+	options = parser.parse_args()
+
+	rng = numpy.random.default_rng(options.seed)
+	boards = numpy.lib.format.open_memmap(options.output, mode="w+", dtype=board_dtype,
+		shape=(options.count,))
+	tile_count = len(tilesets.tile_names)
+	set_counts = numpy.zeros(len(tilesets.tileset_ids), dtype="i8")
+	pair_counts = numpy.zeros(tile_count * tile_count, dtype="i8")
+	position_counts = numpy.zeros(tilesets.BOARD_SIZE, dtype="i8")
+	start = time.perf_counter()
+	for first in range(0, options.count, options.chunk):
+		chunk = generate(rng, min(options.chunk, options.count - first), options.difficulty)
+		boards[first:first + len(chunk)] = chunk
+		set_counts += numpy.bincount(chunk["tileset"], minlength=len(set_counts))
+		pair_counts += numpy.bincount(chunk["common"].astype("i8") * tile_count + chunk["odd"],
+			minlength=len(pair_counts))
+		position_counts += numpy.bincount(chunk["position"], minlength=len(position_counts))
+	boards.flush()
+	elapsed = time.perf_counter() - start
+	print("{} boards written to {} in {:.2f}s ({:.0f} boards/s)".format(options.count, options.output,
+		elapsed, options.count / elapsed if elapsed else 0))
+
+	report(set_counts, "Tile sets", tilesets.tileset_names)
+	# ONLY PAIRS OF TWO DIFFERENT TILES OF THE SAME SET CAN BE MADE, AND ONLY THOSE OF
+	# THE DIFFICULTY ON A SET THAT HAS ANY
+	difficulty_pairs = tilesets.difficulty_pairs.get(options.difficulty)
+	pairs = []
+	for index, tileset in enumerate(tilesets.tileset_ids):
+		if difficulty_pairs and difficulty_pairs[index]:
+			pairs += difficulty_pairs[index]
+		else:
+			pairs += [(common, odd) for common in tileset for odd in tileset if common != odd]
+	report(numpy.array([pair_counts[common * tile_count + odd] for common, odd in pairs]),
+		"Common/odd tile pairs", ["{} / {}".format(tilesets.tile_names[common], tilesets.tile_names[odd])
+		for common, odd in pairs])
+	report(position_counts, "Odd tile positions", ["row {}, column {}".format(
+		position // tilesets.BOARD_COLUMNS + 1, position % tilesets.BOARD_COLUMNS + 1)
+		for position in range(tilesets.BOARD_SIZE)])
+	if options.compare:
+		compare(options.compare, options.difficulty)
+
+if __name__ == "__main__":
+	main()
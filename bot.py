@@ -0,0 +1,199 @@
+""" Bot Player
+This module contains a bot that plays the game by itself, for load testing the
+game on the machine it runs on. The bot attaches to the running game, reads
+which tile is odd, and injects mouse clicks into the game window through the
+same events a player would make. It plays one game on each difficulty, and then
+prints how many rounds per second it reached and how long each click took to
+show a new board. The game saves neither the scores, the rounds nor the metrics
+of the games of the bot. This module requires the 'interface' and 'render'
+modules, as well as 'pyglet' to be installed.
+
+This module can be imported and contains the following:
+	* percentile - returns a percentile of a sorted list of numbers
+	* Bot - creates a bot player attached to the game
+"""
+
+import time, pyglet.clock, interface, render
+from render import mouse
+
+def percentile(values, fraction):
+	""" Returns a percentile of a sorted list of numbers.
+
+	Parameters
+	----------
+	values : list
+		a sorted list of numbers
+	fraction : float
+		the percentile to return, from 0 to 1
+
+	Returns
+	-------
+	float
+		the value below which the given fraction of the numbers fall
+	"""
+
+	if not values:
+		return 0.0
+	return values[min(len(values) - 1, int(fraction * len(values)))]
+
+class Bot:
+	"""
+	A class used to create a bot player attached to the game.
+
+	A click that finds the odd tile is timed from the moment it is injected
+	until the frame showing the new board has been drawn and flipped, that is,
+	until the window starts drawing the frame after it.
+
+	...
+
+	Attributes
+	----------
+	game : module
+		the running game script, from which the boards and game state are read
+	window : obj
+		the game window into which the clicks are injected
+	rate : float
+		number of clicks per second, or 0 to click on every tick of the clock
+	difficulties : list
+		the difficulties left to play, with the buttons to choose them
+	results : dict
+		rounds, playing time and click latencies of each difficulty played
+
+	Methods
+	-------
+	step(dt)
+		makes one move: a click on the odd tile or on a menu button
+	click(x, y)
+		injects one mouse click into the game window
+	on_draw()
+		times the clicks whose new board has been drawn
+	report()
+		prints the results of every difficulty played
+	"""
+
+	def __init__(self, game, window, rate):
+		""" Attaches the bot to the game and schedules its moves.
+
+		Parameters
+		----------
+		game : module
+			the running game script
+		window : obj
+			the game window
+		rate : float
+			number of clicks per second, or 0 to click as fast as the game
+			accepts them
+		"""
+
+		self.game = game
+		self.window = window
+		self.rate = rate
+		self.difficulties = [("EASY", interface.easydiff), ("MEDIUM", interface.mediumdiff),
+			("HARD", interface.harddiff)]
+		self.results = {}
+		self.current = None
+		# CLICKS WAITING FOR THEIR NEW BOARD TO BE DRAWN, AND CLICKS WHOSE NEW
+		# BOARD IS BEING DRAWN
+		self.waiting = []
+		self.drawn = []
+		window.push_handlers(on_draw=self.on_draw)
+		if rate:
+			pyglet.clock.schedule_interval(self.step, 1 / rate)
+		else:
+			# WITHOUT VSYNC THE GAME DRAWS AND ACCEPTS A CLICK ON EVERY TICK
+			window.set_vsync(False)
+			pyglet.clock.schedule(self.step)
+
+	def click(self, x, y):
+		self.window.dispatch_event("on_mouse_press", x, y, mouse.LEFT, 0)
+		self.window.dispatch_event("on_mouse_release", x, y, mouse.LEFT, 0)
+
+	def click_button(self, button):
+		self.click(button.x, button.y + button.height / 2)
+
+	def step(self, dt):
+		""" Makes one move of the bot.
+
+		Parameters
+		----------
+		dt : float
+			the time since the last move
+		"""
+
+		if self.game.game_start:
+			self.play()
+		else:
+			self.navigate()
+
+	def play(self):
+		""" Clicks on the odd tile of every board in the game. """
+		result = self.results[self.current]
+		now = time.perf_counter()
+		if result["start"] is None:
+			result["start"] = now
+		result["end"] = now
+		for player in self.game.players:
+			if self.game.options.mega:
+				# THE ODD TILE OF A MEGA BOARD IS BROUGHT INTO VIEW FIRST, AS A PLAYER WOULD PAN TO IT
+				player.board.center_on(player.odd_index)
+				x, y = player.board.screen_position(player.odd_index)
+			else:
+				square = player.board[player.odd_index]
+				x, y = square.gametileimage.x + square.width / 2, square.gametileimage.y + square.height / 2
+			before = player.score
+			start = time.perf_counter()
+			self.click(x, y)
+			if player.score > before:
+				result["rounds"] += player.score - before
+				self.waiting.append(start)
+
+	def navigate(self):
+		""" Clicks through the menu screens towards the next difficulty to play. """
+		for button in (interface.playbutton, interface.nextpage, interface.yeschoice):
+			if button.buttonimage.visible:
+				self.click_button(button)
+				return
+		if interface.playagain.buttonimage.visible:
+			if self.difficulties:
+				self.click_button(interface.playagain)
+			else:
+				self.report()
+				render.exit()
+			return
+		if self.difficulties:
+			mode, button = self.difficulties[0]
+			if button.buttonimage.visible:
+				self.difficulties.pop(0)
+				self.current = mode
+				self.results[mode] = {"rounds": 0, "start": None, "end": None, "latencies": []}
+				self.click_button(button)
+			elif interface.nextchoice.buttonimage.visible:
+				self.click_button(interface.nextchoice)
+
+	def on_draw(self):
+		""" Times the clicks whose new board was drawn in the previous frame.
+		This handler runs before the game draws the current frame.
+		"""
+
+		now = time.perf_counter()
+		if self.drawn:
+			latencies = self.results[self.current]["latencies"]
+			for start in self.drawn:
+				latencies.append(now - start)
+		self.drawn = self.waiting
+		self.waiting = []
+
+	def report(self):
+		""" Prints the rounds per second and the click latencies of every
+		difficulty played.
+		"""
+
+		print("{:8} {:>7} {:>9} {:>9} {:>9} {:>9} {:>9}".format(
+			"MODE", "ROUNDS", "ROUNDS/S", "P50 MS", "P95 MS", "P99 MS", "MAX MS"))
+		for mode, result in self.results.items():
+			latencies = sorted(result["latencies"])
+			duration = (result["end"] or 0) - (result["start"] or 0)
+			print("{:8} {:>7} {:>9.1f} {:>9.2f} {:>9.2f} {:>9.2f} {:>9.2f}".format(
+				mode, result["rounds"], result["rounds"] / duration if duration > 0 else 0,
+				percentile(latencies, 0.5) * 1000, percentile(latencies, 0.95) * 1000,
+				percentile(latencies, 0.99) * 1000, (latencies[-1] if latencies else 0) * 1000))
@@ -0,0 +1,248 @@
+""" Game Bundle
+This script builds the game into one zipapp file, which runs with 'python
+odd1out.pyz' wherever it is copied to, and this module finds the files of the
+game whether it runs from a bundle or from its source files.
+
+The bundle holds the modules of the game and one asset archive: the images,
+sounds, fonts and texts of the 'assets' directory in a single file, with an
+index of the offset and length of each of them. The game reads the archive into
+memory once when it starts, and then reads every asset from memory instead of
+opening its file, which is faster to start from slow storage. The texture cache
+is put in the archive too when it is up to date with the images.
+
+Assets are found relative to the game rather than to the working directory: the
+directory of the source files, or the directory holding the bundle, where the
+files the game writes, such as the leaderboard, are also kept. This module does
+not require 'pyglet' to be installed, but the game it bundles does.
+
+This module can be imported and contains the following:
+	* ARCHIVE_NAME - name of the asset archive in the bundle
+	* home - the directory of the game
+	* path - returns the path of a file of the game
+	* data_path - returns the path of a file the game writes
+	* read - returns the contents of an asset
+	* listdir - returns the names of the assets in a directory
+	* AssetArchive - reads the assets of an asset archive
+	* archive - the AssetArchive of the bundle, or None
+	* write_archive - writes an asset archive
+	* build - builds the bundle
+
+Usage: python bundle.py [--output FILE]
+"""
+
+import argparse, os, shutil, struct, tempfile, zipapp, zipimport
+
+ARCHIVE_NAME = "assets.pack"
+
+# THE HEADER HOLDS THE MAGIC NUMBER AND THE NUMBER OF ASSETS. EACH INDEX ENTRY
+# HOLDS THE OFFSET AND LENGTH OF AN ASSET AND THE LENGTH OF ITS NAME, WHICH
+# FOLLOWS THE ENTRY
+MAGIC = b"O1OPAK01"
+header_format = struct.Struct("<8sI")
+entry_format = struct.Struct("<QQH")
+
+# FILES OF THE ASSETS DIRECTORY THAT THE GAME WRITES, WHICH ARE NOT BUNDLED
+written_names = ("assets/leaderboard", "assets/telemetry", "assets/textures.cache")
+
+class AssetArchive:
+	"""
+	A class used to read the assets of an asset archive held in memory.
+
+	...
+
+	Attributes
+	----------
+	data : bytes
+		the whole archive
+	entries : dict
+		offset and length of each asset, by name
+
+	Methods
+	-------
+	read(name)
+		returns the contents of an asset
+	"""
+
+	__slots__ = ("data", "entries")
+
+	def __init__(self, data):
+		""" Reads the index of the archive.
+
+		Parameters
+		----------
+		data : bytes
+			the whole archive
+
+		Raises
+		------
+		ValueError
+			if the data is not an asset archive of this version
+		"""
+
+		magic, count = header_format.unpack_from(data, 0)
+		if magic != MAGIC:
+			raise ValueError("not an asset archive of this version")
+		self.data = data
+		self.entries = {}
+		position = header_format.size
+		for number in range(count):
+			offset, length, name_length = entry_format.unpack_from(data, position)
+			position += entry_format.size
+			name = data[position:position + name_length].decode("utf-8")
+			position += name_length
+			self.entries[name] = (offset, length)
+
+	def read(self, name):
+		offset, length = self.entries[name]
+		return self.data[offset:offset + length]
+
+# A BUNDLE IS IMPORTED FROM BY A ZIP IMPORTER, WHICH ALSO READS ITS ASSET ARCHIVE
+_loader = globals().get("__loader__")
+if isinstance(_loader, zipimport.zipimporter):
+	home = os.path.dirname(os.path.abspath(_loader.archive))
+	archive = AssetArchive(_loader.get_data(ARCHIVE_NAME))
+else:
+	home = os.path.dirname(os.path.abspath(__file__))
+	archive = None
+
+def path(name):
+	return os.path.join(home, name)
+
+def data_path(name):
+	""" Returns the path of a file the game writes, making its directory if it
+	does not exist yet, as it does not next to a bundle that was just copied.
+	"""
+
+	file_path = path(name)
+	os.makedirs(os.path.dirname(file_path), exist_ok=True)
+	return file_path
+
+def read(name):
+	""" Returns the contents of an asset, from the archive of the bundle if it
+	holds the asset, or else from its file.
+
+	Parameters
+	----------
+	name : str
+		path of the asset relative to the game, such as 'assets/Ozone.jpg'
+
+	Returns
+	-------
+	bytes
+		the contents of the asset
+
+	Raises
+	------
+	OSError
+		if there is no such asset
+	"""
+
+	if archive is not None and name in archive.entries:
+		return archive.read(name)
+	asset_file = open(path(name), "rb")
+	try:
+		return asset_file.read()
+	finally:
+		asset_file.close()
+
+def listdir(directory):
+	""" Returns the names of the files in a directory of the game, from the
+	index of the archive of the bundle if there is one, or else from the
+	directory itself, which a bundle run elsewhere does not have.
+
+	Parameters
+	----------
+	directory : str
+		path of the directory relative to the game, such as 'assets/buttons'
+
+	Returns
+	-------
+	list
+		names of the files in the directory, without the directory
+	"""
+
+	if archive is None:
+		return os.listdir(path(directory))
+	prefix = directory.rstrip("/") + "/"
+	return [name[len(prefix):] for name in archive.entries
+		if name.startswith(prefix) and "/" not in name[len(prefix):]]
+
+def write_archive(archive_path, names):
+	""" Writes an asset archive.
+
+	Parameters
+	----------
+	archive_path : str
+		path of the archive file
+	names : list
+		paths of the assets relative to the game
+	"""
+
+	encoded = [name.encode("utf-8") for name in names]
+	contents = [read(name) for name in names]
+	offset = header_format.size + sum(entry_format.size + len(name) for name in encoded)
+	index = b""
+	for name, content in zip(encoded, contents):
+		index += entry_format.pack(offset, len(content), len(name)) + name
+		offset += len(content)
+	archive_file = open(archive_path, "wb")
+	archive_file.write(header_format.pack(MAGIC, len(names)) + index)
+	for content in contents:
+		archive_file.write(content)
+	archive_file.close()
+
+def _asset_names():
+	names = []
+	for directory, subdirectories, files in os.walk(path("assets")):
+		subdirectories.sort()
+		for name in sorted(files):
+			name = os.path.relpath(os.path.join(directory, name), home).replace(os.sep, "/")
+			if not name.startswith(written_names):
+				names.append(name)
+	return names
+
+def build(output):
+	""" Builds the bundle of the game: its modules, a __main__ module that runs
+	the 'game' script, and the asset archive.
+
+	Parameters
+	----------
+	output : str
+		path of the bundle file
+	"""
+
+	import texcache
+	names = _asset_names()
+	# THE TEXTURE CACHE IS ONLY BUNDLED IF NONE OF ITS IMAGES HAS CHANGED SINCE IT WAS BUILT
+	try:
+		cache = texcache.TextureCache(path(texcache.cache_path))
+	except (OSError, ValueError):
+		cache = None
+	if cache is not None:
+		if all(cache.get(name) is not None for name in texcache.asset_names()):
+			names.append(texcache.cache_path)
+		cache.close()
+
+	staging = tempfile.mkdtemp()
+	try:
+		for name in sorted(os.listdir(home)):
+			if name.endswith(".py"):
+				shutil.copyfile(path(name), os.path.join(staging, name))
+		main_file = open(os.path.join(staging, "__main__.py"), "w")
+		# THE GAME RUNS AS __main__, SO THAT THE BOT FINDS IT IN sys.modules
+		main_file.write("import runpy\nrunpy.run_module(\"game\", run_name=\"__main__\", alter_sys=True)\n")
+		main_file.close()
+		write_archive(os.path.join(staging, ARCHIVE_NAME), names)
+		zipapp.create_archive(staging, output, interpreter="/usr/bin/env python3", compressed=True)
+	finally:
+		shutil.rmtree(staging)
+	print("{} assets bundled into {} ({} bytes)".format(len(names), output, os.path.getsize(output)))
+
+def main():
+	parser = argparse.ArgumentParser(description="Build the game into one zipapp file.")
+	parser.add_argument("--output", default=path("odd1out.pyz"), help="the bundle file to write")
+	options = parser.parse_args()
+	build(options.output)
+
+if __name__ == "__main__":
+	main()
@@ -1,15 +1,18 @@
 """ Game Elements
 This module contains the most important elements that are essential to make the
-game: the buttons, the game tiles, and the timer. This module requires 'pyglet'
-to be installed.
+game: the buttons, the game tiles, and the timer. This module requires the
+'render' and 'telemetry' modules.
 
 This module can be imported and contains the following classes:
 	* Button - creates off-game button objects
 	* GameButton - creates in-game button objects
+	* GamePlayer - keeps the game board and score of one player
+	* BoardCursor - creates a keyboard cursor for a game board
+	* NumberDisplay - creates a fixed-width display of numbers
 	* GameTimer - creates an in-game timer object
 """
 
-import pyglet
+import render, telemetry
 
 class Button:
 	"""
@@ -48,7 +51,10 @@ class Button:
 		makes the button invisible in the screen
 	"""
 
-	def __init__(self, name, x, y, batch):
+	__slots__ = ("name", "x", "y", "hoveredimage", "notpressedimage", "width", "height",
+		"buttonimage")
+
+	def __init__(self, name, x, y, batch, group=None):
 		""" Initializes the name and position of the button.
 		
 		Parameters
@@ -61,17 +67,19 @@ class Button:
 			vertical position of the button
 		batch : obj
 			batch object to which the button will be appended
+		group : obj, optional
+			layer of the batch in which the button is drawn
 		"""
 
 		self.name = name
 		self.x = x
 		self.y = y
-		self.hoveredimage = pyglet.resource.image("assets/buttons/" + self.name + ".png")
-		self.notpressedimage = pyglet.resource.image("assets/buttons/" + self.name + "_.png")
+		self.hoveredimage = render.image("assets/buttons/" + self.name + ".png")
+		self.notpressedimage = render.image("assets/buttons/" + self.name + "_.png")
 		self.width = self.notpressedimage.width
 		self.height = self.notpressedimage.height
-		self.buttonimage = pyglet.sprite.Sprite(self.notpressedimage,
-			x=self.x-(self.width/2), y=self.y, batch=batch)
+		self.buttonimage = render.Sprite(self.notpressedimage,
+			x=self.x-(self.width/2), y=self.y, batch=batch, group=group)
 
 		if self.name == "Title_Play" or self.name == "Exit":
 			self.buttonimage.visible = True
@@ -84,7 +92,6 @@ class Button:
 	def when_not_pressed(self):
 		self.buttonimage.color = (255,255,255)
 		self.buttonimage.image = self.notpressedimage
-		self.buttonimage.draw()
 
 	def when_hovered(self, xpos, ypos):
 		""" Checks whether or not the cursor is hovering over the button.
@@ -122,10 +129,8 @@ class Button:
 
 		if self.when_hovered(xpos,ypos):
 			self.buttonimage.image = self.hoveredimage
-			self.buttonimage.draw()
 		else:
 			self.buttonimage.image = self.notpressedimage
-			self.buttonimage.draw()
 
 	def button_show(self):
 		self.buttonimage.visible = True
@@ -135,48 +140,64 @@ class Button:
 
 class GameButton:
 	"""
-	A class used to create in-game button objects.
+	A class used to create in-game button objects. The game buttons of a board
+	are made once and only their images are changed from one board to the next.
+	A game button with the hit mask of its image is only hovered over its
+	opaque pixels.
 
 	...
 
 	Attributes
 	----------
-	name : str
-		name of the button image file
-	batch : obj
-		batch object to which the button will be appended
+	gametileimage : obj
+		sprite of the game tile
 	width : int
 		width of the button
 	height : int
 		height of the button
+	mask : obj
+		AlphaMask of the image of the game tile, or None to hit-test the
+		whole button
 	
 	Methods
 	-------
 	when_hovered(x, y, xpos, ypos)
 		returns the truth value of whether or not the cursor is hovering over
 		the button
+	set_tile(image, mask=None)
+		changes the image of the game tile and its hit mask
 	button_show()
 		makes the button visible in the screen
 	button_clear()
 		makes the button invisible in the screen
 	"""
 
-	def __init__(self, name, batch):
-		""" Initializes the name and visibility of the game tile.
+	__slots__ = ("gametileimage", "width", "height", "mask")
+
+	def __init__(self, image, x, y, batch, group=None, scale=1):
+		""" Initializes the image, position and visibility of the game tile.
 
 		Parameters
 		----------
-		name : str
-			name of the button image file
+		image : obj
+			texture of the game tile
+		x : int
+			horizontal position of the game tile
+		y : int
+			vertical position of the game tile
 		batch : graphics object
 			a set of images to be drawn at once
+		group : graphics object, optional
+			layer of the batch in which the game tile is drawn
+		scale : float, optional
+			size of the game tile relative to its image
 		"""
 
-		self.name = name
-		self.gametile = pyglet.resource.image("assets/gameimages/" + self.name + ".png")
-		self.gametileimage = pyglet.sprite.Sprite(self.gametile, batch = batch)
-		self.width = self.gametile.width
-		self.height = self.gametile.height
+		self.gametileimage = render.Sprite(image, x=x, y=y, batch = batch, group = group)
+		self.gametileimage.scale = scale
+		self.width = image.width * scale
+		self.height = image.height * scale
+		self.mask = None
 		self.gametileimage.visible = False
 
 	def when_hovered(self, x, y, xpos, ypos):
@@ -202,9 +223,18 @@ class GameButton:
 		"""
 
 		if x + self.width >= xpos >= x and y + self.height >= ypos >= y:
-			return True
+			mask = self.mask
+			if mask is None:
+				return True
+			# THE CURSOR IS MOVED FROM THE SCALED BUTTON TO THE PIXELS OF ITS IMAGE
+			return mask.hit(int((xpos - x) * mask.width / self.width),
+				int((ypos - y) * mask.height / self.height))
 		return False
 
+	def set_tile(self, image, mask=None):
+		self.gametileimage.image = image
+		self.mask = mask
+
 	def button_show(self):
 		self.gametileimage.visible = True
 
@@ -212,6 +242,255 @@ class GameButton:
 		self.gametileimage.visible = False
 
 
+class GamePlayer:
+	"""
+	A class used to keep the game board, the current tiles and the score of
+	one player. Every player of a game has their own board and score, while
+	the tile textures and sounds are shared by all of them.
+
+	...
+
+	Attributes
+	----------
+	board : list
+		game button objects of the player's board
+	score_display : obj
+		label displaying the player's score
+	cursor_image : obj
+		keyboard cursor of the player, or None if the player uses the mouse only
+	random_tiles : array
+		tile IDs of the player's current board
+	odd_index : int
+		position of the odd tile on the player's board
+	cursor : int
+		position of the keyboard cursor on the player's board
+	score : int
+		current score of the player
+	rounds : obj
+		RoundLog object recording the reaction times and misclicks of the player
+	"""
+
+	__slots__ = ("board", "score_display", "cursor_image", "random_tiles", "odd_index",
+		"cursor", "score", "rounds")
+
+	def __init__(self, board, score_display, cursor_image=None):
+		""" Initializes the board, score display and keyboard cursor of the player.
+
+		Parameters
+		----------
+		board : list
+			game button objects of the player's board
+		score_display : obj
+			label displaying the player's score
+		cursor_image : obj, optional
+			keyboard cursor of the player
+		"""
+
+		self.board = board
+		self.score_display = score_display
+		self.cursor_image = cursor_image
+		self.random_tiles = None
+		self.odd_index = 0
+		self.cursor = 0
+		self.score = 0
+		self.rounds = telemetry.RoundLog()
+
+class BoardCursor:
+	"""
+	A class used to create a keyboard cursor, drawn as a square outline around
+	one game tile.
+
+	...
+
+	Attributes
+	----------
+	vertex_list : obj
+		the four sides of the outline, drawn as quads
+	thickness : int
+		thickness of the outline
+
+	Methods
+	-------
+	move_to(x, y, width, height)
+		draws the outline around the given game tile
+	cursor_clear()
+		makes the cursor invisible in the screen
+	"""
+
+	__slots__ = ("vertex_list", "thickness")
+
+	def __init__(self, color, batch, group=None, thickness=4):
+		""" Initializes the color and thickness of the cursor.
+
+		Parameters
+		----------
+		color : tuple
+			RGB color of the outline
+		batch : graphics object
+			a set of images to be drawn at once
+		group : graphics object, optional
+			layer of the batch in which the cursor is drawn
+		thickness : int, optional
+			thickness of the outline
+		"""
+
+		self.vertex_list = batch.add(16, render.GL_QUADS, group,
+			('v2f', [0] * 32), ('c3B', tuple(color) * 16))
+		self.thickness = thickness
+
+	def move_to(self, x, y, width, height):
+		""" Draws the outline around the game tile at the given position.
+
+		Parameters
+		----------
+		x : int
+			horizontal position of the game tile
+		y : int
+			vertical position of the game tile
+		width : int
+			width of the game tile
+		height : int
+			height of the game tile
+		"""
+
+		t = self.thickness
+		right = x + width
+		top = y + height
+		self.vertex_list.vertices[:] = (
+			x, y, right, y, right, y + t, x, y + t,
+			x, top - t, right, top - t, right, top, x, top,
+			x, y, x + t, y, x + t, top, x, top,
+			right - t, y, right, y, right, top, right - t, top)
+
+	def cursor_clear(self):
+		self.vertex_list.vertices[:] = [0] * 32
+
+
+class NumberDisplay:
+	"""
+	A class used to create a fixed-width display of numbers, used for the
+	in-game timer and scores.
+
+	The digits 0 to 9 and ':' are rendered once into glyphs of the font. The
+	display keeps one sprite per character place, and changing the text only
+	points the sprites of the changed places at other glyphs, instead of laying
+	out the text again like a label does. A text longer than the places of the
+	display adds places to it, and a character without a glyph is left blank.
+
+	...
+
+	Attributes
+	----------
+	glyphs : dict
+		glyph of each character that can be displayed
+	sprites : list
+		one sprite per character place
+	batch : graphics object
+		the batch the sprites are drawn in
+	group : graphics object
+		layer of the batch in which the display is drawn
+	advance : int
+		width of each character place
+	x : int
+		horizontal position of the display
+	y : int
+		vertical position of the baseline of the display
+	anchor_x : str
+		"left" or "center", the part of the display placed at x
+
+	Methods
+	-------
+	text
+		the text displayed. Setting it updates only the changed places.
+	set_time(minute, second)
+		displays a time as mm:ss
+	"""
+
+	__slots__ = ("glyphs", "sprites", "batch", "group", "advance", "x", "y", "anchor_x", "_text")
+
+	characters = "0123456789:"
+	two_digits = ["{:02}".format(number) for number in range(100)]
+
+	def __init__(self, font_name, font_size, x, y, places, batch, group=None,
+			bold=False, italic=False, anchor_x="left"):
+		""" Renders the glyphs and creates the sprites of the display.
+
+		Parameters
+		----------
+		font_name : str
+			name of the font
+		font_size : int
+			size of the font
+		x : int
+			horizontal position of the display
+		y : int
+			vertical position of the baseline of the display
+		places : int
+			characters displayed at once before the display adds places
+		batch : graphics object
+			a set of images to be drawn at once
+		group : graphics object, optional
+			layer of the batch in which the display is drawn
+		bold : bool, optional
+			whether or not to use the bold face of the font
+		italic : bool, optional
+			whether or not to use the italic face of the font
+		anchor_x : str, optional
+			"left" or "center", the part of the display placed at x
+		"""
+
+		font = render.load_font(font_name, font_size, bold=bold, italic=italic)
+		glyphs = font.get_glyphs(self.characters)
+		self.glyphs = dict(zip(self.characters, glyphs))
+		self.advance = max(glyph.advance for glyph in glyphs)
+		self.x = x
+		self.y = y
+		self.anchor_x = anchor_x
+		self.batch = batch
+		self.group = group
+		self._text = ""
+		self.sprites = []
+		self._add_places(places)
+
+	def _add_places(self, places):
+		while len(self.sprites) < places:
+			sprite = render.Sprite(self.glyphs["0"], batch=self.batch, group=self.group)
+			sprite.visible = False
+			self.sprites.append(sprite)
+
+	def _get_text(self):
+		return self._text
+
+	def _set_text(self, text):
+		old = self._text
+		if text == old:
+			return
+		self._add_places(len(text))
+		left = self.x
+		if self.anchor_x == "center":
+			left -= len(text) * self.advance / 2
+		# CENTERED PLACES ONLY KEEP THEIR POSITION WHILE THE LENGTH OF THE TEXT STAYS THE SAME
+		moved = self.anchor_x == "center" and len(text) != len(old)
+		for place, sprite in enumerate(self.sprites):
+			if place >= len(text):
+				sprite.visible = False
+			elif moved or place >= len(old) or text[place] != old[place]:
+				glyph = self.glyphs.get(text[place])
+				if glyph is None:
+					sprite.visible = False
+					continue
+				sprite.image = glyph
+				sprite.position = (left + place * self.advance + (self.advance - glyph.width) / 2,
+					self.y + glyph.vertices[1])
+				sprite.visible = True
+		self._text = text
+
+	text = property(_get_text, _set_text)
+
+	def set_time(self, minute, second):
+		self.text = self.two_digits[minute] + ":" + self.two_digits[second]
+
+
 class GameTimer:
 	"""
 	A class used to create the in-game timer.
@@ -239,6 +518,8 @@ class GameTimer:
 		restores the timer to its initial state
 	"""
 
+	__slots__ = ("start", "start_minute", "start_second", "minute", "second")
+
 	def __init__(self, minute, second):
 		""" Initializes the duration of the timer in minutes and seconds.
 
@@ -1,7 +1,10 @@
 """ Main Game
-This script runs the game. It requires the modules 'elements', 'interface',
-'text_input', and 'random' to be imported, and also most necessarily requires
-'pyglet' to be installed, as the entire game is written with pyglet.
+This script runs the game. It requires the modules 'aioloop', 'attract', 'bot',
+'bundle', 'elements', 'interface', 'leaderboard', 'loader', 'megaboard',
+'metrics', 'profiler', 'render', 'text_input', and 'tilesets' to be imported, and also most necessarily requires
+'pyglet' to be installed, as the entire game is written with pyglet. The game
+draws through the renderer backend chosen in the 'render' module, so it can
+also run without OpenGL.
 
 This script contains the following functions:
 	* Play - creates the title screen
@@ -9,14 +12,26 @@ This script contains the following functions:
 	* Difficulty - creates the 'select difficulty' screen
 	* Confirm - creates the 'confirm difficulty' screen
 	* YourScore - creates the 'your score' screen, resets game elements
-		to their initial state, and saves the score
-	* Scoreboard - creates the 'scoreboard' screen
+		to their initial state, ranks and saves the score, and saves the round
+		telemetry
+	* Scoreboard - creates the 'scoreboard' screen of the highest scores of
+		every game instance
 	* timer_deplete - depletes the in-game timer
-	* tileset_pick - randomly chooses a set of tiles for one game screen
+	* board_dimensions - reads the columns and rows of a mega board
 	* board_create - creates the game board
-	* initialize - calls the functions tileset_pick() and board_create() to make
-		one game screen, and also initializes the odd one out checker
-	* gameloop - runs the game recursively until the timer runs out
+	* board_fill - changes the images of the game board to a new set of tiles
+	* initialize - calls the functions tilesets.tileset_pick() and board_fill()
+		to make one game screen for the difficulty, and also initializes the
+		odd one out checker
+	* board_show - shows the board of a player at the start of a game
+	* score_point - tallies a point, records the round, and gives the player a
+		new board
+	* gameloop - runs the game on every click until the timer runs out
+	* cursor_show - draws the keyboard cursor of a player in a versus game
+	* cursor_move - moves the keyboard cursor of a player in a versus game
+	* attract_idle - releases the tile textures, the scene cache and the
+		background music when the game goes idle
+	* attract_resume - restores them when the game wakes up
 
 This script contains the following events:
 	* on_draw - draws the window
@@ -27,10 +42,56 @@ This script contains the following events:
 	* on_mouse_release - calls functions in case of mouse button release; used
 		for displaying unpressed button state, and for calling functions to clear
 		the window to draw the next game scene
+	* on_key_press - calls functions in case of key presses; used for the
+		keyboard cursors of a versus game, and for panning a mega board
+	* on_mouse_drag - pans a mega board
+	* on_mouse_scroll - zooms a mega board
+
+Running the script with the '--versus' option starts a versus game, in which
+two players share the screen. Each player has their own board and score. The
+first player uses W, A, S, D and SPACE, the second player uses the arrow keys
+and ENTER, and the mouse can click on either board.
+
+Running the script with the '--mega COLUMNSxROWS' option, such as '--mega 100x100',
+plays on a mega board: one board far larger than the screen, which the player
+pans by dragging it or with the arrow keys, and zooms with the mouse wheel.
+
+Running the script with the '--bot RATE' option lets the bot of the 'bot'
+module play one game on each difficulty and print its timings. The games of
+the bot are left out of the leaderboard, the telemetry and the metrics.
+
+Running the script with the '--profile [DIR]' option profiles every event
+handler of the game window and every scheduled function of the clock, with
+one profile per scene: PLAY, HOWTO, DIFFICULTY, GAME, YOURSCORE and SCOREBOARD.
+The profiles are written to DIR ('profiles' by default) when the game exits,
+as .pstats files and as collapsed stacks for flame graphs.
+
+Running the script with the '--asyncio' option runs the game from an asyncio
+event loop, using the 'aioloop' module, so that coroutines can run between
+frames.
+
+Running the script with the '--metrics PORT' option serves the metrics of the
+'metrics' module on http://127.0.0.1:PORT/metrics for Prometheus to scrape.
+
+After five minutes without input on the title screen, the game goes idle until
+the next input, using the 'attract' module. The '--idle-after MINUTES' option
+sets how long it waits, and '--idle-after 0' keeps it from ever going idle.
+
+The '--leaderboard-size BYTES' option sets the size the leaderboard file may
+grow to before its records are compacted into its summary and archive.
+
+The game window opens at once and shows the loading screen of the 'loader'
+module while the assets are decoded. The 'interface' and 'bot' modules, which
+build the scene from the assets, are only imported once they are loaded.
+
+The game finds its assets next to this script, or in the bundle built by the
+'bundle' module, whatever the working directory is. The leaderboard and the
+telemetry are written to the 'assets' directory next to the script or bundle.
 """
 
-import pyglet, elements, interface, text_input, random
-from pyglet.window import mouse
+import argparse, sys, pyglet.clock, aioloop, attract, bundle, elements, leaderboard, loader, megaboard, \
+	metrics, profiler, render, text_input, tilesets
+from render import key, mouse
 
 def Play():
 	""" This function creates the 'play' screen whenever needed. """
@@ -40,6 +101,9 @@ def Play():
 	interface.ozone.opacity = 255
 	interface.exitbutton.button_show()
 	interface.backbutton.button_clear()
+	# THE SCREENS OUTSIDE OF A GAME ONLY CHANGE WHEN ONE OF THEM IS MADE. THE
+	# BUTTONS ARE DRAWN ON EVERY FRAME, SO SHOWING OR CLEARING THEM DOES NOT COUNT
+	interface.scene_cache.invalidate()
 
 def HowTo():
 	""" This function creates the 'how to play' screen whenever needed. """
@@ -49,6 +113,7 @@ def HowTo():
 	interface.batch_fill()
 	interface.nextpage.button_show()
 	interface.backbutton.button_show()
+	interface.scene_cache.invalidate()
 
 def Difficulty():
 	""" This function creates the 'select difficulty' screen whenever needed. """
@@ -59,6 +124,7 @@ def Difficulty():
 	interface.nextchoice.button_show()
 	interface.easydiff.button_show()
 	interface.backbutton.button_show()
+	interface.scene_cache.invalidate()
 
 def Confirm(dependentstring):
 	""" This function creates the 'confirm difficulty' screen whenever needed.
@@ -76,6 +142,7 @@ def Confirm(dependentstring):
 	interface.yeschoice.button_show()
 	interface.nochoice.button_show()
 	interface.backbutton.button_clear()
+	interface.scene_cache.invalidate()
 
 def YourScore(dt):
 	""" This function creates the 'your score' screen, resets game
@@ -84,42 +151,77 @@ def YourScore(dt):
 
 	# GLOBAL VARIABLES TO INITIALIZE FOR ENDING THE GAME LOOP
 	global game_start
-	global score
+	global scene
 	game_start = False
-	interface.score_display.text = ""
+	scene = "YOURSCORE"
 	pyglet.clock.unschedule(timer_deplete)
 	interface.watermark_sprite.opacity = 0
 	# PLAYS A SOUND SIGNALLING THE END OF ONE PLAYTHROUGH
 	interface.timeout_sound.play()
-	for tile in board:
-		tile.button_clear()
+	if game_metrics and options.bot is None:
+		game_metrics.game_finished(mode)
+	for player in players:
+		player.score_display.text = ""
+		if options.mega:
+			player.board.board_clear()
+		else:
+			for tile in player.board:
+				tile.button_clear()
+		if player.cursor_image:
+			player.cursor_image.cursor_clear()
 	interface.easytime.TimerReset()
 	interface.mediumtime.TimerReset()
 	interface.hardtime.TimerReset()
 	interface.timelabel.text = ""
 
-	# 'YOUR SCORE' GAME SCENE.
-	# SAVING THE PLAYER'S NAME ALONGSIDE THEIR SCORE
-	textwindow = text_input.Text_Input()
-	interface.yourscore_label.text = "YOUR SCORE:"
-	interface.score_label.text = str(score)
-
-	# SAVING THE LATEST ACHIEVED SCORE INTO A TEXT FILE
-	file = open("assets/leaderboard.txt", "a+")
-	file.write(str(score) + " ")
-	file.close()
+	# EXPORTING THE ROUNDS OF EVERY PLAYER. THE ROUNDS OF THE BOT ARE NOT THOSE OF A REAL PLAYER
+	for number, player in enumerate(players, 1):
+		if options.bot is None:
+			player.rounds.export(bundle.data_path("assets/telemetry.csv"), mode, number, tilesets.tileset_names)
+
+	if options.versus:
+		# 'YOUR SCORE' GAME SCENE OF A VERSUS GAME. THE SCORES ARE NOT SAVED
+		p1_score, p2_score = players[0].score, players[1].score
+		if p1_score > p2_score:
+			interface.yourscore_label.text = "PLAYER 1 WINS!"
+		elif p2_score > p1_score:
+			interface.yourscore_label.text = "PLAYER 2 WINS!"
+		else:
+			interface.yourscore_label.text = "IT'S A TIE!"
+		interface.score_label.text = "{} - {}".format(p1_score, p2_score)
+		interface.rank_label.text = ""
+		interface.stats_label.text = ""
+	else:
+		score = players[0].score
+		# 'YOUR SCORE' GAME SCENE.
+		# SAVING THE PLAYER'S NAME ALONGSIDE THEIR SCORE. THE SCORES OF THE BOT ARE NOT SAVED
+		if options.bot is None:
+			textwindow = text_input.Text_Input(mode, score, scoreboard)
+		interface.yourscore_label.text = "YOUR SCORE:"
+		interface.score_label.text = str(score)
+		# RANKING THE SCORE AGAINST THE LEADERBOARD OF EVERY INSTANCE. THE SCORE
+		# ITSELF IS READ FROM THE FILE ONCE THE NAME IS SAVED, SO IT IS COUNTED HERE
+		scoreboard.refresh()
+		place, total, mode_place, mode_total = scoreboard.index.rank(score, mode)
+		interface.rank_label.text = "#{} OF {} (TOP {}%)   #{} OF {} ON {}".format(place, total + 1,
+			max(1, 100 * place // (total + 1)), mode_place, mode_total + 1, mode)
+		summary = players[0].rounds.summary()
+		interface.stats_label.text = "AVERAGE {:.2f}s   MEDIAN {:.2f}s   95TH {:.2f}s   MISCLICKS {}".format(
+			summary["mean"], summary["p50"], summary["p95"], summary["misclicks"])
 
 	interface.playagain.button_show()
 	interface.scoretable.button_show()
+	interface.scene_cache.invalidate()
 
 def Scoreboard():
 	""" This function creates the 'scoreboard' screen whenever needed. """
 	global scene
 	scene = "SCOREBOARD"
 	interface.scoreboard_label.text = "SCORES"
-	names = interface.load_leaderboard()
-	interface.set_scores(names)
+	scoreboard.refresh()
+	interface.set_scores(scoreboard.top(3))
 	interface.playagain.button_show()
+	interface.scene_cache.invalidate()
 
 def timer_deplete(dt):
 	""" This function depletes the in-game timer to prevent a non-ending game.
@@ -132,70 +234,50 @@ def timer_deplete(dt):
 
 	# GLOBAL VARIABLE TO INITIALIZE FOR STARTING THE GAME TIMER
 	global mode
-	# IF-ELSE STATEMENTS ARE NECESSARY TO PREVENT A WEIRD-LOOKING TIMER.
-	if mode == "EASY":
-		interface.easytime.RunSeconds()
-		if interface.easytime.second > 9:
-			interface.timelabel.text = "0{}:{}".format(interface.easytime.minute, interface.easytime.second)
-		else:
-			interface.timelabel.text = "0{}:0{}".format(interface.easytime.minute, interface.easytime.second)
-	elif mode == "MEDIUM":
-		interface.mediumtime.RunSeconds()
-		if interface.mediumtime.second > 9:
-			interface.timelabel.text = "0{}:{}".format(interface.mediumtime.minute, interface.mediumtime.second)
-		else:
-			interface.timelabel.text = "0{}:0{}".format(interface.mediumtime.minute, interface.mediumtime.second)
-	elif mode == "HARD":
-		interface.hardtime.RunSeconds()
-		if interface.hardtime.second > 9:
-			interface.timelabel.text = "00:{}".format(interface.hardtime.second)
-		else:
-			interface.timelabel.text = "00:0{}".format(interface.hardtime.second)
-
-def tileset_pick(tileset_list):
-	""" This function randomly chooses a set of game tiles for one game screen.
+	timer = interface.timers[mode]
+	timer.RunSeconds()
+	interface.timelabel.set_time(timer.minute, timer.second)
 
-	A set of 3 tiles is randomly picked from a set of 5 tile sets. Then, 2 out
-	of these 3 tiles are randomly picked to be the (a) common tile and then the
-	(b) odd tile, respectively.
+def board_dimensions(text):
+	""" This function reads the columns and rows of a mega board from the
+	command line.
 
 	Parameters
 	----------
-	tileset_list : list
-		a list of 5 tile sets from which 1 set will be picked
+	text : str
+		the columns and rows, as COLUMNSxROWS
 
 	Returns
 	-------
-	random_tiles : list
-		a list of the images used to create the game board
-	check_tile : dict
-		a dictionary containing only 0s and a 1 as values, where keys with a
-		value 0 are common tiles and the key with the value 1 is the odd tile
+	tuple
+		the number of columns and rows
 	"""
 
-	tileset = random.choice(tileset_list)
-	# POPS THE COMMON TILE SO IT WILL NOT BE PICKED AGAIN AS AN ODD TILE
-	default_tile = tileset.pop(tileset.index(random.choice(tileset)))
-	# ADDS COMMON TILES 1 LESS THAN THE SIZE OF THE BOARD
-	random_tiles = [default_tile for i in range(35)]
-	# CREATES A CHECKER OF THE ODD TILE
-	check_tile = ({}.fromkeys(random_tiles, 0))
-	odd = random.choice(tileset)
-	random_tiles.append(odd)
-	random.shuffle(random_tiles)
-	check_tile[odd] = 1
-	# RETURNS THE COMMON TILE TO THE TILE SET
-	tileset.append(default_tile)
-	return random_tiles, check_tile
-
-def board_create(random_tiles):
-	""" This function creates the game board, initializing each game button
-	with x- and y-coordinates
+	try:
+		columns, rows = (int(number) for number in text.lower().split("x"))
+	except ValueError:
+		raise argparse.ArgumentTypeError("expected COLUMNSxROWS, such as 100x100")
+	# THE ODD TILE NEEDS A BOARD OF AT LEAST TWO TILES
+	if columns < 1 or rows < 1 or columns * rows < 2:
+		raise argparse.ArgumentTypeError("{} is not a playable board size".format(text))
+	return columns, rows
+
+def board_create(batch, group, x_position, y_position, scale=1):
+	""" This function creates a game board once, initializing each game
+	button with x- and y-coordinates. The buttons are reused for every board.
 
 	Parameters
 	----------
-	random_tiles : list
-		a list of image names to be made into buttons
+	batch : graphics object
+		the batch to which the game buttons will be appended
+	group : graphics object
+		the layer of the batch in which the game buttons are drawn
+	x_position : int
+		horizontal position of the lower left corner of the board
+	y_position : int
+		vertical position of the lower left corner of the board
+	scale : float, optional
+		size of the game tiles relative to their images
 
 	Returns
 	-------
@@ -204,50 +286,104 @@ def board_create(random_tiles):
 	"""
 
 	board = []
-	x_position = 125
-	y_position = 10
 	initial_x = x_position
-	
-	for tile in random_tiles:
-		square = elements.GameButton(tile, gametilebatch)
-		square.gametileimage.set_position(x_position, y_position)
+	image = interface.tile_images[0]
+
+	for index in range(tilesets.BOARD_SIZE):
+		square = elements.GameButton(image, x_position, y_position, batch, group, scale)
 		board.append(square)
 
-		if len(board) % 6 == 0 and len(board) != 36:
+		if len(board) % tilesets.BOARD_COLUMNS == 0:
 			x_position = initial_x
 			y_position += square.height
 		else:
 			x_position += square.width
 	return board
 
-def initialize():
-	""" This function calls the functions tileset_pick() and board_create()
-	to make one game screen, and also to initialize the odd one out checker.
+def board_fill(board, random_tiles):
+	""" This function changes the images of the game buttons to the tiles of
+	a new board.
 
-	Returns
-	-------
+	Parameters
+	----------
 	board : list
-		a list of button objects with their corresponding sprites and positions
-	random_tiles : list
-		a list of the images used to create the game board
-	check_tile : dict
-		a dictionary containing only 0s and a 1 as values, where keys with a
-		value 0 are common tiles and the key with the value 1 is the odd tile
+		a list of button objects made by board_create(), or the MegaBoard
+		object of a mega board
+	random_tiles : array
+		an array of the tile IDs used to create the game board
+	"""
+
+	if options.mega:
+		board.set_tiles(random_tiles)
+		return
+	tile_images = interface.tile_images
+	tile_masks = interface.tile_masks
+	for square, tile in zip(board, random_tiles):
+		square.set_tile(tile_images[tile], tile_masks[tile])
+
+def initialize(player):
+	""" This function calls the functions tilesets.tileset_pick() and
+	board_fill() to make one game screen for a player, and also to initialize
+	the odd one out checker of the player.
+
+	Parameters
+	----------
+	player : obj
+		the GamePlayer object whose board is refilled
+	"""
+
+	player.random_tiles, player.odd_index = tilesets.tileset_pick(tilesets.tileset_ids,
+		player.random_tiles, mode)
+	board_fill(player.board, player.random_tiles)
+
+def board_show(player):
+	""" This function shows the board and score of a player at the start of a
+	game, and starts timing the player's first board.
+
+	Parameters
+	----------
+	player : obj
+		the GamePlayer object whose board is shown
+	"""
+
+	if options.mega:
+		player.board.board_show()
+	else:
+		for tile in player.board:
+			tile.button_show()
+	player.score_display.text = str(player.score)
+	player.rounds.start_session()
+
+def score_point(player):
+	""" This function tallies a point for a player who has found the odd tile,
+	records the round, and gives the player a new board.
+
+	Parameters
+	----------
+	player : obj
+		the GamePlayer object who found the odd tile
 	"""
 
-	random_tiles, check_tile = tileset_pick(interface.tileset_list)
-	board = board_create(random_tiles)
-	return board, random_tiles, check_tile
+	player.score += 1
+	player.rounds.end_round(tilesets.tileset_of[player.random_tiles[player.odd_index]])
+	if game_metrics and options.bot is None:
+		game_metrics.round_completed(mode)
+	# PLAYS A SOUND AFTER SCORING A POINT
+	interface.correct_sound.play()
+	player.score_display.text = str(player.score)
+	initialize(player)
 
-def gameloop(x, y):
+def gameloop(x, y, player):
 	""" This function runs the game loop.
 
-	With this function, the game runs recursively until the in-game timer runs
-	out. It checks whether or not the player has clicked on the correct odd
-	tile, and then tallies the score. After each correct answer, this function
-	reinitializes the game buttons on the board, their corresponding images, and
-	the checker that comes with it. It changes the sprites on the board and the
-	coordinates of the odd tile, and then calls itself.
+	With this function, the game runs on every click until the in-game timer
+	runs out. It checks whether or not the player has clicked on the correct
+	odd tile, and then tallies the score. After each correct answer, this
+	function refills the game buttons on the board with new images, and moves
+	the odd tile checker to the new odd tile. A click on any other tile of the
+	board is recorded as a misclick, while a click on a transparent pixel of a
+	tile, the odd tile included, is ignored. On a mega board, the click is hit-tested
+	through the viewport, and a click ending a drag of the board is ignored.
 
 	Parameters
 	----------
@@ -255,59 +391,183 @@ def gameloop(x, y):
 		horizontal position of the cursor
 	y : int
 		vertical position of the cursor
+	player : obj
+		the GamePlayer object whose board is checked
 	"""
 
-	# GLOBAL VARIABLE INITIALIZED TO BE ABLE TO REDRAW EACH SCREEN
-	global board
-	global random_tiles
-	global check_tile
-	global score
-	for tile in board:
-		tile.button_show()
-	interface.score_display.text = str(score)
-	index = 0
-	# BOOLEAN TO DETERMINE IF THE PLAYER HAS FOUND THE ODD ONE OUT
-	found = False
-	for square in board:
-		checker = check_tile.get(random_tiles[index])
-		if checker:
-			if square.gametileimage.visible and square.when_hovered(square.gametileimage.x, square.gametileimage.y, x, y):
-					score += 1
-					# PLAYS A SOUND AFTER SCORING A POINT
-					interface.correct_sound.play()
-					interface.score_display.text = str(score)
-					found = True
+	if options.mega:
+		if player.board.dragging:
+			return
+		index = player.board.tile_at(x, y)
+		if index == player.odd_index:
+			score_point(player)
+		elif index is not None:
+			player.rounds.misclick()
+		return
+	# ONLY THE ODD TILE NEEDS TO BE CHECKED FOR THE PLAYER'S CLICK
+	square = player.board[player.odd_index]
+	if square.gametileimage.visible and square.when_hovered(square.gametileimage.x, square.gametileimage.y, x, y):
+		score_point(player)
+	else:
+		# THE FIRST AND LAST TILES ARE THE LOWER LEFT AND UPPER RIGHT CORNERS OF THE BOARD
+		first = player.board[0].gametileimage
+		last = player.board[-1]
+		if last.gametileimage.x + last.width >= x >= first.x and last.gametileimage.y + last.height >= y >= first.y:
+			# A CLICK ON THE TRANSPARENT PIXELS OF A TILE IS IGNORED, AS ON A MEGA BOARD
+			for tile in player.board:
+				image = tile.gametileimage
+				if image.x + tile.width >= x >= image.x and image.y + tile.height >= y >= image.y:
+					if not tile.when_hovered(image.x, image.y, x, y):
+						return
 					break
-		index += 1
-	if found:
-		board, random_tiles, check_tile = initialize()
-		i = 0
-		for square in board:
-			square.gametileimage.image = pyglet.resource.image("assets/gameimages/" + random_tiles[i] + ".png")
-			i += 1
-		gameloop(x, y)
-
-# THE GAME WINDOW
-window = pyglet.window.Window(850, 650)
-pyglet.gl.glClearColor(*interface.bgcolor)
-
-# THE GAME BOARD DRAWN IN A BATCH TO IMPROVE PERFORMANCE OF SPRITE RENDERING
-gametilebatch = pyglet.graphics.Batch()
-board, random_tiles, check_tile = initialize()
+			player.rounds.misclick()
+
+def cursor_show(player):
+	""" This function draws the keyboard cursor of a player around the game
+	tile it is on.
+
+	Parameters
+	----------
+	player : obj
+		the GamePlayer object whose cursor is drawn
+	"""
+
+	square = player.board[player.cursor]
+	player.cursor_image.move_to(square.gametileimage.x, square.gametileimage.y,
+		square.width, square.height)
+
+def cursor_move(player, dx, dy):
+	""" This function moves the keyboard cursor of a player by one game tile,
+	without leaving the board.
+
+	Parameters
+	----------
+	player : obj
+		the GamePlayer object whose cursor is moved
+	dx : int
+		number of columns to move the cursor by
+	dy : int
+		number of rows to move the cursor by
+	"""
 
+	column = player.cursor % tilesets.BOARD_COLUMNS + dx
+	row = player.cursor // tilesets.BOARD_COLUMNS + dy
+	if 0 <= column < tilesets.BOARD_COLUMNS and 0 <= row < tilesets.BOARD_ROWS:
+		player.cursor = row * tilesets.BOARD_COLUMNS + column
+		cursor_show(player)
+
+def attract_idle():
+	""" This function releases what the title screen does not need when the
+	game goes idle: the textures of the game tiles, the texture of the scene
+	cache, and the background music with the buffers of its player. The sound
+	effects stay decoded, as the first click plays one.
+	"""
+
+	global music_player
+	music_player.delete()
+	music_player = None
+	render.release_textures("assets/gameimages")
+	interface.scene_cache.release()
+
+def attract_resume():
+	""" This function restores what attract_idle() released when the game
+	wakes up. The tile textures are uploaded again from the texture cache, and
+	the music is streamed again from the start.
+	"""
+
+	global music_player
+	render.restore_textures("assets/gameimages")
+	music_player = render.looping_player(render.media('assets/music/background.wav'))
+	music_player.play()
+
+# COMMAND LINE OPTIONS
+parser = argparse.ArgumentParser(description="Find the odd one out.")
+parser.add_argument("--versus", action="store_true",
+	help="two players on one screen, each with their own board")
+parser.add_argument("--bot", type=float, metavar="RATE",
+	help="let a bot play one game on each difficulty, clicking RATE times per second "
+	"(0 for as fast as the game accepts), and print its timings")
+parser.add_argument("--leaderboard-size", type=int, default=leaderboard.MAX_SIZE, metavar="BYTES",
+	help="size the leaderboard file is compacted at (default: %(default)s)")
+parser.add_argument("--profile", nargs="?", const="profiles", metavar="DIR",
+	help="profile the event handlers and clock callbacks of each scene, and write "
+	"the profiles to DIR (default: profiles) at exit")
+parser.add_argument("--asyncio", action="store_true",
+	help="run the game from an asyncio event loop")
+parser.add_argument("--metrics", type=int, metavar="PORT",
+	help="serve the metrics of the game on http://127.0.0.1:PORT/metrics")
+parser.add_argument("--idle-after", type=float, default=5, metavar="MINUTES",
+	help="go idle after MINUTES without input on the title screen (default: %(default)s, "
+	"0 for never)")
+parser.add_argument("--mega", type=board_dimensions, metavar="COLUMNSxROWS",
+	help="play on one board of COLUMNSxROWS tiles, panned and zoomed through a viewport")
+options = parser.parse_args()
+if options.mega and options.versus:
+	parser.error("--mega cannot be combined with --versus")
+
+# THE GAME WINDOW, WHICH SHOWS THE LOADING SCREEN UNTIL THE ASSETS ARE DECODED
+window = render.Window(850, 650)
+if not loader.load(window):
+	sys.exit()
+import bot, interface
+render.set_clear_color(*interface.bgcolor)
+
+# THE GAME BOARDS ARE DRAWN IN THEIR OWN LAYER OF THE SCENE BATCH. IN A VERSUS
+# GAME, EACH PLAYER HAS A BOARD, A SCORE AND A KEYBOARD CURSOR OF THEIR OWN
+if options.versus:
+	players = []
+	for position, score_display, color in zip(interface.versus_board_positions,
+			(interface.p1_score_display, interface.p2_score_display), interface.versus_cursor_colors):
+		board = board_create(interface.scenebatch, interface.gametilelayer, position[0], position[1],
+			interface.versus_board_scale)
+		cursor_image = elements.BoardCursor(color, interface.scenebatch, interface.cursorlayer)
+		players.append(elements.GamePlayer(board, score_display, cursor_image))
+	# MOVES THE WATERMARKS AWAY FROM THE LEFT BOARD
+	interface.watermark_sprite.y = interface.height - interface.watermark.height
+elif options.mega:
+	# THE MEGA BOARD IS ONLY KEPT AS DATA, AND STARTS IN ITS MIDDLE
+	columns, rows = options.mega
+	board = megaboard.MegaBoard(columns, rows, interface.tile_images, interface.scenebatch,
+		interface.gametilelayer, *interface.mega_viewport, tile_masks=interface.tile_masks)
+	board.center_on(rows // 2 * columns + columns // 2)
+	players = [elements.GamePlayer(board, interface.score_display)]
+	players[0].random_tiles = tilesets.new_board(columns * rows)
+else:
+	board = board_create(interface.scenebatch, interface.gametilelayer, *interface.board_position)
+	players = [elements.GamePlayer(board, interface.score_display)]
 # INITIAL GAME VALUES
 scene = "PLAY"
 mode = ""
 game_start = False
-score = 0
+
+for player in players:
+	initialize(player)
+
+# THE LEADERBOARD SHARED BY EVERY INSTANCE OF THE GAME. IT IS READ ONCE, AND THEN
+# ONLY THE RECORDS ADDED SINCE ARE READ BEFORE RANKING A SCORE OR SHOWING THE SCOREBOARD.
+# ITS FILE IS COMPACTED IN THE BACKGROUND TO STAY UNDER ITS MAXIMUM SIZE
+scoreboard = leaderboard.Leaderboard(bundle.data_path("assets/leaderboard.txt"), max_size=options.leaderboard_size)
+compactor = leaderboard.Compactor(scoreboard.path, options.leaderboard_size)
+compactor.start()
+
+# THE ARROW KEYS PAN A MEGA BOARD BY A QUARTER OF ITS VIEWPORT, TOWARDS THE ARROW
+mega_pans = {key.LEFT: (1, 0), key.RIGHT: (-1, 0), key.UP: (0, -1), key.DOWN: (0, 1)}
+
+# THE METRICS OF THE GAME, SERVED FROM THEIR OWN THREAD, AND ONLY KEPT WHEN SERVED
+game_metrics = None
+if options.metrics is not None:
+	game_metrics = metrics.Metrics()
+	metrics_server = metrics.MetricsServer(game_metrics, options.metrics)
+	metrics_server.start()
+
+# KEYBOARD CONTROLS OF THE TWO PLAYERS IN A VERSUS GAME: THE KEYS MOVING THE
+# CURSOR LEFT, RIGHT, UP AND DOWN, AND THE KEY SELECTING A TILE
+versus_controls = (
+	({key.A: (-1, 0), key.D: (1, 0), key.W: (0, 1), key.S: (0, -1)}, key.SPACE),
+	({key.LEFT: (-1, 0), key.RIGHT: (1, 0), key.UP: (0, 1), key.DOWN: (0, -1)}, key.ENTER))
 
 # CREATES A LOOP OF BACKGROUND MUSIC
-sound = pyglet.media.load('assets/music/background.wav')
-looper = pyglet.media.SourceGroup(sound.audio_format, None)
-looper.loop = True
-looper.queue(sound)
-music_player = pyglet.media.Player()
-music_player.queue(looper)
+music_player = render.looping_player(render.media('assets/music/background.wav'))
 music_player.play()
 
 @window.event
@@ -347,6 +607,8 @@ def on_mouse_press(x, y, button, modifiers):
 		if button.buttonimage.visible and button.when_hovered(x,y):
 			button.when_pressed()
 			interface.click_sound.play()
+	if options.mega:
+		board.dragging = False
 
 @window.event
 def on_mouse_release(x, y, button, modifiers):
@@ -369,7 +631,7 @@ def on_mouse_release(x, y, button, modifiers):
 		interface.exitbutton.button_clear()
 		HowTo()
 	if interface.exitbutton.buttonimage.visible and interface.exitbutton.when_hovered(x,y):
-		pyglet.app.exit()
+		render.exit()
 	if interface.nextpage.buttonimage.visible and interface.nextpage.when_hovered(x,y):
 		interface.nextpage.when_not_pressed()
 		interface.nextpage.button_clear()
@@ -427,23 +689,30 @@ def on_mouse_release(x, y, button, modifiers):
 		# AT THAT GAME MODE
 		if "EASY" in interface.confirm_label.text:
 			mode = "EASY"
-			interface.timelabel.text = interface.easytime.start
+			interface.timelabel.set_time(interface.easytime.minute, interface.easytime.second)
 			pyglet.clock.schedule_once(YourScore, 90)
 		elif "MEDIUM" in interface.confirm_label.text:
 			mode = "MEDIUM"
-			interface.timelabel.text = interface.mediumtime.start
+			interface.timelabel.set_time(interface.mediumtime.minute, interface.mediumtime.second)
 			pyglet.clock.schedule_once(YourScore, 60)
 		else:
 			mode = "HARD"
-			interface.timelabel.text = interface.hardtime.start
+			interface.timelabel.set_time(interface.hardtime.minute, interface.hardtime.second)
 			pyglet.clock.schedule_once(YourScore, 30)
 		interface.confirm_label.text = ""
 		pyglet.clock.schedule_interval(timer_deplete,1)
 		# NECESSARY TO NOT ACCIDENTALLY TRIGGER THE START OF THE GAME LOOP
 		game_start = True
-	if game_start:
 		interface.watermark_sprite.opacity = 255
-		gameloop(x,y)
+		# THE CLICK THAT STARTS THE GAME ONLY SHOWS THE BOARDS, NEWLY PICKED FOR THE DIFFICULTY
+		for player in players:
+			initialize(player)
+			board_show(player)
+			if player.cursor_image:
+				cursor_show(player)
+	elif game_start:
+		for player in players:
+			gameloop(x, y, player)
 	if interface.playagain.buttonimage.visible and interface.playagain.when_hovered(x,y):
 		interface.playagain.when_not_pressed()
 		interface.playagain.button_clear()
@@ -452,8 +721,9 @@ def on_mouse_release(x, y, button, modifiers):
 			label.text = ""
 		for label in interface.labellist:
 			label.text = ""
-		# RESETTING THE SCORE
-		score = 0
+		# RESETTING THE SCORES
+		for player in players:
+			player.score = 0
 		Difficulty()
 	if interface.scoretable.buttonimage.visible and interface.scoretable.when_hovered(x,y):
 		interface.scoretable.when_not_pressed()
@@ -466,7 +736,7 @@ def on_mouse_release(x, y, button, modifiers):
 		interface.backbutton.when_not_pressed()
 		if scene == "HOWTO":
 			interface.howtoplay_label.text = ""
-			interface.instructions.clear()
+			interface.batch_clear()
 			interface.nextpage.button_clear()
 			Play()
 		elif scene == "DIFFICULTY":
@@ -475,20 +745,114 @@ def on_mouse_release(x, y, button, modifiers):
 				button.button_clear()
 			HowTo()
 
+@window.event
+def on_key_press(symbol, modifiers):
+	""" This event is generated whenever a key is pressed. In a versus game,
+	this is used for moving the keyboard cursors of the players and for
+	selecting tiles with them.
+
+	Parameters
+	----------
+	symbol : int
+		the key that was pressed
+	modifiers : int
+		the modifier keys held down
+	"""
+
+	if game_start and options.mega and symbol in mega_pans:
+		dx, dy = mega_pans[symbol]
+		board.pan(dx * board.width / 4, dy * board.height / 4)
+	if not (game_start and options.versus):
+		return
+	for player, (moves, select) in zip(players, versus_controls):
+		if symbol in moves:
+			cursor_move(player, *moves[symbol])
+		elif symbol == select and player.board[player.cursor].gametileimage.visible:
+			if player.cursor == player.odd_index:
+				score_point(player)
+			else:
+				player.rounds.misclick()
+
+@window.event
+def on_mouse_drag(x, y, dx, dy, buttons, modifiers):
+	""" This event is generated whenever the mouse moves with a button held
+	down. This is used for panning a mega board.
+
+	Parameters
+	----------
+	x : int
+		horizontal position of the cursor
+	y : int
+		vertical position of the cursor
+	dx : int
+		change in the horizontal position of the cursor
+	dy : int
+		change in the vertical position of the cursor
+	"""
+
+	if game_start and options.mega:
+		board.pan(dx, dy)
+		board.dragging = True
+
+@window.event
+def on_mouse_scroll(x, y, scroll_x, scroll_y):
+	""" This event is generated whenever the mouse wheel is turned. This is
+	used for zooming a mega board around the cursor.
+
+	Parameters
+	----------
+	x : int
+		horizontal position of the cursor
+	y : int
+		vertical position of the cursor
+	scroll_y : int
+		number of steps the wheel was turned up
+	"""
+
+	if game_start and options.mega:
+		board.zoom_at(x, y, 1.25 ** scroll_y)
+
 @window.event
 def on_draw():
 	""" This event is generated whenever the window is drawn. This function
-	draws all the buttons, labels, and sprites.
+	draws all the buttons, labels, and sprites, which are all in the layers of
+	one batch. Outside of a game, every layer but the buttons is drawn from the
+	scene cache. The draw calls and state changes of every frame are counted in
+	render.frame, and timed in the metrics of the game when they are served.
 	"""
 
-	window.clear()
-	interface.ozone.draw()
-	interface.buttonbatch.draw()
-	interface.labelbatch.draw()
-	for label in interface.instructions:
-		label.draw()
-	interface.watermark_sprite.draw()
-	gametilebatch.draw()
-	interface.scoreslabelbatch.draw()
-
-pyglet.app.run()
\ No newline at end of file
+	render.frame.begin_frame()
+	if game_start:
+		window.clear()
+		interface.scenebatch.draw()
+	else:
+		interface.scene_cache.draw(window)
+	if game_metrics:
+		game_metrics.frame_drawn()
+
+# THE GAME GOES IDLE AFTER A TIME WITHOUT INPUT, ONLY ON THE TITLE SCREEN. ITS
+# HANDLERS ARE PUSHED ONCE THE HANDLERS OF THE GAME ARE SET, SO THEY RUN FIRST
+if options.idle_after > 0:
+	attract_mode = attract.AttractMode(window, options.idle_after * 60,
+		lambda: scene == "PLAY" and not game_start, attract_idle, attract_resume)
+
+# ATTACHES THE BOT PLAYER FOR LOAD TESTING
+if options.bot is not None:
+	player_bot = bot.Bot(sys.modules[__name__], window, options.bot)
+
+# PROFILES EVERY EVENT OF THE GAME WINDOW AND EVERY TICK OF THE CLOCK IN THE
+# SCENE IT STARTS IN. THE GAME ITSELF IS ONE SCENE, WHATEVER SCREEN IT STARTED FROM
+if options.profile:
+	scene_profiler = profiler.SceneProfiler(lambda: "GAME" if game_start else scene)
+	window.dispatch_event = scene_profiler.wrap(window.dispatch_event)
+	clock = pyglet.clock.get_default()
+	clock.call_scheduled_functions = scene_profiler.wrap(clock.call_scheduled_functions)
+
+if options.asyncio:
+	aioloop.run()
+else:
+	render.run()
+
+if options.profile:
+	print("Profiles of {} written to {}".format(", ".join(scene_profiler.write(options.profile)),
+		options.profile))
\ No newline at end of file
@@ -0,0 +1,542 @@
+""" OpenGL Renderer
+This module contains the pyglet backend of the 'render' module, which draws the
+game with OpenGL in pyglet windows. It keeps the scene in as few GL calls as
+possible: a batch that draws every layer of the scene in one pass and keeps
+count of the draw calls and state changes it makes, and a label that shares its
+text groups with every other label of the same layer. Assets are read with the
+'bundle' module, from memory when the game runs from a bundle. This module
+requires the 'bundle', 'hitmask', 'render' and 'texcache' modules, as well as
+'pyglet' to be installed.
+
+This module can be imported and contains the following:
+	* The pyglet classes and constants used by the game, under the names of
+		the 'render' module
+	* image, media, add_font, load_font - load the assets of the game, where
+		images come from the texture cache of the 'texcache' module if it has
+		them and they are not stale
+	* preload - decodes images and sounds on a pool of threads, and uploads
+		the textures on the calling thread
+	* alpha_mask - returns the hit mask made from the pixels of an image
+	* release_textures, restore_textures - free and upload again the atlas
+		textures of the images of one directory
+	* set_idle - slows down the steps of run_async while the game is idle
+	* looping_player - plays a sound over and over
+	* run_async - runs the event loop of pyglet from an asyncio event loop
+	* set_clear_color - sets the background color of the current window
+	* LayeredBatch - creates a batch that counts its draw calls and state changes,
+		and can draw some of its layers only
+	* SceneCache - creates a cache of the layers of a scene that do not change
+	* ViewportGroup - creates a group that draws its children through a viewport
+	* Label - creates a text label that shares its groups within a layer
+"""
+
+import asyncio, bundle, concurrent.futures, hitmask, io, os, pyglet, render, texcache
+from pyglet.text import layout
+
+__all__ = ["OrderedGroup", "Sprite", "UnformattedDocument", "IncrementalTextLayout", "Caret",
+	"Window", "key", "mouse", "GL_QUADS", "windows", "run", "exit", "image", "media",
+	"looping_player", "add_font", "load_font", "set_clear_color", "LayeredBatch", "Label",
+	"TextureGroup", "ViewportGroup", "run_async", "SceneCache", "preload", "release_textures",
+	"restore_textures", "set_idle", "alpha_mask"]
+
+OrderedGroup = pyglet.graphics.OrderedGroup
+TextureGroup = pyglet.graphics.TextureGroup
+Sprite = pyglet.sprite.Sprite
+UnformattedDocument = pyglet.text.document.UnformattedDocument
+IncrementalTextLayout = pyglet.text.layout.IncrementalTextLayout
+Caret = pyglet.text.caret.Caret
+Window = pyglet.window.Window
+key = pyglet.window.key
+mouse = pyglet.window.mouse
+GL_QUADS = pyglet.gl.GL_QUADS
+windows = pyglet.app.windows
+run = pyglet.app.run
+exit = pyglet.app.exit
+
+# THE TEXTURE CACHE, IF IT WAS BUILT, AND THE TEXTURES ALREADY LOADED. SMALL
+# IMAGES SHARE THE TEXTURES OF AN ATLAS, LIKE THOSE OF pyglet.resource, WITH
+# ONE TEXTURE BIN PER DIRECTORY, SO THE ATLAS OF A DIRECTORY CAN BE RELEASED
+texture_cache = texcache.load()
+_textures = {}
+_texture_bins = {}
+# THE HIT MASK OF EACH IMAGE LOADED, MADE FROM THE PIXELS OF ITS TEXTURE
+_masks = {}
+# THE SOUND EFFECTS DECODED BY preload()
+_sounds = {}
+
+def _pixels(path):
+	cached = texture_cache.get(path) if texture_cache else None
+	return texcache.decode_source(path) if cached is None else cached
+
+def _add_texture(path, width, height, pixels):
+	image_data = pyglet.image.ImageData(width, height, "RGBA", pixels)
+	if width > 512 or height > 512:
+		texture = image_data.get_texture(True)
+	else:
+		texture_bin = _texture_bins.get(os.path.dirname(path))
+		if texture_bin is None:
+			texture_bin = _texture_bins[os.path.dirname(path)] = pyglet.image.atlas.TextureBin()
+		texture = texture_bin.add(image_data)
+	_textures[path] = texture
+	_masks[path] = hitmask.AlphaMask.from_pixels(width, height, pixels)
+	return texture
+
+def image(path):
+	""" Returns the texture of an image, from the texture cache if it holds the
+	image, or else decoded from the image file.
+
+	Parameters
+	----------
+	path : str
+		path of the image file relative to the game
+
+	Returns
+	-------
+	obj
+		the texture of the image
+	"""
+
+	texture = _textures.get(path)
+	if texture is None:
+		texture = _add_texture(path, *_pixels(path))
+	return texture
+
+def alpha_mask(path):
+	""" Returns the hit mask of an image loaded with image() or preload(),
+	made from the same pixels as its texture.
+
+	Parameters
+	----------
+	path : str
+		path of the image file relative to the game
+
+	Returns
+	-------
+	obj
+		the AlphaMask of the image
+	"""
+
+	if path not in _masks:
+		image(path)
+	return _masks[path]
+
+def release_textures(directory):
+	""" Frees the memory of the atlas textures of the images of a directory,
+	by shrinking each of them to one pixel. The textures themselves are kept,
+	so the sprites and vertex lists drawing them do not change, but they must
+	not be drawn until restore_textures() is called.
+
+	Parameters
+	----------
+	directory : str
+		the directory of the images, such as 'assets/gameimages'
+	"""
+
+	texture_bin = _texture_bins.get(directory)
+	if texture_bin is None:
+		return
+	for atlas in texture_bin.atlases:
+		texture = atlas.texture
+		pyglet.gl.glBindTexture(texture.target, texture.id)
+		pyglet.gl.glTexImage2D(texture.target, texture.level, pyglet.gl.GL_RGBA, 1, 1, 0,
+			pyglet.gl.GL_RGBA, pyglet.gl.GL_UNSIGNED_BYTE, None)
+		pyglet.gl.glBindTexture(texture.target, 0)
+
+def restore_textures(directory):
+	""" Gives the atlas textures of the images of a directory their size back,
+	and uploads the images into them again. The images come from the texture
+	cache, which is mapped and already decoded, or are decoded again if the
+	cache does not have them.
+
+	Parameters
+	----------
+	directory : str
+		the directory of the images, such as 'assets/gameimages'
+	"""
+
+	texture_bin = _texture_bins.get(directory)
+	if texture_bin is None:
+		return
+	for atlas in texture_bin.atlases:
+		texture = atlas.texture
+		blank = (pyglet.gl.GLubyte * (texture.width * texture.height * 4))()
+		pyglet.gl.glBindTexture(texture.target, texture.id)
+		pyglet.gl.glTexImage2D(texture.target, texture.level, pyglet.gl.GL_RGBA, texture.width,
+			texture.height, 0, pyglet.gl.GL_RGBA, pyglet.gl.GL_UNSIGNED_BYTE, blank)
+		pyglet.gl.glBindTexture(texture.target, 0)
+	for path, texture in _textures.items():
+		if os.path.dirname(path) == directory:
+			width, height, pixels = _pixels(path)
+			texture.blit_into(pyglet.image.ImageData(width, height, "RGBA", pixels), 0, 0, 0)
+
+def _load_source(path, streaming):
+	if bundle.archive is None or path not in bundle.archive.entries:
+		return pyglet.media.load(bundle.path(path), streaming=streaming)
+	# AVBIN ONLY LOADS FILES FROM A PATH, SO THE SOUNDS OF A BUNDLE, WHICH ARE ALL
+	# WAVE FILES, ARE READ FROM MEMORY BY THE WAVE LOADER OF PYGLET INSTEAD
+	source = pyglet.media.sources.loader.RIFFSourceLoader().load(path, io.BytesIO(bundle.read(path)))
+	if not streaming:
+		source = pyglet.media.StaticSource(source)
+	return source
+
+def _decode_sound(path):
+	return _load_source(path, False)
+
+def preload(images, sounds, max_workers=None, frame_time=1 / 60):
+	""" Decodes images and sound effects on a pool of threads, so that image()
+	and media() then return them at once. Only the textures are made on the
+	calling thread, which holds the GL context, as the decoded images come in.
+	The images of the texture cache are not decoded again, only uploaded. This
+	is a generator, which yields at least once per frame while it waits for
+	the threads, so the caller can keep drawing a loading screen.
+
+	Parameters
+	----------
+	images : list
+		paths of the images
+	sounds : list
+		paths of the sound effects, loaded as static sources
+	max_workers : int, optional
+		number of threads, one per core by default
+	frame_time : float, optional
+		longest wait between two yields, in seconds
+
+	Yields
+	------
+	int
+		the number of images and sounds loaded so far
+	"""
+
+	loaded = 0
+	executor = concurrent.futures.ThreadPoolExecutor(max_workers or os.cpu_count() or 1)
+	try:
+		pending = {}
+		cached_images = []
+		for path in images:
+			if path in _textures:
+				loaded += 1
+				continue
+			cached = texture_cache.get(path) if texture_cache else None
+			if cached is None:
+				pending[executor.submit(texcache.decode_source, path)] = path
+			else:
+				cached_images.append((path, cached))
+		for path in sounds:
+			pending[executor.submit(_decode_sound, path)] = path
+		# THE CACHED IMAGES ARE UPLOADED WHILE THE THREADS DECODE THE OTHERS
+		for path, (width, height, pixels) in cached_images:
+			_add_texture(path, width, height, pixels)
+			loaded += 1
+			yield loaded
+		while pending:
+			done, not_done = concurrent.futures.wait(pending, frame_time,
+				concurrent.futures.FIRST_COMPLETED)
+			for future in done:
+				path = pending.pop(future)
+				if path in sounds:
+					_sounds[path] = future.result()
+				else:
+					width, height, pixels = future.result()
+					_add_texture(path, width, height, pixels)
+				loaded += 1
+			yield loaded
+	finally:
+		executor.shutdown()
+
+# WHILE THE GAME IS IDLE, run_async() ONLY STEPS FOUR TIMES A SECOND
+idle_frame_time = 1 / 4
+_idle = [False]
+
+def set_idle(idle):
+	""" Sets whether the game is idle. run() already sleeps until the next
+	event when nothing is scheduled, and run_async() then steps at the rate of
+	idle_frame_time instead of every frame.
+	"""
+
+	_idle[0] = idle
+
+async def run_async(frame_time=1 / 60):
+	""" Runs the event loop of pyglet from an asyncio event loop, until every
+	window is closed or exit() is called. Each step polls the window events
+	without blocking, ticks the clock and redraws the windows like pyglet.app.run()
+	does, and then waits for the next scheduled function, for one frame at most,
+	so the coroutines of the asyncio loop run between frames.
+
+	Parameters
+	----------
+	frame_time : float, optional
+		longest wait between two steps, in seconds
+	"""
+
+	event_loop = pyglet.app.event_loop
+	platform_event_loop = pyglet.app.platform_event_loop
+	event_loop.has_exit = False
+	event_loop._legacy_setup()
+	platform_event_loop.start()
+	event_loop.dispatch_event("on_enter")
+	event_loop.is_running = True
+	try:
+		while not event_loop.has_exit:
+			platform_event_loop.step(0)
+			timeout = event_loop.idle()
+			step_time = idle_frame_time if _idle[0] else frame_time
+			await asyncio.sleep(step_time if timeout is None else min(timeout, step_time))
+	finally:
+		event_loop.is_running = False
+		event_loop.dispatch_event("on_exit")
+		platform_event_loop.stop()
+
+def media(path, streaming=True):
+	if not streaming and path in _sounds:
+		return _sounds[path]
+	return _load_source(path, streaming)
+
+def looping_player(source):
+	""" Returns a player that plays a sound over and over once started.
+
+	Parameters
+	----------
+	source : obj
+		the sound to loop, loaded with media()
+
+	Returns
+	-------
+	obj
+		the player of the sound
+	"""
+
+	looper = pyglet.media.SourceGroup(source.audio_format, None)
+	looper.loop = True
+	looper.queue(source)
+	player = pyglet.media.Player()
+	player.queue(looper)
+	return player
+
+def add_font(path):
+	pyglet.font.add_file(io.BytesIO(bundle.read(path)))
+
+def load_font(name, size=None, bold=False, italic=False):
+	return pyglet.font.load(name, size, bold=bold, italic=italic)
+
+def set_clear_color(red, green, blue, alpha):
+	pyglet.gl.glClearColor(red, green, blue, alpha)
+
+class LayeredBatch(pyglet.graphics.Batch):
+	"""
+	A class used to draw every layer of the scene in one batch. Layers are
+	ordered groups, and the batch counts how many draw calls and state changes
+	drawing it takes.
+
+	...
+
+	Attributes
+	----------
+	draw_calls : int
+		vertex domains drawn each time the batch is drawn
+	state_changes : int
+		group state changes made each time the batch is drawn
+
+	Methods
+	-------
+	draw()
+		draws the batch and adds its counts to the current frame
+	draw_layers(layers, exclude=False)
+		draws some layers of the batch and adds their counts to the current frame
+	"""
+
+	def __init__(self):
+		super(LayeredBatch, self).__init__()
+		self.draw_calls = 0
+		self.state_changes = 0
+		self._layer_draw_lists = {}
+
+	@staticmethod
+	def _count(draw_list):
+		# THE DRAW LIST HOLDS THE set_state/unset_state METHODS OF EACH GROUP AND
+		# ONE FUNCTION PER VERTEX DOMAIN. GROUPS THAT ONLY ORDER THEIR CHILDREN
+		# KEEP THE DO-NOTHING METHODS OF pyglet.graphics.Group AND ARE NOT COUNTED
+		state_changes = 0
+		domains = 0
+		for func in draw_list:
+			method = getattr(func, "__func__", None)
+			if method is None:
+				domains += 1
+			elif method not in (pyglet.graphics.Group.set_state, pyglet.graphics.Group.unset_state):
+				state_changes += 1
+		return domains, state_changes
+
+	def _update_draw_list(self):
+		super(LayeredBatch, self)._update_draw_list()
+		self.draw_calls, self.state_changes = self._count(self._draw_list)
+		# THE PART OF THE DRAW LIST OF EACH LAYER RUNS FROM ITS set_state METHOD
+		# TO ITS unset_state METHOD, THE NEXT FUNCTION BOUND TO THE SAME GROUP
+		self._layer_draw_lists = {}
+		start = 0
+		for group in self.top_groups:
+			end = start + 1
+			while getattr(self._draw_list[end], "__self__", None) is not group:
+				end += 1
+			draw_list = self._draw_list[start:end + 1]
+			self._layer_draw_lists[group] = (draw_list,) + self._count(draw_list)
+			start = end + 1
+
+	def draw(self):
+		super(LayeredBatch, self).draw()
+		render.frame.draw_calls += self.draw_calls
+		render.frame.state_changes += self.state_changes
+
+	def draw_layers(self, layers, exclude=False):
+		""" Draws some layers of the batch, in their order.
+
+		Parameters
+		----------
+		layers : list
+			the ordered groups of the layers
+		exclude : bool, optional
+			whether to draw every layer but the given ones instead
+		"""
+
+		if self._draw_list_dirty:
+			self._update_draw_list()
+		for group in self.top_groups:
+			if (group in layers) != exclude:
+				draw_list, draw_calls, state_changes = self._layer_draw_lists[group]
+				for func in draw_list:
+					func()
+				render.frame.draw_calls += draw_calls
+				render.frame.state_changes += state_changes
+
+class SceneCache:
+	"""
+	A class used to draw a scene whose layers mostly do not change. Every layer
+	but the dynamic ones is drawn once, and the window is then copied into a
+	texture. Until the cache is invalidated, each frame only draws that texture
+	and the dynamic layers over it. The window is copied with
+	glCopyTexSubImage2D, which needs no framebuffer object.
+
+	...
+
+	Attributes
+	----------
+	batch : obj
+		the LayeredBatch of the scene
+	dynamic_layers : list
+		the layers drawn on every frame, over the cached layers
+	texture : obj
+		the texture holding the cached layers, or None before the first draw
+	valid : bool
+		whether or not the texture holds the current scene
+	misses : int
+		number of times the cached layers were drawn
+
+	Methods
+	-------
+	invalidate()
+		makes the next draw redraw the cached layers
+	release()
+		deletes the texture, which the next draw makes again
+	draw(window)
+		draws the scene into a window
+	"""
+
+	def __init__(self, batch, dynamic_layers):
+		self.batch = batch
+		self.dynamic_layers = dynamic_layers
+		self.texture = None
+		self.valid = False
+		self.misses = 0
+
+	def invalidate(self):
+		self.valid = False
+
+	def release(self):
+		if self.texture is not None:
+			self.texture.delete()
+		self.texture = None
+		self.valid = False
+
+	def draw(self, window):
+		""" Draws the scene into a window, from the texture if it is valid.
+
+		Parameters
+		----------
+		window : obj
+			the window to draw into, which is the current window
+		"""
+
+		width, height = window.width, window.height
+		if self.texture is None or (self.texture.width, self.texture.height) != (width, height):
+			self.texture = pyglet.image.Texture.create(width, height,
+				min_filter=pyglet.gl.GL_NEAREST, mag_filter=pyglet.gl.GL_NEAREST)
+			self.valid = False
+		if self.valid:
+			self.texture.blit(0, 0)
+			render.frame.draw_calls += 1
+		else:
+			window.clear()
+			self.batch.draw_layers(self.dynamic_layers, exclude=True)
+			pyglet.gl.glBindTexture(self.texture.target, self.texture.id)
+			pyglet.gl.glCopyTexSubImage2D(self.texture.target, 0, 0, 0, 0, 0, width, height)
+			pyglet.gl.glBindTexture(self.texture.target, 0)
+			self.valid = True
+			self.misses += 1
+		self.batch.draw_layers(self.dynamic_layers)
+
+class ViewportGroup(pyglet.graphics.Group):
+	"""
+	A class used to draw the vertex lists of its children through a viewport:
+	moved and scaled from board coordinates to the screen, clipped to the
+	rectangle of the viewport, and blended like sprites are.
+
+	...
+
+	Attributes
+	----------
+	view : obj
+		the viewport, whose x, y, width, height, left, bottom and zoom are read
+		each time the group is drawn, so panning never touches the vertices
+	"""
+
+	def __init__(self, view, parent=None):
+		super(ViewportGroup, self).__init__(parent)
+		self.view = view
+
+	def set_state(self):
+		view = self.view
+		pyglet.gl.glPushMatrix()
+		pyglet.gl.glTranslatef(view.x - view.left * view.zoom, view.y - view.bottom * view.zoom, 0)
+		pyglet.gl.glScalef(view.zoom, view.zoom, 1)
+		pyglet.gl.glEnable(pyglet.gl.GL_SCISSOR_TEST)
+		pyglet.gl.glScissor(int(view.x), int(view.y), int(view.width), int(view.height))
+		pyglet.gl.glEnable(pyglet.gl.GL_BLEND)
+		pyglet.gl.glBlendFunc(pyglet.gl.GL_SRC_ALPHA, pyglet.gl.GL_ONE_MINUS_SRC_ALPHA)
+
+	def unset_state(self):
+		pyglet.gl.glDisable(pyglet.gl.GL_BLEND)
+		pyglet.gl.glDisable(pyglet.gl.GL_SCISSOR_TEST)
+		pyglet.gl.glPopMatrix()
+
+class Label(pyglet.text.Label):
+	"""
+	A class used to create text labels in a layer of a LayeredBatch.
+
+	A pyglet label given a group makes its own text groups, so every label
+	costs its own state changes and draw calls. This label reuses the text
+	groups of the other labels in the same layer, which lets the batch draw
+	all the labels of a layer that share a font texture at once.
+	"""
+
+	_layer_groups = {}
+
+	def _init_groups(self, group):
+		if not group:
+			return
+		groups = Label._layer_groups.get(group)
+		if groups is None:
+			top_group = layout.TextLayoutGroup(group)
+			groups = (top_group, pyglet.graphics.OrderedGroup(0, top_group),
+				layout.TextLayoutForegroundGroup(1, top_group),
+				layout.TextLayoutForegroundDecorationGroup(2, top_group))
+			Label._layer_groups[group] = groups
+		(self.top_group, self.background_group, self.foreground_group,
+			self.foreground_decoration_group) = groups
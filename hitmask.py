@@ -0,0 +1,99 @@
+""" Hit Masks
+This module contains the alpha masks the game tiles are hit-tested with, so
+that a click only counts on the opaque pixels of a tile and not on its
+transparent margins. The mask of an image is made once, when it is loaded, from
+the same RGBA pixels its texture is uploaded from: one bit per pixel, set where
+the pixel is opaque, packed eight to a byte, row by row from the bottom row up
+as pyglet stores the pixels. Testing a click is then one bounds check and one
+bit lookup, without reading the image again. The bits are packed by the string
+and integer conversions of Python, so making a mask takes no loop per pixel.
+This module does not require 'pyglet' to be installed.
+
+This module can be imported and contains the following:
+	* AlphaMask - creates the packed alpha mask of an image
+"""
+
+class AlphaMask:
+	"""
+	A class used to hit-test the pixels of an image, from one bit per pixel.
+
+	...
+
+	Attributes
+	----------
+	width : int
+		width of the image
+	height : int
+		height of the image
+	stride : int
+		bytes per row of the mask
+	bits : bytes
+		the packed bits, row by row from the bottom row up, the leftmost pixel
+		of each byte in its highest bit
+
+	Methods
+	-------
+	from_pixels(width, height, pixels, threshold=128)
+		makes the mask of RGBA pixels
+	hit(x, y)
+		returns whether or not a pixel of the image is opaque
+	"""
+
+	__slots__ = ("width", "height", "stride", "bits")
+
+	def __init__(self, width, height, bits):
+		self.width = width
+		self.height = height
+		self.stride = (width + 7) // 8
+		self.bits = bits
+
+	@classmethod
+	def from_pixels(cls, width, height, pixels, threshold=128):
+		""" Makes the mask of an image from its RGBA pixels.
+
+		Parameters
+		----------
+		width : int
+			width of the image
+		height : int
+			height of the image
+		pixels : bytes
+			the RGBA pixels of the image, row by row from the bottom row up
+		threshold : int, optional
+			lowest alpha of an opaque pixel
+
+		Returns
+		-------
+		obj
+			the AlphaMask of the image
+		"""
+
+		# EACH ALPHA BYTE BECOMES THE DIGIT '1' OR '0', AND EACH ROW OF DIGITS,
+		# PADDED TO WHOLE BYTES, IS READ AS ONE BINARY NUMBER
+		digits = b"0" * threshold + b"1" * (256 - threshold)
+		alpha = bytes(pixels)[3::4].translate(digits)
+		stride = (width + 7) // 8
+		padding = b"0" * (stride * 8 - width)
+		rows = [int(alpha[row:row + width] + padding, 2).to_bytes(stride, "big")
+			for row in range(0, width * height, width)]
+		return cls(width, height, b"".join(rows))
+
+	def hit(self, x, y):
+		""" Returns whether or not a pixel of the image is opaque.
+
+		Parameters
+		----------
+		x : int
+			horizontal position of the pixel from the left of the image
+		y : int
+			vertical position of the pixel from the bottom of the image
+
+		Returns
+		-------
+		bool
+			True if the pixel is in the image and opaque
+		"""
+
+		if 0 <= x < self.width and 0 <= y < self.height:
+			return bool(self.bits[y * self.stride + (x >> 3)] & (0x80 >> (x & 7)))
+		return False
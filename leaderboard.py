@@ -0,0 +1,636 @@
+""" Leaderboard
+This module contains the tools to read and write the leaderboard file and to
+rank scores against it. Every line of the leaderboard file is one record made
+of a score, a name, and the difficulty the score was made on. Older records
+have no difficulty. This module does not require 'pyglet' to be installed.
+
+Several game instances may share one leaderboard file. Each record is appended
+whole, in one write made while holding a lock on the file, so records of
+different instances never interleave. Readers take no lock: they only read the
+complete lines of the file, and leave a line still being written for their
+next read.
+
+The leaderboard file only holds the records added since it was last compacted.
+Compacting it adds its records to a summary file, which keeps the number of
+times each score was made on each difficulty and the highest scores, moves the
+records themselves to an archived segment, and empties the leaderboard file
+again, keeping only a header line with the generation of the file. The summary
+is written to the generation it was made for, so readers pair a summary with
+the leaderboard file it summarizes, and wait for a compaction to finish when
+they do not match. Only the newest archived segments are kept. Compaction is
+done in the background by a Compactor, and while appending a record that would
+make the leaderboard file larger than its maximum size.
+
+This module can be imported and contains the following:
+	* Default sizes of the leaderboard file, the top list and the archive
+	* parse_record - splits one line of the leaderboard file into its fields
+	* summary_path - returns the path of the summary of a leaderboard file
+	* archive_path - returns the path of an archived segment
+	* append_record - appends one record to the leaderboard file
+	* compact - compacts the leaderboard file into its summary and archive
+	* ScoreTree - creates a Fenwick tree counting the scores in each bucket
+	* RankIndex - creates an index ranking scores overall and per difficulty
+	* Leaderboard - creates a view of the leaderboard file that reads the
+		records added by every instance and keeps the top scores
+	* Compactor - creates a thread compacting the leaderboard file in the
+		background
+"""
+
+import array, bisect, os, threading, time
+
+try:
+	import fcntl
+except ImportError:
+	fcntl = None
+	import msvcrt
+
+# WINDOWS LOCKS ARE MANDATORY, SO THE LOCK IS TAKEN ON A BYTE FAR PAST THE END
+# OF THE FILE, WHICH READERS NEVER READ
+LOCK_OFFSET = 0x7FFFFFFE
+
+# BYTES THE LEADERBOARD FILE MAY GROW TO, HIGHEST SCORES KEPT IN THE SUMMARY,
+# AND ARCHIVED SEGMENTS KEPT
+MAX_SIZE = 64 * 1024
+TOP_SIZE = 10
+KEEP_ARCHIVES = 10
+
+def parse_record(line):
+	""" Splits one line of the leaderboard file into its fields.
+
+	Parameters
+	----------
+	line : str
+		one line of the leaderboard file
+
+	Returns
+	-------
+	tuple
+		the score, name and difficulty of the record, where the difficulty is
+		an empty string for older records, or None if the line is not a
+		complete record
+	"""
+
+	fields = line.split()
+	if len(fields) < 2 or not fields[0].isdigit():
+		return None
+	difficulty = fields[2] if len(fields) > 2 else ""
+	return int(fields[0]), fields[1], difficulty
+
+def summary_path(path):
+	return os.path.splitext(path)[0] + ".summary"
+
+def archive_path(path, generation):
+	base, extension = os.path.splitext(path)
+	return os.path.join(base + "-archive", "{:06}{}".format(generation, extension))
+
+def _generation(first_line):
+	""" Returns the generation of a leaderboard file from its first line, 0 for
+	a file without a header, or None if the header is not complete yet.
+	"""
+
+	if not first_line.startswith(b"#"):
+		return 0
+	if not first_line.endswith(b"\n"):
+		return None
+	return int(first_line.split()[1])
+
+def _read_all(descriptor):
+	os.lseek(descriptor, 0, os.SEEK_SET)
+	chunks = []
+	chunk = os.read(descriptor, 65536)
+	while chunk:
+		chunks.append(chunk)
+		chunk = os.read(descriptor, 65536)
+	return b"".join(chunks)
+
+def _lock(descriptor):
+	if fcntl:
+		fcntl.flock(descriptor, fcntl.LOCK_EX)
+	else:
+		os.lseek(descriptor, LOCK_OFFSET, os.SEEK_SET)
+		msvcrt.locking(descriptor, msvcrt.LK_LOCK, 1)
+
+def _unlock(descriptor):
+	if fcntl:
+		fcntl.flock(descriptor, fcntl.LOCK_UN)
+	else:
+		os.lseek(descriptor, LOCK_OFFSET, os.SEEK_SET)
+		msvcrt.locking(descriptor, msvcrt.LK_UNLCK, 1)
+
+def append_record(path, score, name, difficulty="", max_size=None):
+	""" Appends one record to the leaderboard file, as one line written at
+	once while holding the lock of the file. If the record would make the file
+	larger than its maximum size, the file is compacted first.
+
+	Parameters
+	----------
+	path : str
+		path of the leaderboard file
+	score : int
+		the score of the record
+	name : str
+		the name of the player
+	difficulty : str, optional
+		the difficulty the score was made on
+	max_size : int, optional
+		bytes the leaderboard file may grow to, or None for no limit
+	"""
+
+	line = " ".join(field for field in (str(score), name, difficulty) if field) + "\n"
+	descriptor = os.open(path, os.O_RDWR | os.O_APPEND | os.O_CREAT | getattr(os, "O_BINARY", 0), 0o644)
+	try:
+		_lock(descriptor)
+		try:
+			# A LINE LEFT INCOMPLETE BY AN INSTANCE THAT STOPPED WHILE WRITING IS ENDED
+			# FIRST, SO THAT IT DOES NOT SWALLOW THIS RECORD
+			size = os.lseek(descriptor, 0, os.SEEK_END)
+			if max_size and size + len(line) > max_size:
+				try:
+					_compact_locked(path, descriptor)
+				except OSError:
+					pass
+				size = os.lseek(descriptor, 0, os.SEEK_END)
+			if size:
+				os.lseek(descriptor, size - 1, os.SEEK_SET)
+				if os.read(descriptor, 1) != b"\n":
+					line = "\n" + line
+			os.write(descriptor, line.encode("utf-8"))
+		finally:
+			_unlock(descriptor)
+	finally:
+		os.close(descriptor)
+
+def compact(path, top_size=TOP_SIZE, keep_archives=KEEP_ARCHIVES):
+	""" Compacts the leaderboard file while holding its lock: adds its records
+	to the summary, moves them to a new archived segment, and empties the file.
+
+	Parameters
+	----------
+	path : str
+		path of the leaderboard file
+	top_size : int, optional
+		number of highest scores kept in the summary
+	keep_archives : int, optional
+		number of archived segments kept
+	"""
+
+	descriptor = os.open(path, os.O_RDWR | os.O_CREAT | getattr(os, "O_BINARY", 0), 0o644)
+	try:
+		_lock(descriptor)
+		try:
+			_compact_locked(path, descriptor, top_size, keep_archives)
+		finally:
+			_unlock(descriptor)
+	finally:
+		os.close(descriptor)
+
+def _compact_locked(path, descriptor, top_size=TOP_SIZE, keep_archives=KEEP_ARCHIVES):
+	data = _read_all(descriptor)
+	first_line = data[:data.find(b"\n") + 1]
+	generation = _generation(first_line) or 0
+	header = first_line if first_line.startswith(b"#") else b""
+	complete = data[:data.rfind(b"\n") + 1]
+	board = Leaderboard(path, top_size, read=False)
+	# A COMPACTION THAT STOPPED AFTER WRITING ITS SUMMARY ALREADY ADDED THESE
+	# RECORDS, AND ONLY THE LEADERBOARD FILE IS LEFT TO EMPTY
+	if board._load_summary() != generation + 1:
+		records = complete[len(header):]
+		for line in records.decode("utf-8", "replace").splitlines():
+			record = parse_record(line)
+			if record:
+				board._add(*record)
+		segment = archive_path(path, generation)
+		os.makedirs(os.path.dirname(segment), exist_ok=True)
+		archive_file = open(segment, "wb")
+		archive_file.write(records)
+		archive_file.close()
+		board._write_summary(generation + 1)
+	# THE HEADER AND ANY LINE LEFT INCOMPLETE ARE WRITTEN BACK AT ONCE
+	os.ftruncate(descriptor, 0)
+	os.lseek(descriptor, 0, os.SEEK_SET)
+	os.write(descriptor, "#generation {}\n".format(generation + 1).encode("ascii") + data[len(complete):])
+	archive = os.path.dirname(archive_path(path, 0))
+	if os.path.isdir(archive):
+		segments = sorted(os.listdir(archive))
+		for name in segments[:max(0, len(segments) - keep_archives)]:
+			os.remove(os.path.join(archive, name))
+
+class ScoreTree:
+	"""
+	A class used to count scores in a Fenwick tree with one bucket per score,
+	so that adding a score and counting the scores above it both take
+	O(log n) time, where n is the highest score.
+
+	...
+
+	Attributes
+	----------
+	counts : array
+		number of times each score was made
+	tree : array
+		the Fenwick tree over counts
+	total : int
+		number of scores added
+
+	Methods
+	-------
+	add(score, count)
+		adds a score to the tree, growing the tree if needed
+	count_upto(score)
+		returns the number of scores less than or equal to a score
+	rank(score)
+		returns the place of a score, counting from 1 for the highest
+	"""
+
+	__slots__ = ("counts", "tree", "total")
+
+	def __init__(self, size=256):
+		""" Makes an empty tree.
+
+		Parameters
+		----------
+		size : int, optional
+			number of buckets to start with
+		"""
+
+		self.counts = array.array("L", [0]) * size
+		self.tree = array.array("L", self.counts)
+		self.total = 0
+
+	def _grow(self, score):
+		size = len(self.counts)
+		while size <= score:
+			size *= 2
+		self.counts.extend(array.array("L", [0]) * (size - len(self.counts)))
+		# BUILDS THE LARGER TREE FROM THE COUNTS IN O(size)
+		tree = array.array("L", self.counts)
+		for index in range(1, size + 1):
+			parent = index + (index & -index)
+			if parent <= size:
+				tree[parent - 1] += tree[index - 1]
+		self.tree = tree
+
+	def add(self, score, count=1):
+		if score >= len(self.counts):
+			self._grow(score)
+		self.counts[score] += count
+		self.total += count
+		tree = self.tree
+		size = len(tree)
+		index = score + 1
+		while index <= size:
+			tree[index - 1] += count
+			index += index & -index
+
+	def count_upto(self, score):
+		tree = self.tree
+		index = min(score + 1, len(tree))
+		count = 0
+		while index > 0:
+			count += tree[index - 1]
+			index -= index & -index
+		return count
+
+	def rank(self, score):
+		return self.total - self.count_upto(score) + 1
+
+class RankIndex:
+	"""
+	A class used to rank scores against every score of the leaderboard,
+	overall and for each difficulty. The index is loaded once and then kept
+	up to date by adding each new score.
+
+	...
+
+	Attributes
+	----------
+	overall : obj
+		ScoreTree of every score
+	difficulties : dict
+		ScoreTree of the scores of each difficulty
+
+	Methods
+	-------
+	load(lines)
+		adds the scores of the lines of a leaderboard file
+	add(score, difficulty, count)
+		adds a score made a number of times
+	rank(score, difficulty)
+		returns the place of a score and the number of scores it is ranked
+		against, overall and for its difficulty
+	"""
+
+	__slots__ = ("overall", "difficulties")
+
+	def __init__(self):
+		self.overall = ScoreTree()
+		self.difficulties = {}
+
+	def load(self, lines):
+		""" Adds the scores of the lines of a leaderboard file.
+
+		Parameters
+		----------
+		lines : iterable
+			lines of the leaderboard file
+		"""
+
+		for line in lines:
+			record = parse_record(line)
+			if record:
+				self.add(record[0], record[2])
+
+	def add(self, score, difficulty="", count=1):
+		self.overall.add(score, count)
+		if difficulty:
+			tree = self.difficulties.get(difficulty)
+			if tree is None:
+				tree = self.difficulties[difficulty] = ScoreTree()
+			tree.add(score, count)
+
+	def rank(self, score, difficulty=""):
+		""" Returns the place of a score, overall and for its difficulty.
+
+		Parameters
+		----------
+		score : int
+			the score to rank
+		difficulty : str, optional
+			the difficulty the score was made on
+
+		Returns
+		-------
+		tuple
+			the overall place and number of scores, followed by the place and
+			number of scores of the difficulty
+		"""
+
+		tree = self.difficulties.get(difficulty)
+		if tree is None:
+			tree = ScoreTree(1)
+		return (self.overall.rank(score), self.overall.total, tree.rank(score), tree.total)
+
+
+class Leaderboard:
+	"""
+	A class used to read the leaderboard shared by every game instance: the
+	summary of the records compacted so far, and the records appended to the
+	leaderboard file since. Each refresh only reads the records appended since
+	the last one, adds them to the rank index, and keeps the highest scores.
+
+	...
+
+	Attributes
+	----------
+	path : str
+		path of the leaderboard file
+	top_size : int
+		number of highest scores kept
+	max_size : int
+		bytes the leaderboard file may grow to, or None for no limit
+	index : obj
+		RankIndex of every record read
+	generation : int
+		generation of the leaderboard file read, or None before the first read
+	offset : int
+		number of bytes of the file read so far, always at the end of a line
+
+	Methods
+	-------
+	refresh()
+		reads the records appended to the file since the last refresh
+	add(score, name, difficulty)
+		appends a record to the file
+	top(count)
+		returns the records of the highest scores
+	"""
+
+	__slots__ = ("path", "top_size", "max_size", "index", "generation", "offset", "_top", "_count")
+
+	def __init__(self, path, top_size=TOP_SIZE, max_size=None, read=True):
+		""" Reads the summary and the leaderboard file.
+
+		Parameters
+		----------
+		path : str
+			path of the leaderboard file
+		top_size : int, optional
+			number of highest scores kept
+		max_size : int, optional
+			bytes the leaderboard file may grow to when adding a record
+		read : bool, optional
+			whether or not to read the leaderboard now
+		"""
+
+		self.path = path
+		self.top_size = top_size
+		self.max_size = max_size
+		self._reset()
+		if read:
+			self.refresh()
+
+	def _reset(self):
+		self.index = RankIndex()
+		self.generation = None
+		self.offset = 0
+		# THE HIGHEST SCORES AS (-score, order, name, difficulty), SO THAT SORTING
+		# PUTS THE HIGHEST FIRST AND THE OLDEST FIRST AMONG EQUAL SCORES
+		self._top = []
+		self._count = 0
+
+	def _state(self):
+		return self.index, self.generation, self.offset, self._top, self._count
+
+	def _set_state(self, state):
+		self.index, self.generation, self.offset, self._top, self._count = state
+
+	def refresh(self, attempts=10):
+		""" Reads the complete records appended to the file since the last
+		refresh. If the file was compacted since, the new summary is read
+		first. A refresh made during a compaction is tried again a little
+		later.
+
+		Parameters
+		----------
+		attempts : int, optional
+			number of times to try reading a consistent leaderboard
+
+		Returns
+		-------
+		int
+			number of records read
+		"""
+
+		for attempt in range(attempts):
+			count = self._read()
+			if count is not None:
+				return count
+			time.sleep(0.01)
+		return 0
+
+	def _read(self):
+		try:
+			leaderboard_file = open(self.path, "rb")
+		except FileNotFoundError:
+			return 0
+		try:
+			first_line = leaderboard_file.readline()
+			generation = _generation(first_line)
+			if generation is None:
+				return None
+			old_state = self._state()
+			if generation != self.generation or os.fstat(leaderboard_file.fileno()).st_size < self.offset:
+				self._reset()
+				if self._load_summary() != generation:
+					self._set_state(old_state)
+					return None
+				self.generation = generation
+				self.offset = len(first_line) if generation else 0
+			leaderboard_file.seek(self.offset)
+			data = leaderboard_file.read()
+			# A COMPACTION DURING THE READ CHANGES THE FIRST LINE
+			leaderboard_file.seek(0)
+			if leaderboard_file.readline() != first_line:
+				self._set_state(old_state)
+				return None
+		finally:
+			leaderboard_file.close()
+		# A LINE WITHOUT ITS NEWLINE IS STILL BEING WRITTEN
+		complete = data[:data.rfind(b"\n") + 1]
+		self.offset += len(complete)
+		count = 0
+		for line in complete.decode("utf-8", "replace").splitlines():
+			record = parse_record(line)
+			if record:
+				self._add(*record)
+				count += 1
+		return count
+
+	def _load_summary(self):
+		""" Adds the counts and highest scores of the summary.
+
+		Returns
+		-------
+		int
+			the generation of the leaderboard file the summary was made for, or
+			0 if there is no summary
+		"""
+
+		try:
+			summary_file = open(summary_path(self.path), "r", encoding="utf-8")
+		except FileNotFoundError:
+			return 0
+		generation = 0
+		for line in summary_file:
+			fields = line.split()
+			if fields[0] == "#summary":
+				generation = int(fields[1])
+			elif fields[0] == "top":
+				self._add_top(int(fields[1]), fields[2], "" if fields[3] == "-" else fields[3])
+			elif fields[0] == "count":
+				self.index.add(int(fields[2]), "" if fields[1] == "-" else fields[1], int(fields[3]))
+		summary_file.close()
+		return generation
+
+	def _write_summary(self, generation):
+		""" Replaces the summary with the counts and highest scores read. """
+		lines = ["#summary {}\n".format(generation)]
+		for score, order, name, difficulty in self._top:
+			lines.append("top {} {} {}\n".format(-score, name, difficulty or "-"))
+		# SCORES OF OLDER RECORDS ARE ONLY IN THE OVERALL COUNTS
+		undated = array.array("L", self.index.overall.counts)
+		for difficulty, tree in sorted(self.index.difficulties.items()):
+			for score, count in enumerate(tree.counts):
+				if count:
+					lines.append("count {} {} {}\n".format(difficulty, score, count))
+					undated[score] -= count
+		for score, count in enumerate(undated):
+			if count:
+				lines.append("count - {} {}\n".format(score, count))
+		path = summary_path(self.path)
+		summary_file = open(path + ".tmp", "w", encoding="utf-8")
+		summary_file.writelines(lines)
+		summary_file.close()
+		os.replace(path + ".tmp", path)
+
+	def _add(self, score, name, difficulty):
+		self.index.add(score, difficulty)
+		self._add_top(score, name, difficulty)
+
+	def _add_top(self, score, name, difficulty):
+		self._count += 1
+		if len(self._top) < self.top_size or -score < self._top[-1][0]:
+			bisect.insort(self._top, (-score, self._count, name, difficulty))
+			del self._top[self.top_size:]
+
+	def add(self, score, name, difficulty=""):
+		""" Appends a record to the file. The record is read back by the next
+		refresh, along with the records of the other instances.
+		"""
+
+		append_record(self.path, score, name, difficulty, self.max_size)
+
+	def top(self, count):
+		return [(-score, name, difficulty) for score, order, name, difficulty in self._top[:count]]
+
+class Compactor(threading.Thread):
+	"""
+	A class used to compact the leaderboard file in the background, once it
+	is half as large as its maximum size, so that appending a record rarely
+	has to compact it. It also finishes a compaction that was stopped halfway.
+
+	...
+
+	Attributes
+	----------
+	path : str
+		path of the leaderboard file
+	max_size : int
+		bytes the leaderboard file may grow to
+	interval : float
+		seconds between two checks of the leaderboard file
+	stopped : obj
+		event set to stop the thread
+
+	Methods
+	-------
+	run()
+		checks the leaderboard file and compacts it until stopped
+	stop()
+		stops the thread after its current check
+	"""
+
+	def __init__(self, path, max_size=MAX_SIZE, interval=30):
+		super(Compactor, self).__init__(name="leaderboard-compactor", daemon=True)
+		self.path = path
+		self.max_size = max_size
+		self.interval = interval
+		self.stopped = threading.Event()
+
+	def _needs_compaction(self):
+		try:
+			leaderboard_file = open(self.path, "rb")
+		except FileNotFoundError:
+			return False
+		try:
+			size = os.fstat(leaderboard_file.fileno()).st_size
+			generation = _generation(leaderboard_file.readline())
+		finally:
+			leaderboard_file.close()
+		if size > self.max_size // 2:
+			return True
+		# A SUMMARY AHEAD OF THE LEADERBOARD FILE IS LEFT BY A STOPPED COMPACTION
+		return generation is not None and Leaderboard(self.path, read=False)._load_summary() > generation
+
+	def run(self):
+		while True:
+			try:
+				if self._needs_compaction():
+					compact(self.path)
+			except OSError:
+				pass
+			if self.stopped.wait(self.interval):
+				return
+
+	def stop(self):
+		self.stopped.set()
@@ -0,0 +1,137 @@
+""" Loading Screen
+This module contains the loading screen of the game, which the game window
+shows while the renderer backend decodes the images and sound effects of the
+game on a pool of threads, one per core. Only the textures are made on the main
+thread, between two frames of the loading screen, so the window shows up at
+once and the 'interface' module is then built from assets already decoded.
+Images are decoded in parallel where the decoder releases the GIL, as Pillow
+does; the pure Python decoders of pyglet take turns instead. This module
+requires the 'render' and 'texcache' modules.
+
+This module can be imported and contains the following:
+	* sound_names - paths of the sound effects decoded while loading
+	* LoadingScreen - creates the progress bar of the loading screen
+	* load - loads the assets of the game while showing the loading screen
+"""
+
+import time, render, texcache
+
+# THE BACKGROUND MUSIC IS STREAMED, SO ONLY THE SOUND EFFECTS ARE DECODED AHEAD
+sound_names = ["assets/music/click.wav", "assets/music/correct.wav", "assets/music/timeout.wav"]
+
+class LoadingScreen:
+	"""
+	A class used to draw a progress bar, with the percentage loaded above it,
+	in the middle of a window.
+
+	...
+
+	Attributes
+	----------
+	batch : obj
+		the LayeredBatch of the screen
+	label : obj
+		label displaying the percentage loaded
+	bar : obj
+		vertex list of the frame and of the filled part of the bar
+	x : float
+		horizontal position of the bar
+	y : float
+		vertical position of the bar
+	width : int
+		width of the bar
+	height : int
+		height of the bar
+
+	Methods
+	-------
+	set_progress(fraction)
+		fills the bar up to a fraction of its width
+	draw(window)
+		handles the events of the window and draws the screen into it
+	delete()
+		removes the label and the bar from the batch
+	"""
+
+	__slots__ = ("batch", "label", "bar", "x", "y", "width", "height")
+
+	def __init__(self, window, width=400, height=16):
+		""" Places the bar in the middle of the window.
+
+		Parameters
+		----------
+		window : obj
+			the window the screen is drawn into
+		width : int, optional
+			width of the bar
+		height : int, optional
+			height of the bar
+		"""
+
+		self.batch = render.LayeredBatch()
+		self.x = (window.width - width) / 2
+		self.y = (window.height - height) / 2
+		self.width = width
+		self.height = height
+		self.bar = self.batch.add(8, render.GL_QUADS, render.OrderedGroup(0),
+			('v2f', [0] * 16), ('c3B', (80, 80, 80) * 4 + (255, 255, 255) * 4))
+		self.label = render.Label("", font_size = 18, x=window.width/2, y=self.y+height+20,
+			anchor_x="center", anchor_y="baseline", batch = self.batch, group = render.OrderedGroup(1))
+		self.set_progress(0)
+
+	def set_progress(self, fraction):
+		left, bottom = self.x, self.y
+		right, top = left + self.width, bottom + self.height
+		filled = left + self.width * fraction
+		self.bar.vertices[:] = (
+			left, bottom, right, bottom, right, top, left, top,
+			left, bottom, filled, bottom, filled, top, left, top)
+		self.label.text = "LOADING {}%".format(int(fraction * 100))
+
+	def draw(self, window):
+		window.dispatch_events()
+		if window.has_exit:
+			return
+		window.clear()
+		self.batch.draw()
+		window.flip()
+
+	def delete(self):
+		self.label.delete()
+		self.bar.delete()
+
+def load(window, max_workers=None, frame_time=1 / 60):
+	""" Loads the images of the texture cache list and the sound effects, and
+	draws the loading screen into the window at most once per frame until they
+	are loaded.
+
+	Parameters
+	----------
+	window : obj
+		the game window
+	max_workers : int, optional
+		number of decoding threads, one per core by default
+	frame_time : float, optional
+		shortest time between two frames of the loading screen, in seconds
+
+	Returns
+	-------
+	bool
+		True if every asset was loaded, or False if the window was closed first
+	"""
+
+	images = texcache.asset_names()
+	total = len(images) + len(sound_names)
+	screen = LoadingScreen(window)
+	screen.draw(window)
+	last_frame = time.perf_counter()
+	for loaded in render.preload(images, sound_names, max_workers, frame_time):
+		if window.has_exit:
+			break
+		now = time.perf_counter()
+		if now - last_frame >= frame_time:
+			screen.set_progress(loaded / total)
+			screen.draw(window)
+			last_frame = now
+	screen.delete()
+	return not window.has_exit
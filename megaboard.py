@@ -0,0 +1,345 @@
+""" Mega Board
+This module contains the board of the mega-board mode of the game, a board of
+far more tiles than fit on the screen, such as 100 by 100, which the player
+pans and zooms through a viewport. The board is kept as data, an array of tile
+IDs, and no sprite is made for any of its tiles. Instead, the board is cut into
+square chunks of tiles, and only the chunks inside the viewport have vertex
+lists in the batch, made when they come into view and deleted when they leave
+it, so the cost of drawing a frame depends on the tiles in view rather than on
+the size of the board.
+
+The vertices of a chunk are in board coordinates, where a tile is as large as
+its image, and never change while the viewport moves. The viewport group of the
+'render' module moves and scales them to the screen and clips them to the
+viewport as the board is drawn, and clicks are hit-tested through the same
+transform, from the screen back to a tile of the board, and then to a pixel of
+its image when the board has the hit masks of the tiles. This module requires
+the 'render' module.
+
+This module can be imported and contains the following:
+	* CHUNK - number of tiles on each side of a chunk
+	* MegaBoard - creates a board drawn one visible chunk at a time
+"""
+
+import render
+
+# NUMBER OF TILES ON EACH SIDE OF A CHUNK
+CHUNK = 16
+
+class MegaBoard:
+	"""
+	A class used to create a board larger than the screen, drawn through a
+	viewport one visible chunk at a time.
+
+	...
+
+	Attributes
+	----------
+	columns : int
+		number of columns of the board
+	rows : int
+		number of rows of the board
+	tile_size : int
+		width and height of a tile in board coordinates
+	tiles : array
+		tile ID of each tile of the board, row by row from the bottom row
+	x : int
+		horizontal position of the viewport on the screen
+	y : int
+		vertical position of the viewport on the screen
+	width : int
+		width of the viewport on the screen
+	height : int
+		height of the viewport on the screen
+	left : float
+		horizontal board coordinate at the left edge of the viewport
+	bottom : float
+		vertical board coordinate at the bottom edge of the viewport
+	zoom : float
+		screen pixels per unit of board coordinates
+	chunks : dict
+		vertex lists of each chunk in view, by chunk column and row
+	visible : bool
+		whether or not the board is shown
+	dragging : bool
+		whether or not the board was panned since the mouse was pressed
+	tile_masks : list
+		AlphaMasks of the tiles, indexed by tile ID, or None to hit-test the
+		whole tiles
+
+	Methods
+	-------
+	set_tiles(tiles)
+		changes the tiles of the board
+	board_show()
+		makes the board visible in the screen
+	board_clear()
+		makes the board invisible in the screen
+	update()
+		makes the vertex lists of the chunks in view and deletes the others
+	pan(dx, dy)
+		moves the board by a distance on the screen
+	zoom_at(x, y, factor)
+		scales the board around a point of the screen
+	center_on(index)
+		pans the board to put a tile in the middle of the viewport
+	tile_at(x, y)
+		returns the opaque tile under a point of the screen
+	screen_position(index)
+		returns the middle of a tile on the screen
+	"""
+
+	__slots__ = ("columns", "rows", "tile_size", "tiles", "x", "y", "width", "height", "left",
+		"bottom", "zoom", "chunks", "visible", "dragging", "batch", "tex_coords", "groups",
+		"group_of", "view_group", "tile_masks")
+
+	# THE ZOOM IS KEPT BETWEEN THESE, SO THE VIEWPORT NEVER HOLDS MORE THAN A
+	# FEW HUNDRED TILES, WHATEVER THE SIZE OF THE BOARD
+	min_zoom = 0.25
+	max_zoom = 2
+
+	def __init__(self, columns, rows, tile_images, batch, group, x, y, width, height, tile_masks=None):
+		""" Initializes the size of the board and the position of its viewport.
+
+		Parameters
+		----------
+		columns : int
+			number of columns of the board
+		rows : int
+			number of rows of the board
+		tile_images : list
+			textures of the tiles, indexed by tile ID
+		batch : graphics object
+			the batch to which the vertex lists of the chunks are added
+		group : graphics object
+			the layer of the batch in which the board is drawn
+		x : int
+			horizontal position of the viewport on the screen
+		y : int
+			vertical position of the viewport on the screen
+		width : int
+			width of the viewport on the screen
+		height : int
+			height of the viewport on the screen
+		tile_masks : list, optional
+			AlphaMasks of the tiles, indexed by tile ID
+		"""
+
+		self.columns = columns
+		self.rows = rows
+		self.tile_size = tile_images[0].width
+		self.tiles = None
+		self.x = x
+		self.y = y
+		self.width = width
+		self.height = height
+		self.left = 0.0
+		self.bottom = 0.0
+		self.zoom = 1.0
+		self.chunks = {}
+		self.visible = False
+		self.dragging = False
+		self.tile_masks = tile_masks
+		self.batch = batch
+		self.view_group = render.ViewportGroup(self, group)
+		# TILES WHOSE TEXTURES ARE IN THE SAME ATLAS SHARE A TEXTURE GROUP, SO
+		# EACH CHUNK TAKES ONE VERTEX LIST PER TEXTURE IT USES
+		self.tex_coords = [tuple(image.tex_coords) for image in tile_images]
+		self.groups = []
+		self.group_of = []
+		for image in tile_images:
+			texture_group = render.TextureGroup(image.get_texture(), self.view_group)
+			if texture_group not in self.groups:
+				self.groups.append(texture_group)
+			self.group_of.append(self.groups.index(texture_group))
+
+	def set_tiles(self, tiles):
+		""" Changes the tiles of the board, remaking the chunks in view.
+
+		Parameters
+		----------
+		tiles : array
+			tile ID of each tile of the board
+		"""
+
+		self.tiles = tiles
+		self._delete_chunks()
+		self.update()
+
+	def board_show(self):
+		self.visible = True
+		self.update()
+
+	def board_clear(self):
+		self.visible = False
+		self._delete_chunks()
+
+	def _delete_chunks(self):
+		for vertex_lists in self.chunks.values():
+			for vertex_list in vertex_lists:
+				vertex_list.delete()
+		self.chunks.clear()
+
+	def _make_chunk(self, chunk_column, chunk_row):
+		""" Makes the vertex lists of one chunk, one per texture group.
+
+		Parameters
+		----------
+		chunk_column : int
+			column of the chunk
+		chunk_row : int
+			row of the chunk
+
+		Returns
+		-------
+		list
+			the vertex lists of the chunk
+		"""
+
+		size = self.tile_size
+		tiles, tex_coords, group_of = self.tiles, self.tex_coords, self.group_of
+		quads = {}
+		first_column = chunk_column * CHUNK
+		last_column = min(first_column + CHUNK, self.columns)
+		for row in range(chunk_row * CHUNK, min(chunk_row * CHUNK + CHUNK, self.rows)):
+			base = row * self.columns
+			bottom, top = row * size, row * size + size
+			for column in range(first_column, last_column):
+				tile = tiles[base + column]
+				left, right = column * size, column * size + size
+				vertices, coordinates = quads.setdefault(group_of[tile], ([], []))
+				vertices.extend((left, bottom, right, bottom, right, top, left, top))
+				coordinates.extend(tex_coords[tile])
+		return [self.batch.add(len(vertices) // 2, render.GL_QUADS, self.groups[number],
+			("v2f", vertices), ("t3f", coordinates)) for number, (vertices, coordinates) in quads.items()]
+
+	def update(self):
+		""" Makes the vertex lists of the chunks that came into view, and
+		deletes those of the chunks that left it.
+		"""
+
+		if not self.visible or self.tiles is None:
+			return
+		span = self.tile_size * CHUNK
+		right = self.left + self.width / self.zoom
+		top = self.bottom + self.height / self.zoom
+		columns = range(max(0, int(self.left // span)), min((self.columns - 1) // CHUNK, int(right // span)) + 1)
+		rows = range(max(0, int(self.bottom // span)), min((self.rows - 1) // CHUNK, int(top // span)) + 1)
+		in_view = set((column, row) for column in columns for row in rows)
+		for chunk in [chunk for chunk in self.chunks if chunk not in in_view]:
+			for vertex_list in self.chunks.pop(chunk):
+				vertex_list.delete()
+		for chunk in in_view:
+			if chunk not in self.chunks:
+				self.chunks[chunk] = self._make_chunk(*chunk)
+
+	def _clamp(self):
+		# THE VIEWPORT NEVER LEAVES THE BOARD, UNLESS THE BOARD IS SMALLER THAN IT
+		self.left = max(0.0, min(self.left, self.columns * self.tile_size - self.width / self.zoom))
+		self.bottom = max(0.0, min(self.bottom, self.rows * self.tile_size - self.height / self.zoom))
+
+	def pan(self, dx, dy):
+		""" Moves the board by a distance on the screen, as when dragged.
+
+		Parameters
+		----------
+		dx : int
+			horizontal distance on the screen
+		dy : int
+			vertical distance on the screen
+		"""
+
+		self.left -= dx / self.zoom
+		self.bottom -= dy / self.zoom
+		self._clamp()
+		self.update()
+
+	def zoom_at(self, x, y, factor):
+		""" Scales the board around a point of the screen, which stays over the
+		same part of the board.
+
+		Parameters
+		----------
+		x : int
+			horizontal position of the point
+		y : int
+			vertical position of the point
+		factor : float
+			how much to scale the board by
+		"""
+
+		board_x = self.left + (x - self.x) / self.zoom
+		board_y = self.bottom + (y - self.y) / self.zoom
+		self.zoom = max(self.min_zoom, min(self.max_zoom, self.zoom * factor))
+		self.left = board_x - (x - self.x) / self.zoom
+		self.bottom = board_y - (y - self.y) / self.zoom
+		self._clamp()
+		self.update()
+
+	def center_on(self, index):
+		""" Pans the board to put a tile in the middle of the viewport.
+
+		Parameters
+		----------
+		index : int
+			position of the tile on the board
+		"""
+
+		row, column = divmod(index, self.columns)
+		self.left = (column + 0.5) * self.tile_size - self.width / self.zoom / 2
+		self.bottom = (row + 0.5) * self.tile_size - self.height / self.zoom / 2
+		self._clamp()
+		self.update()
+
+	def tile_at(self, x, y):
+		""" Returns the tile under a point of the screen, if the point is on an
+		opaque pixel of the tile.
+
+		Parameters
+		----------
+		x : int
+			horizontal position of the point
+		y : int
+			vertical position of the point
+
+		Returns
+		-------
+		int
+			position of the tile on the board, or None if the point is not on an
+			opaque pixel of a tile in the viewport
+		"""
+
+		if not (self.x <= x < self.x + self.width and self.y <= y < self.y + self.height):
+			return None
+		board_x = self.left + (x - self.x) / self.zoom
+		board_y = self.bottom + (y - self.y) / self.zoom
+		column = int(board_x // self.tile_size)
+		row = int(board_y // self.tile_size)
+		if not (0 <= column < self.columns and 0 <= row < self.rows):
+			return None
+		index = row * self.columns + column
+		if self.tile_masks:
+			# A TILE IS AS LARGE AS ITS IMAGE IN BOARD COORDINATES
+			mask = self.tile_masks[self.tiles[index]]
+			if mask and not mask.hit(int(board_x - column * self.tile_size),
+					int(board_y - row * self.tile_size)):
+				return None
+		return index
+
+	def screen_position(self, index):
+		""" Returns the middle of a tile on the screen.
+
+		Parameters
+		----------
+		index : int
+			position of the tile on the board
+
+		Returns
+		-------
+		tuple
+			horizontal and vertical position of the middle of the tile
+		"""
+
+		row, column = divmod(index, self.columns)
+		return (self.x + ((column + 0.5) * self.tile_size - self.left) * self.zoom,
+			self.y + ((row + 0.5) * self.tile_size - self.bottom) * self.zoom)
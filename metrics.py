@@ -0,0 +1,266 @@
+""" Metrics Exporter
+This module contains the metrics of the '--metrics' mode of the game, and the
+server that exports them in the Prometheus text format, so that every cabinet
+running the game can be watched from one place. The metrics are:
+
+	odd1out_games_total - games played, by difficulty
+	odd1out_rounds_total - boards whose odd tile was found, by difficulty
+	odd1out_click_latency_seconds - histogram of the time from a click on the
+		odd tile until the frame showing the new board has been drawn
+	odd1out_frame_time_seconds - histogram of the time between two frames
+	process_resident_memory_bytes - memory used by the game process
+
+The game updates the metrics from its own thread, where recording a round only
+adds to a counter and appends the time of the click to a list, and the frame
+drawn next puts the click latencies into their histogram. The server runs in a
+background thread, only listens on localhost, and formats the metrics when they
+are scraped. This module does not require 'pyglet' to be installed.
+
+This module can be imported and contains the following:
+	* resident_memory - returns the memory used by the process
+	* Histogram - creates a histogram of durations
+	* Metrics - keeps the metrics of the game
+	* MetricsServer - creates a thread serving the metrics over HTTP
+"""
+
+import bisect, http.server, os, sys, threading, time
+
+def resident_memory():
+	""" Returns the memory used by the process, in bytes. This is the current
+	resident set size on Linux, and the peak resident set size on other Unix
+	systems.
+
+	Returns
+	-------
+	int
+		the memory used by the process, or None if it cannot be read
+	"""
+
+	try:
+		statm_file = open("/proc/self/statm")
+		try:
+			return int(statm_file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+		finally:
+			statm_file.close()
+	except (OSError, ValueError, IndexError):
+		pass
+	try:
+		import resource
+	except ImportError:
+		return None
+	peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+	# macOS GIVES THE PEAK IN BYTES, THE OTHER SYSTEMS IN KILOBYTES
+	return peak if sys.platform == "darwin" else peak * 1024
+
+class Histogram:
+	"""
+	A class used to count durations in buckets, as a Prometheus histogram.
+
+	...
+
+	Attributes
+	----------
+	bounds : tuple
+		upper bound of each bucket, in seconds, in increasing order
+	counts : list
+		number of durations in each bucket, and last those above every bound
+	total : float
+		sum of every duration counted
+
+	Methods
+	-------
+	observe(value)
+		counts one duration
+	lines(name)
+		returns the lines of the histogram in the Prometheus text format
+	"""
+
+	__slots__ = ("bounds", "counts", "total")
+
+	def __init__(self, bounds):
+		self.bounds = tuple(bounds)
+		self.counts = [0] * (len(self.bounds) + 1)
+		self.total = 0.0
+
+	def observe(self, value):
+		self.counts[bisect.bisect_left(self.bounds, value)] += 1
+		self.total += value
+
+	def lines(self, name):
+		""" Returns the lines of the histogram in the Prometheus text format,
+		where the count of each bucket includes those of the buckets below it.
+
+		Parameters
+		----------
+		name : str
+			name of the metric
+
+		Returns
+		-------
+		list
+			the lines of the histogram
+		"""
+
+		counts = list(self.counts)
+		lines = []
+		cumulative = 0
+		for bound, count in zip(self.bounds + ("+Inf",), counts):
+			cumulative += count
+			lines.append('{}_bucket{{le="{}"}} {}'.format(name, bound, cumulative))
+		lines.append("{}_sum {!r}".format(name, self.total))
+		lines.append("{}_count {}".format(name, cumulative))
+		return lines
+
+class Metrics:
+	"""
+	A class used to keep the metrics of the game.
+
+	...
+
+	Attributes
+	----------
+	games : dict
+		games played on each difficulty
+	rounds : dict
+		boards whose odd tile was found on each difficulty
+	click_latency : obj
+		Histogram of the time from a click on the odd tile until the frame
+		showing the new board has been drawn
+	frame_time : obj
+		Histogram of the time between two frames
+
+	Methods
+	-------
+	game_finished(difficulty)
+		counts a game played
+	round_completed(difficulty)
+		counts a board whose odd tile was found, and times its new board
+	frame_drawn()
+		times the frame just drawn and the clicks it shows the boards of
+	render()
+		returns the metrics in the Prometheus text format
+	"""
+
+	__slots__ = ("games", "rounds", "click_latency", "frame_time", "_clicks", "_last_frame")
+
+	latency_buckets = (0.001, 0.0025, 0.005, 0.01, 0.0167, 0.025, 0.0333, 0.05, 0.1, 0.25, 0.5, 1)
+	frame_buckets = (0.004, 0.008, 0.0167, 0.025, 0.0333, 0.05, 0.1, 0.25, 0.5, 1)
+
+	def __init__(self):
+		self.games = {}
+		self.rounds = {}
+		self.click_latency = Histogram(self.latency_buckets)
+		self.frame_time = Histogram(self.frame_buckets)
+		# TIMES OF THE CLICKS WHOSE NEW BOARD HAS NOT BEEN DRAWN YET
+		self._clicks = []
+		self._last_frame = None
+
+	def game_finished(self, difficulty):
+		self.games[difficulty] = self.games.get(difficulty, 0) + 1
+
+	def round_completed(self, difficulty):
+		self.rounds[difficulty] = self.rounds.get(difficulty, 0) + 1
+		self._clicks.append(time.perf_counter())
+
+	def frame_drawn(self):
+		""" Times the frame just drawn from the previous one, and the clicks
+		whose new board it has drawn. This is called at the end of each draw.
+		"""
+
+		now = time.perf_counter()
+		if self._last_frame is not None:
+			self.frame_time.observe(now - self._last_frame)
+		self._last_frame = now
+		if self._clicks:
+			for click in self._clicks:
+				self.click_latency.observe(now - click)
+			self._clicks = []
+
+	def render(self):
+		""" Returns the metrics in the Prometheus text format.
+
+		Returns
+		-------
+		str
+			the metrics, one sample per line
+		"""
+
+		lines = []
+		for name, help_text, values in (
+				("odd1out_games_total", "Games played, by difficulty.", self.games),
+				("odd1out_rounds_total", "Boards whose odd tile was found, by difficulty.", self.rounds)):
+			lines += ["# HELP {} {}".format(name, help_text), "# TYPE {} counter".format(name)]
+			for difficulty, count in sorted(dict(values).items()):
+				lines.append('{}{{difficulty="{}"}} {}'.format(name, difficulty, count))
+		for name, help_text, histogram in (
+				("odd1out_click_latency_seconds", "Time from a click on the odd tile until the new board "
+					"has been drawn.", self.click_latency),
+				("odd1out_frame_time_seconds", "Time between two frames.", self.frame_time)):
+			lines += ["# HELP {} {}".format(name, help_text), "# TYPE {} histogram".format(name)]
+			lines += histogram.lines(name)
+		memory = resident_memory()
+		if memory is not None:
+			lines += ["# HELP process_resident_memory_bytes Resident memory size in bytes.",
+				"# TYPE process_resident_memory_bytes gauge",
+				"process_resident_memory_bytes {}".format(memory)]
+		return "\n".join(lines) + "\n"
+
+class _MetricsHandler(http.server.BaseHTTPRequestHandler):
+	def do_GET(self):
+		if self.path.split("?")[0] not in ("/", "/metrics"):
+			self.send_error(404)
+			return
+		body = self.server.metrics.render().encode("utf-8")
+		self.send_response(200)
+		self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+		self.send_header("Content-Length", str(len(body)))
+		self.end_headers()
+		self.wfile.write(body)
+
+	def log_message(self, format, *args):
+		pass
+
+class MetricsServer(threading.Thread):
+	"""
+	A class used to serve the metrics of the game over HTTP, from a background
+	thread, at /metrics.
+
+	...
+
+	Attributes
+	----------
+	server : obj
+		the HTTP server, already listening once the object is made
+
+	Methods
+	-------
+	run()
+		serves requests until stopped
+	stop()
+		stops serving and closes the server
+	"""
+
+	def __init__(self, metrics, port, host="127.0.0.1"):
+		""" Starts listening on the port, so that a port already in use is
+		reported before the game starts.
+
+		Parameters
+		----------
+		metrics : obj
+			the Metrics object to serve
+		port : int
+			the port to listen on, or 0 for any free port
+		host : str, optional
+			the address to listen on, only localhost by default
+		"""
+
+		super(MetricsServer, self).__init__(name="metrics-server", daemon=True)
+		self.server = http.server.HTTPServer((host, port), _MetricsHandler)
+		self.server.metrics = metrics
+
+	def run(self):
+		self.server.serve_forever()
+
+	def stop(self):
+		self.server.shutdown()
+		self.server.server_close()
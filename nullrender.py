@@ -0,0 +1,647 @@
+""" Null Renderer
+This module contains the null and recording backends of the 'render' module.
+They keep every sprite, label and vertex list of the scene with the same
+attributes as their pyglet counterparts, but never touch OpenGL, a display or
+an audio device, so the whole game runs on machines that have none of them.
+Image sizes are read from the headers of the image files, and sounds are never
+opened. As images are never decoded, their hit masks are made from the texture
+cache only, and an image it does not hold has none.
+
+The event loop runs on a virtual clock. Instead of waiting for the next
+scheduled function, it moves the clock forward to it, or by one frame if a
+function runs on every tick, so a game of 90 seconds takes only as long as
+its frames take to compute. The recording backend also writes what each frame
+would have drawn, layer by layer, to a text file. This module requires the
+'bundle', 'hitmask', 'render' and 'texcache' modules, as well as 'pyglet' to be
+installed, but only uses its 'pyglet.clock' and 'pyglet.event' modules, which
+do not need OpenGL.
+
+This module can be imported and contains the following:
+	* The classes, constants and functions of the 'render' module, for the
+		null and recording backends
+	* clock - the virtual clock set as the default clock of pyglet
+	* recording - the file the frames are written to, or None
+"""
+
+import asyncio, bundle, hitmask, importlib.util, os, struct, sys, pyglet.clock, pyglet.event, render, \
+	texcache
+
+__all__ = ["OrderedGroup", "Sprite", "UnformattedDocument", "IncrementalTextLayout", "Caret",
+	"Window", "key", "mouse", "GL_QUADS", "windows", "run", "exit", "image", "media",
+	"looping_player", "add_font", "load_font", "set_clear_color", "LayeredBatch", "Label",
+	"TextureGroup", "ViewportGroup", "run_async", "SceneCache", "preload", "release_textures",
+	"restore_textures", "set_idle", "alpha_mask"]
+
+def _load_constants(name):
+	""" Loads pyglet.window.key or pyglet.window.mouse, which only hold
+	constants, without importing pyglet.window, which needs OpenGL.
+	"""
+
+	path = os.path.join(os.path.dirname(pyglet.clock.__file__), "window", name + ".py")
+	spec = importlib.util.spec_from_file_location("pyglet.window." + name, path)
+	module = importlib.util.module_from_spec(spec)
+	spec.loader.exec_module(module)
+	return module
+
+key = _load_constants("key")
+mouse = _load_constants("mouse")
+# THE VALUE OF pyglet.gl.GL_QUADS
+GL_QUADS = 7
+
+# THE VIRTUAL TIME, IN SECONDS, READ BY THE DEFAULT CLOCK OF pyglet
+_time = [0.0]
+clock = pyglet.clock.Clock(time_function=lambda: _time[0])
+pyglet.clock.set_default(clock)
+
+# THE FILE OF THE RECORDING BACKEND
+recording = None
+if render.backend == "recording":
+	recording = open(os.environ.get("ODD1OUT_RECORDING", "frames.log"), "w")
+
+def _image_size(path):
+	""" Reads the width and height of a PNG or JPEG image from its header.
+
+	Parameters
+	----------
+	path : str
+		path of the image file relative to the game
+
+	Returns
+	-------
+	tuple
+		the width and height of the image
+	"""
+
+	data = bundle.read(path)
+	if data[:8] == b"\x89PNG\r\n\x1a\n":
+		return struct.unpack(">II", data[16:24])
+	if data[:2] == b"\xff\xd8":
+		# WALKS THE SEGMENTS OF THE JPEG FILE UP TO ITS START OF FRAME
+		index = 2
+		while index + 9 <= len(data) and data[index] == 0xFF:
+			marker = data[index + 1]
+			if 0xC0 <= marker <= 0xCF and marker not in (0xC4, 0xC8, 0xCC):
+				height, width = struct.unpack(">HH", data[index + 5:index + 9])
+				return width, height
+			index += 2 + struct.unpack(">H", data[index + 2:index + 4])[0]
+	raise ValueError("{} is not a PNG or JPEG image".format(path))
+
+class NullImage:
+	"""
+	A class used in place of a pyglet image: it only has a name and a size.
+
+	...
+
+	Attributes
+	----------
+	name : str
+		name shown in the recording
+	width : int
+		width of the image
+	height : int
+		height of the image
+	anchor_x : int
+		horizontal position of the anchor of the image
+	anchor_y : int
+		vertical position of the anchor of the image
+	"""
+
+	def __init__(self, name, width, height):
+		self.name = name
+		self.width = width
+		self.height = height
+		self.anchor_x = 0
+		self.anchor_y = 0
+		self.tex_coords = (0, 0, 0, 1, 0, 0, 1, 1, 0, 0, 1, 0)
+
+	def get_texture(self):
+		return self
+
+class NullGlyph(NullImage):
+	"""
+	A class used in place of a pyglet glyph, with the advance and vertices
+	used to lay out text.
+	"""
+
+	def __init__(self, character, advance, ascent, descent):
+		super(NullGlyph, self).__init__(repr(character), advance, ascent - descent)
+		self.advance = advance
+		self.vertices = (0, descent, advance, ascent)
+
+class NullFont:
+	"""
+	A class used in place of a pyglet font. Every character of the font has
+	the same width, set from the size of the font.
+	"""
+
+	def __init__(self, size):
+		self.size = size
+		self.ascent = round(size * 0.8)
+		self.descent = -round(size * 0.2)
+		self.advance = round(size * 0.6)
+
+	def get_glyphs(self, text):
+		return [NullGlyph(character, self.advance, self.ascent, self.descent) for character in text]
+
+class NullPlayer:
+	""" A class used in place of a pyglet media player, which plays nothing. """
+
+	def __init__(self):
+		self.playing = False
+
+	def queue(self, source):
+		pass
+
+	def play(self):
+		self.playing = True
+
+	def pause(self):
+		self.playing = False
+
+	def delete(self):
+		self.playing = False
+
+class NullSource:
+	""" A class used in place of a pyglet sound, which is never opened. """
+
+	def __init__(self, path):
+		self.path = path
+		self.audio_format = None
+
+	def play(self):
+		player = NullPlayer()
+		player.play()
+		return player
+
+# THE SIZES OF THE IMAGES READ BY preload()
+_image_sizes = {}
+
+def image(path):
+	width, height = _image_sizes.get(path) or _image_size(path)
+	return NullImage(os.path.basename(path), width, height)
+
+def preload(images, sounds, max_workers=None, frame_time=1 / 60):
+	""" Reads the sizes of the images, as the sounds are never opened, and
+	yields the number of assets loaded so far after each, like the preload()
+	of the 'glrender' module.
+	"""
+
+	loaded = 0
+	for path in images:
+		_image_sizes[path] = _image_size(path)
+		loaded += 1
+		yield loaded
+	for path in sounds:
+		loaded += 1
+		yield loaded
+
+# THE TEXTURE CACHE, WHICH THE HIT MASKS ARE MADE FROM, AND THE MASKS MADE
+texture_cache = texcache.load()
+_masks = {}
+
+def alpha_mask(path):
+	""" Returns the hit mask of an image, made from its pixels in the texture
+	cache, or None if the cache does not hold the image.
+	"""
+
+	if path not in _masks:
+		cached = texture_cache.get(path) if texture_cache else None
+		_masks[path] = None if cached is None else hitmask.AlphaMask.from_pixels(*cached)
+	return _masks[path]
+
+def release_textures(directory):
+	if recording is not None:
+		recording.write("release textures {}\n".format(directory))
+
+def restore_textures(directory):
+	if recording is not None:
+		recording.write("restore textures {}\n".format(directory))
+
+def media(path, streaming=True):
+	return NullSource(path)
+
+def looping_player(source):
+	return NullPlayer()
+
+def add_font(path):
+	pass
+
+def load_font(name, size=None, bold=False, italic=False):
+	return NullFont(size or 12)
+
+def set_clear_color(red, green, blue, alpha):
+	pass
+
+class OrderedGroup:
+	""" A class used in place of a pyglet ordered group, as one layer of a batch. """
+
+	def __init__(self, order, parent=None):
+		self.order = order
+		self.parent = parent
+
+class TextureGroup:
+	""" A class used in place of a pyglet texture group, in the layer of its parent. """
+
+	def __init__(self, texture, parent=None):
+		self.texture = texture
+		self.parent = parent
+
+	@property
+	def order(self):
+		return self.parent.order
+
+class ViewportGroup:
+	""" A class used in place of the ViewportGroup of the 'glrender' module. """
+
+	def __init__(self, view, parent=None):
+		self.view = view
+		self.parent = parent
+
+	@property
+	def order(self):
+		return self.parent.order
+
+class LayeredBatch:
+	"""
+	A class used in place of the LayeredBatch of the 'glrender' module. It keeps
+	the items added to each layer, and the recording backend writes the visible
+	ones to the recording each time the batch is drawn.
+
+	...
+
+	Attributes
+	----------
+	layers : dict
+		items of each layer, where the layer of items without a group is None
+	draw_calls : int
+		always 0, as nothing is drawn
+	state_changes : int
+		always 0, as nothing is drawn
+
+	Methods
+	-------
+	add(count, mode, group, *data)
+		returns a new vertex list in a layer of the batch
+	draw()
+		writes the visible items of every layer to the recording
+	draw_layers(layers, exclude=False)
+		writes the visible items of some layers to the recording
+	"""
+
+	def __init__(self):
+		self.layers = {}
+		self.draw_calls = 0
+		self.state_changes = 0
+
+	def _add_item(self, item, group):
+		self.layers.setdefault(group, []).append(item)
+
+	def _remove_item(self, item, group):
+		self.layers[group].remove(item)
+
+	def add(self, count, mode, group, *data):
+		return NullVertexList(self, group, count, data)
+
+	def draw(self):
+		self.draw_layers((), exclude=True)
+
+	def draw_layers(self, layers, exclude=False):
+		if recording is None:
+			return
+		for group in sorted(self.layers, key=lambda group: -1 if group is None else group.order):
+			if (group in layers) == exclude:
+				continue
+			for item in self.layers[group]:
+				line = item._record()
+				if line:
+					recording.write("  {} {}\n".format("-" if group is None else group.order, line))
+
+class SceneCache:
+	"""
+	A class used in place of the SceneCache of the 'glrender' module. The
+	recording shows where the cached layers would have been drawn from the
+	texture.
+	"""
+
+	def __init__(self, batch, dynamic_layers):
+		self.batch = batch
+		self.dynamic_layers = dynamic_layers
+		self.valid = False
+		self.misses = 0
+
+	def invalidate(self):
+		self.valid = False
+
+	def release(self):
+		self.valid = False
+
+	def draw(self, window):
+		if self.valid:
+			if recording is not None:
+				recording.write("  cached scene\n")
+		else:
+			self.batch.draw_layers(self.dynamic_layers, exclude=True)
+			self.valid = True
+			self.misses += 1
+		self.batch.draw_layers(self.dynamic_layers)
+
+class NullVertexList:
+	"""
+	A class used in place of a pyglet vertex list, with the vertices and
+	colors it was made with.
+	"""
+
+	def __init__(self, batch, group, count, data):
+		self.batch = batch
+		self.group = group
+		self.count = count
+		self.vertices = [0] * (2 * count)
+		self.colors = []
+		for fmt, values in data:
+			if fmt.startswith("v"):
+				self.vertices = list(values)
+			elif fmt.startswith("c"):
+				self.colors = list(values)
+		batch._add_item(self, group)
+
+	def delete(self):
+		self.batch._remove_item(self, self.group)
+
+	def _record(self):
+		xs = self.vertices[0::2]
+		ys = self.vertices[1::2]
+		if not any(xs) and not any(ys):
+			return None
+		return "quads {} {:g},{:g} {:g},{:g}".format(self.count // 4, min(xs), min(ys), max(xs), max(ys))
+
+class Sprite:
+	""" A class used in place of a pyglet sprite. """
+
+	def __init__(self, img, x=0, y=0, blend_src=None, blend_dest=None, batch=None, group=None,
+			usage=None, subpixel=False):
+		self.image = img
+		self.x = x
+		self.y = y
+		self.batch = batch
+		self.group = group
+		self.visible = True
+		self.opacity = 255
+		self.color = (255, 255, 255)
+		self.scale = 1
+		if batch is not None:
+			batch._add_item(self, group)
+
+	def _get_position(self):
+		return self.x, self.y
+
+	def _set_position(self, position):
+		self.x, self.y = position
+
+	position = property(_get_position, _set_position)
+
+	@property
+	def width(self):
+		return self.image.width * self.scale
+
+	@property
+	def height(self):
+		return self.image.height * self.scale
+
+	def delete(self):
+		if self.batch is not None:
+			self.batch._remove_item(self, self.group)
+			self.batch = None
+
+	def draw(self):
+		pass
+
+	def _record(self):
+		if not self.visible or not self.opacity:
+			return None
+		line = "sprite {} {:g},{:g}".format(self.image.name, self.x, self.y)
+		if self.scale != 1:
+			line += " scale={:g}".format(self.scale)
+		if self.opacity != 255:
+			line += " opacity={}".format(self.opacity)
+		return line
+
+class Label:
+	""" A class used in place of the Label of the 'glrender' module. """
+
+	def __init__(self, text="", font_name=None, font_size=None, bold=False, italic=False,
+			color=(255, 255, 255, 255), x=0, y=0, width=None, height=None, anchor_x="left",
+			anchor_y="baseline", align="left", multiline=False, dpi=None, batch=None, group=None):
+		self.text = text
+		self.font_name = font_name
+		self.font_size = font_size
+		self.bold = bold
+		self.italic = italic
+		self.color = color
+		self.x = x
+		self.y = y
+		self.width = width
+		self.height = height
+		self.anchor_x = anchor_x
+		self.anchor_y = anchor_y
+		self.batch = batch
+		self.group = group
+		if batch is not None:
+			batch._add_item(self, group)
+
+	def delete(self):
+		if self.batch is not None:
+			self.batch._remove_item(self, self.group)
+			self.batch = None
+
+	def draw(self):
+		pass
+
+	def _record(self):
+		if not self.text:
+			return None
+		return "label {!r} {:g},{:g}".format(self.text, self.x, self.y)
+
+class UnformattedDocument:
+	""" A class used in place of a pyglet document of plain text. """
+
+	def __init__(self, text=""):
+		self.text = text
+		self.font_size = 12
+
+	def set_style(self, start, end, attributes):
+		self.font_size = attributes.get("font_size", self.font_size)
+
+	def get_font(self):
+		return NullFont(self.font_size)
+
+class IncrementalTextLayout:
+	""" A class used in place of a pyglet text layout of a document. """
+
+	def __init__(self, document, width, height, multiline=False, dpi=None, batch=None, group=None,
+			wrap_lines=True):
+		self.document = document
+		self.width = width
+		self.height = height
+		self.x = 0
+		self.y = 0
+		if batch is not None:
+			batch._add_item(self, group)
+
+	def _record(self):
+		if not self.document.text:
+			return None
+		return "text {!r} {:g},{:g}".format(self.document.text, self.x, self.y)
+
+class Caret:
+	""" A class used in place of a pyglet caret, which types into its layout. """
+
+	def __init__(self, layout):
+		self.layout = layout
+		self.visible = False
+		self.mark = 0
+		self.position = 0
+
+	def on_text(self, text):
+		document = self.layout.document
+		document.text = document.text[:self.position] + text + document.text[self.position:]
+		self.position += len(text)
+		self.mark = self.position
+
+	def on_text_motion(self, motion):
+		if motion == key.MOTION_BACKSPACE and self.position > 0:
+			document = self.layout.document
+			document.text = document.text[:self.position - 1] + document.text[self.position:]
+			self.position -= 1
+			self.mark = self.position
+
+# THE OPEN WINDOWS, AND WHETHER THE EVENT LOOP WAS ASKED TO STOP
+windows = set()
+_has_exit = [False]
+
+# WHILE THE GAME IS IDLE, A FRAME RUN ON EVERY TICK MOVES THE CLOCK BY idle_frame_time
+idle_frame_time = 1 / 4
+_idle = [False]
+
+def set_idle(idle):
+	_idle[0] = idle
+
+class Window(pyglet.event.EventDispatcher):
+	"""
+	A class used in place of a pyglet window. Events are dispatched to it the
+	same way, and it handles ESCAPE and closing like a pyglet window does.
+
+	...
+
+	Attributes
+	----------
+	width : int
+		width of the window
+	height : int
+		height of the window
+	caption : str
+		title of the window
+	has_exit : bool
+		whether or not the window was asked to close
+	"""
+
+	def __init__(self, width=640, height=480, caption=None, **kwargs):
+		super(Window, self).__init__()
+		self.width = width
+		self.height = height
+		self.caption = caption or os.path.basename(sys.argv[0] if sys.argv else "")
+		self.has_exit = False
+		windows.add(self)
+
+	def clear(self):
+		pass
+
+	def flip(self):
+		pass
+
+	def dispatch_events(self):
+		pass
+
+	def switch_to(self):
+		pass
+
+	def set_vsync(self, vsync):
+		pass
+
+	def set_visible(self, visible=True):
+		pass
+
+	def set_mouse_cursor(self, cursor=None):
+		pass
+
+	def get_system_mouse_cursor(self, name):
+		return None
+
+	def close(self):
+		windows.discard(self)
+
+	def on_key_press(self, symbol, modifiers):
+		if symbol == key.ESCAPE and not (modifiers & ~(key.MOD_NUMLOCK | key.MOD_CAPSLOCK |
+				key.MOD_SCROLLLOCK)):
+			self.dispatch_event("on_close")
+
+	def on_close(self):
+		self.has_exit = True
+		self.close()
+
+for event_type in ("on_activate", "on_close", "on_deactivate", "on_draw", "on_expose", "on_hide",
+		"on_key_press", "on_key_release", "on_mouse_drag", "on_mouse_enter", "on_mouse_leave",
+		"on_mouse_motion", "on_mouse_press", "on_mouse_release", "on_mouse_scroll", "on_move",
+		"on_resize", "on_show", "on_text", "on_text_motion", "on_text_motion_select"):
+	Window.register_event_type(event_type)
+
+def _frames(frame_time):
+	""" Runs the event loop on the virtual clock, yielding after each frame. """
+	_has_exit[0] = False
+	frames = 0
+	while windows and not _has_exit[0]:
+		sleep_time = clock.get_sleep_time(True)
+		if sleep_time is None:
+			break
+		_time[0] += sleep_time or (idle_frame_time if _idle[0] else frame_time)
+		clock.tick(poll=True)
+		for window in list(windows):
+			if recording is not None:
+				recording.write("frame {} {:.3f} {}\n".format(frames, _time[0], window.caption))
+			window.dispatch_event("on_draw")
+			window.flip()
+		frames += 1
+		yield
+	if recording is not None:
+		recording.flush()
+
+def run(frame_time=1 / 60):
+	""" Runs the event loop on the virtual clock until every window is closed,
+	exit() is called, or nothing is left scheduled.
+
+	Parameters
+	----------
+	frame_time : float, optional
+		virtual seconds between two frames while a function is scheduled to
+		run on every tick
+	"""
+
+	for frame in _frames(frame_time):
+		pass
+
+async def run_async(frame_time=1 / 60):
+	""" Runs the event loop on the virtual clock like run(), from an asyncio
+	event loop. The coroutines of the asyncio loop run between two frames, on
+	the real clock, so the virtual clock does not wait for them.
+
+	Parameters
+	----------
+	frame_time : float, optional
+		virtual seconds between two frames while a function is scheduled to
+		run on every tick
+	"""
+
+	for frame in _frames(frame_time):
+		await asyncio.sleep(0)
+
+def exit():
+	_has_exit[0] = True
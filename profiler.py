@@ -0,0 +1,158 @@
+""" Scene Profiler
+This module contains the profiler of the '--profile' mode of the game. It wraps
+the event dispatch of the game window and the scheduled functions of the clock,
+so that every event handler and clock callback runs under cProfile, with one
+profile for each scene of the game. The scene is read when the outermost
+handler or callback starts, so a callback that dispatches events is counted in
+one scene. At exit, each profile is written twice:
+
+	SCENE.pstats - the profile itself, to be read with the 'pstats' module
+	SCENE.collapsed - the profile as collapsed stacks, one line per stack
+		with its self time in microseconds, ready for flamegraph.pl or
+		speedscope
+
+cProfile only keeps how long each function spent under each of its callers, so
+the collapsed stacks are rebuilt from that call graph, splitting the time of a
+function between its callers in proportion. This module does not require
+'pyglet' to be installed.
+
+This module can be imported and contains the following:
+	* collapsed_stacks - rebuilds the stacks of a profile
+	* SceneProfiler - creates a profiler keeping one profile per scene
+"""
+
+import cProfile, os, pstats
+
+def _frame_name(function):
+	filename, line, name = function
+	if filename == "~":
+		return name
+	return "{} ({}:{})".format(name, os.path.basename(filename), line)
+
+def collapsed_stacks(stats, prefix="", max_depth=64):
+	""" Rebuilds the stacks of a profile from its call graph.
+
+	Parameters
+	----------
+	stats : obj
+		pstats.Stats object of the profile
+	prefix : str, optional
+		frame put at the bottom of every stack, such as the name of the scene
+	max_depth : int, optional
+		most frames followed in one stack
+
+	Returns
+	-------
+	dict
+		self time in seconds of each stack, where a stack is its frames joined
+		by ';' from the outermost
+	"""
+
+	callees = {}
+	for function, (cc, nc, tt, ct, callers) in stats.stats.items():
+		for caller, edge in callers.items():
+			# EACH EDGE HOLDS THE CALLS, PRIMITIVE CALLS, SELF TIME AND TOTAL TIME
+			# OF THE FUNCTION UNDER THIS CALLER
+			callees.setdefault(caller, []).append((function, edge[2], edge[3]))
+	stacks = {}
+
+	def walk(function, frames, on_stack, self_time, total_time):
+		frames = frames + [_frame_name(function)]
+		stack = ";".join(frames)
+		stacks[stack] = stacks.get(stack, 0.0) + self_time
+		function_total = stats.stats[function][3]
+		if function_total <= 0 or len(frames) >= max_depth:
+			return
+		share = total_time / function_total
+		on_stack.add(function)
+		for callee, callee_self, callee_total in callees.get(function, ()):
+			if callee not in on_stack:
+				walk(callee, frames, on_stack, callee_self * share, callee_total * share)
+		on_stack.discard(function)
+
+	for function, (cc, nc, tt, ct, callers) in stats.stats.items():
+		if not callers:
+			walk(function, [prefix] if prefix else [], set(), tt, ct)
+	return stacks
+
+class SceneProfiler:
+	"""
+	A class used to profile the event handlers and clock callbacks of the
+	game, keeping one profile per scene.
+
+	...
+
+	Attributes
+	----------
+	scene_of : function
+		returns the name of the current scene
+	profiles : dict
+		cProfile.Profile object of each scene
+	depth : int
+		number of wrapped calls running, to only profile the outermost
+
+	Methods
+	-------
+	wrap(function)
+		returns the function, profiled in the scene it starts in
+	write(directory)
+		writes the profile of every scene as .pstats and .collapsed files
+	"""
+
+	__slots__ = ("scene_of", "profiles", "depth")
+
+	def __init__(self, scene_of):
+		""" Creates a profiler with no profiles yet.
+
+		Parameters
+		----------
+		scene_of : function
+			returns the name of the current scene
+		"""
+
+		self.scene_of = scene_of
+		self.profiles = {}
+		self.depth = 0
+
+	def wrap(self, function):
+		def profiled(*args):
+			if self.depth:
+				return function(*args)
+			scene = self.scene_of()
+			profile = self.profiles.get(scene)
+			if profile is None:
+				profile = self.profiles[scene] = cProfile.Profile()
+			self.depth += 1
+			profile.enable()
+			try:
+				return function(*args)
+			finally:
+				profile.disable()
+				self.depth -= 1
+		return profiled
+
+	def write(self, directory):
+		""" Writes the profile of every scene to a directory.
+
+		Parameters
+		----------
+		directory : str
+			the directory to write SCENE.pstats and SCENE.collapsed files to
+
+		Returns
+		-------
+		list
+			names of the scenes written
+		"""
+
+		os.makedirs(directory, exist_ok=True)
+		for scene, profile in sorted(self.profiles.items()):
+			stats = pstats.Stats(profile)
+			stats.dump_stats(os.path.join(directory, scene + ".pstats"))
+			collapsed_file = open(os.path.join(directory, scene + ".collapsed"), "w")
+			for stack, seconds in sorted(collapsed_stacks(stats, scene).items()):
+				microseconds = round(seconds * 1e6)
+				if microseconds:
+					collapsed_file.write("{} {}\n".format(stack, microseconds))
+			collapsed_file.close()
+		return sorted(self.profiles)
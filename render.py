@@ -0,0 +1,96 @@
+""" Rendering
+This module contains the renderer of the game and the counts of what each frame
+draws. The other modules draw, load assets, open windows and run the event loop
+through the names of this module, which come from one of these backends:
+
+	pyglet - draws the game with OpenGL in pyglet windows. This is the default.
+	null - keeps the whole scene without drawing it, and runs the event loop on
+		a virtual clock as fast as the game can go
+	recording - like null, and also writes what every frame would have drawn
+		to a text file
+
+The backend is chosen with the ODD1OUT_RENDERER environment variable, and the
+file of the recording backend with ODD1OUT_RECORDING (frames.log by default).
+The null and recording backends do not need OpenGL, a display or an audio
+device, so the whole game can run on a build server, for example:
+
+	ODD1OUT_RENDERER=null python game.py --bot 0
+
+This module can be imported and contains the following:
+	* FrameStats - counts the draw calls and state changes of each frame
+	* frame - the FrameStats object of the game window
+	* backend - the name of the backend in use
+	* The names of the backend, from the 'glrender' module for the pyglet
+		backend and from the 'nullrender' module for the others:
+		** LayeredBatch, OrderedGroup, Sprite, Label, GL_QUADS - the scene
+		** SceneCache - the layers of a scene that do not change, drawn once
+		** TextureGroup, ViewportGroup - vertex lists drawn through a viewport
+		** UnformattedDocument, IncrementalTextLayout, Caret - text entry
+		** image, media, looping_player, add_font, load_font - assets
+		** preload - decodes images and sounds before they are used, on a
+			pool of threads for the pyglet backend
+		** release_textures, restore_textures, set_idle - the idle state of
+			the game
+		** alpha_mask - the hit mask of an image
+		** Window, set_clear_color, key, mouse - windows and their input
+		** windows, run, run_async, exit - the event loop, run_async being a
+			coroutine that runs it from an asyncio event loop
+"""
+
+import os
+
+class FrameStats:
+	"""
+	A class used to count the draw calls and state changes of each frame.
+
+	...
+
+	Attributes
+	----------
+	draw_calls : int
+		vertex domains drawn so far in the current frame
+	state_changes : int
+		group state changes made so far in the current frame
+	last_draw_calls : int
+		vertex domains drawn in the last complete frame
+	last_state_changes : int
+		group state changes made in the last complete frame
+	frames : int
+		number of frames drawn
+
+	Methods
+	-------
+	begin_frame()
+		stores the counts of the last frame and starts counting a new one
+	"""
+
+	__slots__ = ("draw_calls", "state_changes", "last_draw_calls", "last_state_changes", "frames")
+
+	def __init__(self):
+		self.draw_calls = 0
+		self.state_changes = 0
+		self.last_draw_calls = 0
+		self.last_state_changes = 0
+		self.frames = 0
+
+	def begin_frame(self):
+		self.last_draw_calls = self.draw_calls
+		self.last_state_changes = self.state_changes
+		self.draw_calls = 0
+		self.state_changes = 0
+		self.frames += 1
+
+	def __repr__(self):
+		return "{} draw calls, {} state changes".format(self.last_draw_calls, self.last_state_changes)
+
+# THE COUNTS OF THE FRAMES DRAWN IN THE GAME WINDOW
+frame = FrameStats()
+
+# THE BACKEND IS IMPORTED LAST, AS IT ADDS ITS COUNTS TO frame
+backend = os.environ.get("ODD1OUT_RENDERER", "pyglet")
+if backend == "pyglet":
+	from glrender import *
+elif backend in ("null", "recording"):
+	from nullrender import *
+else:
+	raise ValueError("unknown renderer backend '{}', expected 'pyglet', 'null' or 'recording'".format(backend))
@@ -0,0 +1,166 @@
+""" Round Telemetry
+This module contains the round log of a player: the reaction time, misclicks
+and tile set of every round, kept in preallocated arrays used as a ring
+buffer, so that recording a round in the click path only writes three numbers.
+The rounds of one game can be summarized for the 'your score' screen and
+exported to a CSV file. This module does not require 'pyglet' to be installed.
+
+This module can be imported and contains the following:
+	* RoundLog - creates the round log of one player
+"""
+
+import array, os, time
+
+class RoundLog:
+	"""
+	A class used to record the rounds played by one player.
+
+	...
+
+	Attributes
+	----------
+	capacity : int
+		number of rounds kept. Older rounds are overwritten by newer ones.
+	reaction_times : array
+		seconds from showing each board to the click on its odd tile
+	misclicks : array
+		number of clicks on other tiles of each board
+	tilesets : array
+		tile set of each board
+	count : int
+		total number of rounds recorded
+	session_first : int
+		value of count when the current game started
+	round_start : float
+		time when the current board was shown
+	round_misclicks : int
+		misclicks made on the current board
+
+	Methods
+	-------
+	start_session()
+		starts a new game and times its first board
+	start_round()
+		times a new board from now
+	misclick()
+		counts a click on a wrong tile of the current board
+	end_round(tileset)
+		records the current board as found and times the next one
+	session_rounds()
+		returns the positions in the arrays of the rounds of the current game
+	summary()
+		returns the statistics of the current game
+	export(path, mode, player, tileset_names)
+		appends the rounds of the current game to a CSV file
+	"""
+
+	__slots__ = ("capacity", "reaction_times", "misclicks", "tilesets", "count",
+		"session_first", "round_start", "round_misclicks")
+
+	def __init__(self, capacity=4096):
+		""" Preallocates the arrays of the round log.
+
+		Parameters
+		----------
+		capacity : int, optional
+			number of rounds kept
+		"""
+
+		self.capacity = capacity
+		self.reaction_times = array.array("d", bytes(8 * capacity))
+		self.misclicks = array.array("H", bytes(2 * capacity))
+		self.tilesets = array.array("B", bytes(capacity))
+		self.count = 0
+		self.session_first = 0
+		self.round_start = time.perf_counter()
+		self.round_misclicks = 0
+
+	def start_session(self):
+		self.session_first = self.count
+		self.start_round()
+
+	def start_round(self):
+		self.round_start = time.perf_counter()
+		self.round_misclicks = 0
+
+	def misclick(self):
+		self.round_misclicks += 1
+
+	def end_round(self, tileset):
+		""" Records the current board as found and times the next board.
+
+		Parameters
+		----------
+		tileset : int
+			tile set of the board that was found
+		"""
+
+		now = time.perf_counter()
+		index = self.count % self.capacity
+		self.reaction_times[index] = now - self.round_start
+		self.misclicks[index] = min(self.round_misclicks, 65535)
+		self.tilesets[index] = tileset
+		self.count += 1
+		self.round_start = now
+		self.round_misclicks = 0
+
+	def session_rounds(self):
+		""" Returns the positions in the arrays of the rounds of the current
+		game that are still kept, from the oldest to the newest.
+
+		Returns
+		-------
+		list
+			positions of the rounds in the arrays of the round log
+		"""
+
+		first = max(self.session_first, self.count - self.capacity)
+		return [count % self.capacity for count in range(first, self.count)]
+
+	def summary(self):
+		""" Returns the statistics of the current game.
+
+		Returns
+		-------
+		dict
+			the number of rounds, the mean, median and 95th percentile of the
+			reaction times in seconds, and the total misclicks of the game,
+			including those made on the last board
+		"""
+
+		rounds = self.session_rounds()
+		times = sorted(self.reaction_times[index] for index in rounds)
+		summary = {"rounds": len(times), "mean": 0.0, "p50": 0.0, "p95": 0.0,
+			"misclicks": sum(self.misclicks[index] for index in rounds) + self.round_misclicks}
+		if times:
+			summary["mean"] = sum(times) / len(times)
+			summary["p50"] = times[len(times) // 2]
+			summary["p95"] = times[min(len(times) - 1, int(0.95 * len(times)))]
+		return summary
+
+	def export(self, path, mode, player, tileset_names):
+		""" Appends the rounds of the current game to a CSV file, writing a
+		header line first if the file is new.
+
+		Parameters
+		----------
+		path : str
+			path of the CSV file
+		mode : str
+			difficulty of the game
+		player : int
+			number of the player
+		tileset_names : list
+			names of the tile sets, indexed by tile set
+		"""
+
+		new_file = not os.path.exists(path)
+		session = time.strftime("%Y-%m-%dT%H:%M:%S")
+		export_file = open(path, "a")
+		if new_file:
+			export_file.write("session,mode,player,round,reaction_ms,misclicks,tileset\n")
+		for number, index in enumerate(self.session_rounds(), 1):
+			export_file.write("{},{},{},{},{:.1f},{},{}\n".format(session, mode, player, number,
+				self.reaction_times[index] * 1000, self.misclicks[index],
+				tileset_names[self.tilesets[index]]))
+		export_file.close()
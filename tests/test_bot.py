@@ -0,0 +1,54 @@
+""" Bot Tests
+This module tests that the games of the bot are not saved: a copy of the game
+is played by the bot with the null renderer backend, and its leaderboard file
+must be left as it was, with no telemetry written. The game is copied to a new
+directory first, so that the leaderboard of the game itself is never touched.
+The tests are skipped when 'pyglet' is not installed.
+
+This module contains the following:
+	* game_directory - the directory of the game
+	* BotRunTest - tests that a bot run leaves the leaderboard unchanged
+"""
+
+import importlib.util, os, shutil, subprocess, sys, tempfile, unittest
+
+game_directory = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+@unittest.skipIf(importlib.util.find_spec("pyglet") is None, "requires 'pyglet' to be installed")
+class BotRunTest(unittest.TestCase):
+
+	def setUp(self):
+		self.directory = tempfile.mkdtemp()
+		for name in os.listdir(game_directory):
+			if name.endswith(".py"):
+				shutil.copy(os.path.join(game_directory, name), self.directory)
+		shutil.copytree(os.path.join(game_directory, "assets"), os.path.join(self.directory, "assets"),
+			ignore=shutil.ignore_patterns("telemetry.csv", "leaderboard.summary", "leaderboard-archive"))
+		self.leaderboard_path = os.path.join(self.directory, "assets", "leaderboard.txt")
+
+	def tearDown(self):
+		shutil.rmtree(self.directory)
+
+	def play(self, *arguments):
+		environment = dict(os.environ, ODD1OUT_RENDERER="null",
+			ODD1OUT_RECORDING=os.path.join(self.directory, "frames.log"))
+		subprocess.run([sys.executable, "game.py", "--bot", "0"] + list(arguments), cwd=self.directory,
+			env=environment, stdout=subprocess.DEVNULL, check=True, timeout=300)
+
+	def test_leaderboard_unchanged(self):
+		# A RECORD OF A PLAYER, SO THE FILE IS NOT EMPTY BEFORE THE RUN
+		leaderboard_file = open(self.leaderboard_path, "a")
+		leaderboard_file.write("12 PLAYER EASY\n")
+		leaderboard_file.close()
+		leaderboard_file = open(self.leaderboard_path, "rb")
+		before = leaderboard_file.read()
+		leaderboard_file.close()
+		self.play()
+		leaderboard_file = open(self.leaderboard_path, "rb")
+		after = leaderboard_file.read()
+		leaderboard_file.close()
+		self.assertEqual(after, before)
+		self.assertFalse(os.path.exists(os.path.join(self.directory, "assets", "telemetry.csv")))
+
+if __name__ == "__main__":
+	unittest.main()
@@ -0,0 +1,181 @@
+""" Leaderboard Tests
+This module tests the 'leaderboard' module: the ranks and highest scores it
+keeps against a brute-force count of the same records, before and after the
+leaderboard file is compacted, and the records appended by several processes
+at once while the file is compacted and read. The tests only use the standard
+library, and run with 'python -m unittest discover tests' or 'python -m pytest'
+from the directory of the game.
+
+This module contains the following:
+	* brute_rank - ranks a score by counting the scores above it
+	* brute_top - returns the highest records by sorting every record
+	* RankTest - tests the ranks of ScoreTree, RankIndex and Leaderboard
+	* TopTest - tests the highest scores of Leaderboard
+	* ConcurrencyTest - tests appends by several processes during compaction
+"""
+
+import multiprocessing, os, random, shutil, tempfile, unittest, leaderboard
+
+DIFFICULTIES = ("EASY", "MEDIUM", "HARD")
+
+def brute_rank(scores, score):
+	return sum(1 for other in scores if other > score) + 1
+
+def brute_top(records, count):
+	""" Returns the highest records, the oldest first among equal scores.
+
+	Parameters
+	----------
+	records : list
+		score, name and difficulty of every record, oldest first
+	count : int
+		number of records to return
+
+	Returns
+	-------
+	list
+		score, name and difficulty of the highest records
+	"""
+
+	order = sorted(range(len(records)), key=lambda index: (-records[index][0], index))
+	return [records[index] for index in order[:count]]
+
+def random_records(rng, count, highest=300):
+	# SOME RECORDS ARE OLDER RECORDS WITHOUT A DIFFICULTY
+	return [(rng.randrange(highest), "P{}".format(number), rng.choice(DIFFICULTIES + ("",)))
+		for number in range(count)]
+
+class LeaderboardTestCase(unittest.TestCase):
+	""" A test case with a leaderboard file of its own in a new directory. """
+
+	def setUp(self):
+		self.directory = tempfile.mkdtemp()
+		self.path = os.path.join(self.directory, "leaderboard.txt")
+
+	def tearDown(self):
+		shutil.rmtree(self.directory)
+
+	def append(self, records, max_size=None):
+		for score, name, difficulty in records:
+			leaderboard.append_record(self.path, score, name, difficulty, max_size)
+
+	def assert_ranks(self, index, records):
+		scores = [score for score, name, difficulty in records]
+		self.assertEqual(index.overall.total, len(records))
+		for difficulty in DIFFICULTIES:
+			dated = [score for score, name, record_difficulty in records if record_difficulty == difficulty]
+			# SCORES NEVER MADE AND SCORES ABOVE THE HIGHEST ARE RANKED TOO
+			for score in list(range(0, 700, 7)) + [1000]:
+				self.assertEqual(index.rank(score, difficulty),
+					(brute_rank(scores, score), len(scores), brute_rank(dated, score), len(dated)),
+					"score {} on {}".format(score, difficulty))
+
+class RankTest(LeaderboardTestCase):
+
+	def test_score_tree(self):
+		rng = random.Random(1)
+		tree = leaderboard.ScoreTree(4)
+		scores = []
+		for number in range(500):
+			# THE TREE STARTS SMALL, SO ADDING HIGH SCORES GROWS IT
+			score = rng.randrange(2000)
+			count = rng.randrange(1, 3)
+			tree.add(score, count)
+			scores += [score] * count
+			probe = rng.randrange(2100)
+			self.assertEqual(tree.count_upto(probe), sum(1 for other in scores if other <= probe))
+			self.assertEqual(tree.rank(probe), brute_rank(scores, probe))
+		self.assertEqual(tree.total, len(scores))
+
+	def test_rank_index(self):
+		records = random_records(random.Random(2), 400)
+		index = leaderboard.RankIndex()
+		index.load("{} {} {}".format(*record) for record in records)
+		self.assert_ranks(index, records)
+
+	def test_ranks_across_compactions(self):
+		records = random_records(random.Random(3), 300)
+		board = leaderboard.Leaderboard(self.path)
+		for first in range(0, len(records), 100):
+			self.append(records[first:first + 100])
+			board.refresh()
+			self.assert_ranks(board.index, records[:first + 100])
+			leaderboard.compact(self.path)
+			# A NEW VIEW READS THE SUMMARY, AND AN OLD ONE FOLLOWS THE COMPACTION
+			self.assert_ranks(leaderboard.Leaderboard(self.path).index, records[:first + 100])
+			board.refresh()
+			self.assert_ranks(board.index, records[:first + 100])
+
+class TopTest(LeaderboardTestCase):
+
+	def test_top(self):
+		# FEW DIFFERENT SCORES, SO THAT MANY RECORDS TIE
+		records = random_records(random.Random(4), 250, highest=20)
+		board = leaderboard.Leaderboard(self.path)
+		for first in range(0, len(records), 50):
+			self.append(records[first:first + 50])
+			board.refresh()
+			for count in range(1, leaderboard.TOP_SIZE + 1):
+				self.assertEqual(board.top(count), brute_top(records[:first + 50], count))
+			leaderboard.compact(self.path)
+			fresh = leaderboard.Leaderboard(self.path)
+			board.refresh()
+			for count in range(1, leaderboard.TOP_SIZE + 1):
+				self.assertEqual(fresh.top(count), brute_top(records[:first + 50], count))
+				self.assertEqual(board.top(count), brute_top(records[:first + 50], count))
+
+	def test_top_size(self):
+		records = random_records(random.Random(5), 60)
+		self.append(records)
+		board = leaderboard.Leaderboard(self.path, top_size=3)
+		self.assertEqual(board.top(10), brute_top(records, 3))
+
+def _write_records(path, writer, count, max_size):
+	# EACH SCORE IS MADE ONCE, SO THE HIGHEST SCORES DO NOT DEPEND ON THE ORDER OF THE WRITERS
+	for number in range(count):
+		leaderboard.append_record(path, writer * count + number, "W{}".format(writer),
+			DIFFICULTIES[number % len(DIFFICULTIES)], max_size)
+
+def _compact_until(path, stopped):
+	while not stopped.is_set():
+		leaderboard.compact(path, keep_archives=2)
+
+class ConcurrencyTest(LeaderboardTestCase):
+
+	writers = 4
+	records_per_writer = 150
+
+	def test_appends_during_compaction(self):
+		stopped = multiprocessing.Event()
+		# THE WRITERS ALSO COMPACT THE FILE THEMSELVES ONCE IT REACHES ITS MAXIMUM SIZE
+		writers = [multiprocessing.Process(target=_write_records,
+			args=(self.path, writer, self.records_per_writer, 512)) for writer in range(self.writers)]
+		compactor = multiprocessing.Process(target=_compact_until, args=(self.path, stopped))
+		compactor.start()
+		for process in writers:
+			process.start()
+		# A READER FOLLOWS THE FILE WHILE IT IS WRITTEN AND COMPACTED
+		board = leaderboard.Leaderboard(self.path)
+		read = 0
+		while any(process.is_alive() for process in writers):
+			board.refresh()
+			self.assertGreaterEqual(board.index.overall.total, read)
+			read = board.index.overall.total
+		for process in writers:
+			process.join()
+			self.assertEqual(process.exitcode, 0)
+		stopped.set()
+		compactor.join()
+		self.assertEqual(compactor.exitcode, 0)
+
+		records = [(writer * self.records_per_writer + number, "W{}".format(writer),
+			DIFFICULTIES[number % len(DIFFICULTIES)])
+			for writer in range(self.writers) for number in range(self.records_per_writer)]
+		# NO RECORD IS LOST OR COUNTED TWICE, BY THE READER OR BY A NEW VIEW
+		for view in (board, leaderboard.Leaderboard(self.path)):
+			view.refresh()
+			self.assert_ranks(view.index, records)
+			self.assertEqual(view.top(leaderboard.TOP_SIZE), brute_top(records, leaderboard.TOP_SIZE))
+
+if __name__ == "__main__":
+	unittest.main()
@@ -0,0 +1,251 @@
+""" Texture Cache
+This script builds the texture cache of the game, and this module reads it. The
+cache is one file holding the images of the game already decoded to RGBA, so
+that loading them at startup does not decode any PNG or JPEG file, which pyglet
+does in pure Python when Pillow is not installed.
+
+The cache file starts with a header and an index of the images it holds, each
+with the size and modification time of its source file, its dimensions, and the
+offset of its pixels in the file. The pixels follow, as rows of RGBA bytes from
+the bottom row up, as pyglet stores them. The game memory-maps the file and
+copies the pixels of an image straight into its texture. An image whose source
+file changed since the cache was built is stale, and is loaded from its source
+file instead. A cache read from the archive of a game bundle is held in memory
+rather than mapped, and is not checked against the source files, which the
+bundle was built from. Building the cache requires 'pyglet' and the 'bundle'
+module, and reading it requires the 'bundle' module only.
+
+This module can be imported and contains the following:
+	* cache_path - path of the texture cache file
+	* asset_names - returns the paths of the images kept in the cache
+	* source_stamp - returns the size and modification time of a source file
+	* write_cache - writes a texture cache file
+	* TextureCache - reads the images of a texture cache file
+	* load - opens the texture cache of the game
+	* decode_source - decodes an image file with pyglet
+	* build - decodes the images of the game into a texture cache file
+
+Usage: python texcache.py [--output FILE]
+"""
+
+import argparse, bundle, io, mmap, os, struct, tilesets
+
+cache_path = "assets/textures.cache"
+
+# THE HEADER HOLDS THE MAGIC NUMBER AND THE NUMBER OF IMAGES. EACH INDEX ENTRY
+# HOLDS THE SOURCE FILE SIZE AND MODIFICATION TIME, THE WIDTH AND HEIGHT, THE
+# OFFSET OF THE PIXELS, AND THE LENGTH OF THE NAME, WHICH FOLLOWS THE ENTRY
+MAGIC = b"O1OTEX01"
+header_format = struct.Struct("<8sI")
+entry_format = struct.Struct("<QqIIQH")
+# PIXELS START ON A MULTIPLE OF THIS, SO EACH IMAGE IS ALIGNED IN THE MAPPING
+ALIGNMENT = 16
+
+def asset_names():
+	""" Returns the paths of the images kept in the cache: the buttons, the
+	game tiles, the title image and the watermarks.
+	"""
+
+	buttons = sorted(name for name in bundle.listdir("assets/buttons") if name.endswith(".png"))
+	return (["assets/buttons/" + name for name in buttons] +
+		["assets/gameimages/" + name + ".png" for name in tilesets.tile_names] +
+		["assets/Ozone.jpg", "assets/watermarks.png"])
+
+def source_stamp(path):
+	""" Returns the size and modification time in nanoseconds of a file. """
+	stat = os.stat(path)
+	return stat.st_size, stat.st_mtime_ns
+
+def write_cache(path, images):
+	""" Writes a texture cache file.
+
+	Parameters
+	----------
+	path : str
+		path of the texture cache file
+	images : list
+		name, width, height and RGBA pixels of each image, where the name is
+		the path of its source file
+	"""
+
+	index = b""
+	names = [name.encode("utf-8") for name, width, height, pixels in images]
+	offset = header_format.size + sum(entry_format.size + len(name) for name in names)
+	offsets = []
+	for name, (_, width, height, pixels) in zip(names, images):
+		offset += -offset % ALIGNMENT
+		offsets.append(offset)
+		offset += len(pixels)
+	for name, offset, (source, width, height, pixels) in zip(names, offsets, images):
+		size, mtime = source_stamp(bundle.path(source))
+		index += entry_format.pack(size, mtime, width, height, offset, len(name)) + name
+	# WRITES TO A TEMPORARY FILE FIRST, SO A RUNNING GAME NEVER MAPS A HALF-WRITTEN CACHE
+	cache_file = open(path + ".tmp", "wb")
+	cache_file.write(header_format.pack(MAGIC, len(images)) + index)
+	for offset, (_, width, height, pixels) in zip(offsets, images):
+		cache_file.write(b"\0" * (offset - cache_file.tell()))
+		cache_file.write(pixels)
+	cache_file.close()
+	os.replace(path + ".tmp", path)
+
+class TextureCache:
+	"""
+	A class used to read the images of a texture cache file, which is memory
+	mapped for as long as the cache is open, or of a texture cache already read
+	into memory.
+
+	...
+
+	Attributes
+	----------
+	path : str
+		path of the texture cache file
+	checked : bool
+		whether or not the images are checked against their source files
+	entries : dict
+		source size, modification time, width, height and pixel offset of each
+		image, by name
+
+	Methods
+	-------
+	get(name)
+		returns the width, height and pixels of an image, or None if the image
+		is not in the cache or is stale
+	close()
+		unmaps the cache file
+	"""
+
+	def __init__(self, path=cache_path, data=None):
+		""" Maps the cache file, or takes the cache data, and reads its index.
+
+		Parameters
+		----------
+		path : str, optional
+			path of the texture cache file
+		data : bytes, optional
+			the whole cache, whose images are then not checked against their
+			source files, instead of the mapped file
+
+		Raises
+		------
+		OSError
+			if the cache file cannot be opened
+		ValueError
+			if the file is not a texture cache of this version
+		"""
+
+		self.path = path
+		self.checked = data is None
+		if data is None:
+			cache_file = open(path, "rb")
+			try:
+				self._map = mmap.mmap(cache_file.fileno(), 0, access=mmap.ACCESS_READ)
+			finally:
+				cache_file.close()
+		else:
+			self._map = data
+		magic, count = header_format.unpack_from(self._map, 0)
+		if magic != MAGIC:
+			self.close()
+			raise ValueError("{} is not a texture cache of this version".format(path))
+		self.entries = {}
+		position = header_format.size
+		for number in range(count):
+			size, mtime, width, height, offset, name_length = entry_format.unpack_from(self._map, position)
+			position += entry_format.size
+			name = self._map[position:position + name_length].decode("utf-8")
+			position += name_length
+			self.entries[name] = (size, mtime, width, height, offset)
+
+	def get(self, name):
+		""" Returns an image of the cache, unless its source file has changed.
+
+		Parameters
+		----------
+		name : str
+			path of the source file of the image
+
+		Returns
+		-------
+		tuple
+			the width, height and RGBA pixels of the image, or None if the
+			image is not in the cache or is stale
+		"""
+
+		entry = self.entries.get(name)
+		if entry is None:
+			return None
+		size, mtime, width, height, offset = entry
+		if self.checked:
+			try:
+				if source_stamp(bundle.path(name)) != (size, mtime):
+					return None
+			except OSError:
+				return None
+		return width, height, self._map[offset:offset + width * height * 4]
+
+	def close(self):
+		if self.checked:
+			self._map.close()
+
+def load():
+	""" Opens the texture cache of the game, from the archive of the bundle if
+	it holds the cache, or else from the cache file.
+
+	Returns
+	-------
+	obj
+		the TextureCache, or None if there is no texture cache
+	"""
+
+	try:
+		if bundle.archive is not None and cache_path in bundle.archive.entries:
+			return TextureCache(cache_path, bundle.archive.read(cache_path))
+		return TextureCache(bundle.path(cache_path))
+	except (OSError, ValueError):
+		return None
+
+def decode_source(name):
+	""" Decodes an image file with pyglet, which is only imported when an image
+	has to be decoded.
+
+	Parameters
+	----------
+	name : str
+		path of the image file relative to the game
+
+	Returns
+	-------
+	tuple
+		the width, height and RGBA pixels of the image, from the bottom row up
+	"""
+
+	import pyglet
+	pyglet.options["shadow_window"] = False
+	import pyglet.image
+
+	image = pyglet.image.load(name, file=io.BytesIO(bundle.read(name))).get_image_data()
+	return image.width, image.height, image.get_data("RGBA", image.width * 4)
+
+def build(path=cache_path):
+	""" Decodes the images of the game with pyglet and writes them to a texture
+	cache file.
+
+	Parameters
+	----------
+	path : str, optional
+		path of the texture cache file
+	"""
+
+	images = [(name,) + decode_source(name) for name in asset_names()]
+	write_cache(path, images)
+	print("{} images written to {} ({} bytes)".format(len(images), path, os.path.getsize(path)))
+
+def main():
+	parser = argparse.ArgumentParser(description="Decode the images of the game into a texture cache.")
+	parser.add_argument("--output", default=bundle.path(cache_path), help="the texture cache file to write")
+	options = parser.parse_args()
+	build(options.output)
+
+if __name__ == "__main__":
+	main()
@@ -3,7 +3,7 @@ Inspired from pyglet documentation examples/text_input.py
 REFERENCE: https://www.github.com/adamlwgriffiths/Pyglet/blob/master/examples/text_input.py
 
 This module contains the classes that create a new window to handle text
-user-input. This module requires 'pyglet' to be installed.
+user-input. This module requires the 'render' module.
 
 This module can be imported and contains the following classes:
     * Rectangle - creates a rectangle background for TextWidget 
@@ -13,13 +13,7 @@ This module can be imported and contains the following classes:
 FIXME : Text input does not handle insertion.
 """
 
-import pyglet
-
-def save_name(file, name):
-    """ Writes a new string on new line """ 
-    name_file = open(file, 'a+')
-    name_file.write(name + "\n")
-    name_file.close()
+import render
 
 class Rectangle:
     """
@@ -35,7 +29,7 @@ class Rectangle:
     """
 
     def __init__(self, x1, y1, x2, y2, batch):
-        self.vertex_list = batch.add(4, pyglet.gl.GL_QUADS, None,
+        self.vertex_list = batch.add(4, render.GL_QUADS, None,
             ('v2i', [x1, y1, x2, y1, x2, y2, x1, y2]),
             ('c4B', [200, 200, 220, 255] * 4)
             )
@@ -58,14 +52,14 @@ class TextWidget:
     """
 
     def __init__(self, text, x, y, width, batch):
-        self.document = pyglet.text.document.UnformattedDocument(text)
+        self.document = render.UnformattedDocument(text)
         self.document.set_style(0, len(self.document.text), dict(color = (0, 0, 0, 255), font_size = 18))
         font = self.document.get_font()
         height = font.ascent - font.descent
 
-        self.layout = pyglet.text.layout.IncrementalTextLayout(
+        self.layout = render.IncrementalTextLayout(
             self.document, width, height, multiline=False, batch=batch)
-        self.caret = pyglet.text.caret.Caret(self.layout)
+        self.caret = render.Caret(self.layout)
 
         self.layout.x = x
         self.layout.y = y
@@ -75,7 +69,7 @@ class TextWidget:
         self.rectangle = Rectangle(x - pad, y - pad, 
                                    x + width + pad, y + height + pad, batch)
 
-class Text_Input(pyglet.window.Window):
+class Text_Input(render.Window):
     """
     A class used to create a separate window for text input.
     
@@ -90,6 +84,12 @@ class Text_Input(pyglet.window.Window):
     width : int
         width of the Rectangle
     batch : class of Batch()
+    difficulty : str
+        difficulty of the game, saved after the name
+    score : int
+        score of the game, saved before the name
+    scoreboard : obj
+        the Leaderboard the record is added to
 
     Methods
     -------
@@ -103,19 +103,27 @@ class Text_Input(pyglet.window.Window):
         sets alphabet letter keys as the only keys to edit string_name
     on_close()
         handles no given input name when this window is closed
+    save()
+        adds the score, name and difficulty to the leaderboard as one record,
+        or shows that the name is invalid
     set_focus()
         sets the caret location
     """
 
-    def __init__(self, *args, **kwargs):
+    def __init__(self, difficulty, score, scoreboard, *args, **kwargs):
         super(Text_Input, self).__init__(400, 140, caption='Name entry')
-        self.batch = pyglet.graphics.Batch()
+        # THE SCORE, NAME AND DIFFICULTY ARE SAVED TOGETHER AS ONE RECORD
+        self.difficulty = difficulty
+        self.score = score
+        # THE LEADERBOARD OF THE GAME IS PASSED IN, SO THAT THE RECORD GOES TO THE FILE THE GAME READS
+        self.scoreboard = scoreboard
+        self.batch = render.LayeredBatch()
         self.labels = [
-            pyglet.text.Label('Type your name:', x = 200, y = 100, anchor_x = 'center', anchor_y = 'center',
+            render.Label('Type your name:', x = 200, y = 100, anchor_x = 'center', anchor_y = 'center',
                               color=(0, 0, 0, 255), batch=self.batch),
-            pyglet.text.Label('**limit character up to 10**', x = 200, y = 25, font_size = 10, anchor_x = 'center', anchor_y = 'bottom',
+            render.Label('**limit character up to 10**', x = 200, y = 25, font_size = 10, anchor_x = 'center', anchor_y = 'bottom',
                               color=(0, 0, 0, 255), batch=self.batch),
-            pyglet.text.Label('*use letters only*', x = 200, y = 10, font_size = 10, anchor_x = 'center', anchor_y = 'bottom',
+            render.Label('*use letters only*', x = 200, y = 10, font_size = 10, anchor_x = 'center', anchor_y = 'bottom',
                               color=(0, 0, 0, 255), batch=self.batch)
                         ]
         self.widgets = [TextWidget('', 110, 60, self.width - 210, self.batch)]
@@ -126,7 +134,7 @@ class Text_Input(pyglet.window.Window):
 
     def on_draw(self):
         """ Draws the background of the Text_input window """
-        pyglet.gl.glClearColor(1,1,1,1)
+        render.set_clear_color(1,1,1,1)
         self.clear()
         self.batch.draw() 
    
@@ -148,7 +156,7 @@ class Text_Input(pyglet.window.Window):
         motion : constant values defined in pyglet.window.key
         """
 
-        if motion != pyglet.window.key.MOTION_BACKSPACE:
+        if motion != render.key.MOTION_BACKSPACE:
             motion = 0 
         else:
             if self.focus: self.focus.caret.on_text_motion(motion)
@@ -166,49 +174,52 @@ class Text_Input(pyglet.window.Window):
             self.string_name = self.string_name[:-1]
                 
         # SAVES THE STRING INPUT BY PRESSING ENTER
-        if symbol == pyglet.window.key.ENTER:
-            save_name('assets/leaderboard.txt',self.string_name.rstrip())
-            pyglet.window.Window.close(self)
+        if symbol == render.key.ENTER:
+            self.save()
 
-        if symbol == pyglet.window.key.ESCAPE: pyglet.app.exit()
+        if symbol == render.key.ESCAPE: render.exit()
         
         # CONCATENATES VALID KEY PRESSES TO STRING_NAME
-        if symbol == pyglet.window.key.A: self.string_name += "A"
-        if symbol == pyglet.window.key.B: self.string_name += "B"
-        if symbol == pyglet.window.key.C: self.string_name += "C"
-        if symbol == pyglet.window.key.D: self.string_name += "D"
-        if symbol == pyglet.window.key.E: self.string_name += "E"
-        if symbol == pyglet.window.key.F: self.string_name += "F"
-        if symbol == pyglet.window.key.G: self.string_name += "G"
-        if symbol == pyglet.window.key.H: self.string_name += "H"
-        if symbol == pyglet.window.key.I: self.string_name += "I"
-        if symbol == pyglet.window.key.J: self.string_name += "J"
-        if symbol == pyglet.window.key.K: self.string_name += "K"
-        if symbol == pyglet.window.key.L: self.string_name += "L"
-        if symbol == pyglet.window.key.M: self.string_name += "M"
-        if symbol == pyglet.window.key.N: self.string_name += "N"
-        if symbol == pyglet.window.key.O: self.string_name += "O"
-        if symbol == pyglet.window.key.P: self.string_name += "P"
-        if symbol == pyglet.window.key.Q: self.string_name += "Q"
-        if symbol == pyglet.window.key.R: self.string_name += "R"
-        if symbol == pyglet.window.key.S: self.string_name += "S"
-        if symbol == pyglet.window.key.T: self.string_name += "T"
-        if symbol == pyglet.window.key.U: self.string_name += "U"
-        if symbol == pyglet.window.key.V: self.string_name += "V"
-        if symbol == pyglet.window.key.W: self.string_name += "W"
-        if symbol == pyglet.window.key.X: self.string_name += "X"
-        if symbol == pyglet.window.key.Y: self.string_name += "Y"
-        if symbol == pyglet.window.key.Z: self.string_name += "Z"
-        if symbol == pyglet.window.key.BACKSPACE: self.string_name = self.string_name[:-1]
+        if symbol == render.key.A: self.string_name += "A"
+        if symbol == render.key.B: self.string_name += "B"
+        if symbol == render.key.C: self.string_name += "C"
+        if symbol == render.key.D: self.string_name += "D"
+        if symbol == render.key.E: self.string_name += "E"
+        if symbol == render.key.F: self.string_name += "F"
+        if symbol == render.key.G: self.string_name += "G"
+        if symbol == render.key.H: self.string_name += "H"
+        if symbol == render.key.I: self.string_name += "I"
+        if symbol == render.key.J: self.string_name += "J"
+        if symbol == render.key.K: self.string_name += "K"
+        if symbol == render.key.L: self.string_name += "L"
+        if symbol == render.key.M: self.string_name += "M"
+        if symbol == render.key.N: self.string_name += "N"
+        if symbol == render.key.O: self.string_name += "O"
+        if symbol == render.key.P: self.string_name += "P"
+        if symbol == render.key.Q: self.string_name += "Q"
+        if symbol == render.key.R: self.string_name += "R"
+        if symbol == render.key.S: self.string_name += "S"
+        if symbol == render.key.T: self.string_name += "T"
+        if symbol == render.key.U: self.string_name += "U"
+        if symbol == render.key.V: self.string_name += "V"
+        if symbol == render.key.W: self.string_name += "W"
+        if symbol == render.key.X: self.string_name += "X"
+        if symbol == render.key.Y: self.string_name += "Y"
+        if symbol == render.key.Z: self.string_name += "Z"
+        if symbol == render.key.BACKSPACE: self.string_name = self.string_name[:-1]
 
     def on_close(self):
         """ Handles no given input name when this window is closed """
+        self.save()
+
+    def save(self):
+        """ Saves the record and closes the window, unless no name was given """
         if self.string_name == "":
-            pyglet.text.Label('*INVALID*', x = 200, y = 120, font_size = 10, anchor_x = 'center', anchor_y = 'bottom',
+            render.Label('*INVALID*', x = 200, y = 120, font_size = 10, anchor_x = 'center', anchor_y = 'bottom',
                               color=(0, 0, 0, 255), batch=self.batch)
         else:
-            save_name('assets/leaderboard.txt',self.string_name.rstrip())
-            pyglet.window.Window.close(self)
+            self.scoreboard.add(self.score, self.string_name.rstrip(), self.difficulty)
+            render.Window.close(self)
     
     
     def set_focus(self, focus):
@@ -0,0 +1,211 @@
+""" Tile Difference Analyzer
+This script measures how hard the odd tile of each pair of tiles is to spot,
+and sorts the pairs into the difficulties of the game. For every pair of tiles
+of a tile set, it composites both tiles over the background of the game board
+and computes two distances over their RGBA pixels with NumPy:
+
+	pixel - mean absolute difference of the red, green and blue values, from
+		0 for the same image to 1
+	perceptual - mean CIE76 color difference in CIELAB, after blurring both
+		tiles with a 4 by 4 box filter, as the player sees the tiles at a
+		glance rather than pixel by pixel
+
+The distances are kept in an index file keyed by the SHA-1 hashes of the two
+tile files, so running the script again only measures the pairs whose tiles
+changed. The common/odd tile pairs of each tile set are then split by
+perceptual distance into thirds: the most different pairs of the set for EASY,
+the least different for HARD. Each tile set is ranked on its own, as some sets
+are more alike than others, so that every set has pairs on every difficulty. The
+'tilesets' module reads these lists when the game starts, and tileset_pick()
+picks a pair of the current difficulty in constant time.
+
+This script requires the 'texcache' and 'tilesets' modules, as well as 'numpy'
+to be installed. The tiles are read from the texture cache when it is fresh,
+and decoded with 'pyglet' otherwise.
+
+This script contains the following functions:
+	* file_hash - returns the SHA-1 hash of a file
+	* load_tile - returns a tile composited over the background of the board
+	* to_lab - converts sRGB colors to CIELAB
+	* distances - measures the pixel and perceptual distances of two tiles
+	* split_difficulties - sorts the common/odd tile pairs into difficulties
+	* main - updates the index and prints the pairs by difficulty
+
+Usage: python tilediff.py [--index FILE]
+"""
+
+import argparse, hashlib, json, os, sys, texcache, tilesets
+
+try:
+	import numpy
+except ImportError:
+	sys.exit("tilediff.py requires 'numpy' to be installed.")
+
+# BACKGROUND OF THE GAME BOARD, THE SAME COLOR AS interface.bgcolor
+BACKGROUND = numpy.array([240, 133, 28], dtype="f8")
+# SIDE OF THE BOX FILTER APPLIED BEFORE MEASURING THE PERCEPTUAL DISTANCE
+BLUR = 4
+DIFFICULTIES = ("EASY", "MEDIUM", "HARD")
+
+def file_hash(path):
+	hash_file = open(path, "rb")
+	digest = hashlib.sha1(hash_file.read()).hexdigest()
+	hash_file.close()
+	return digest
+
+def load_tile(name, cache):
+	""" Returns a tile composited over the background of the game board.
+
+	Parameters
+	----------
+	name : str
+		path of the tile image
+	cache : obj
+		TextureCache to read the tile from, or None to decode it
+
+	Returns
+	-------
+	array
+		the red, green and blue values of the tile, from 0 to 255, as a
+		height by width by 3 array
+	"""
+
+	image = cache.get(name) if cache else None
+	if image is None:
+		image = texcache.decode_source(name)
+	width, height, pixels = image
+	rgba = numpy.frombuffer(pixels, dtype="u1").reshape(height, width, 4).astype("f8")
+	alpha = rgba[..., 3:] / 255
+	return rgba[..., :3] * alpha + BACKGROUND * (1 - alpha)
+
+def to_lab(rgb):
+	""" Converts sRGB colors from 0 to 255 to CIELAB, under the D65 white point.
+
+	Parameters
+	----------
+	rgb : array
+		colors in the last axis of the array
+
+	Returns
+	-------
+	array
+		the L*, a* and b* values of the colors, in the last axis
+	"""
+
+	srgb = rgb / 255
+	linear = numpy.where(srgb <= 0.04045, srgb / 12.92, ((srgb + 0.055) / 1.055) ** 2.4)
+	xyz = linear @ numpy.array([[0.4124, 0.2126, 0.0193],
+		[0.3576, 0.7152, 0.1192],
+		[0.1805, 0.0722, 0.9505]])
+	xyz /= numpy.array([0.95047, 1.0, 1.08883])
+	f = numpy.where(xyz > (6 / 29) ** 3, numpy.cbrt(xyz), xyz / (3 * (6 / 29) ** 2) + 4 / 29)
+	return numpy.stack([116 * f[..., 1] - 16, 500 * (f[..., 0] - f[..., 1]),
+		200 * (f[..., 1] - f[..., 2])], axis=-1)
+
+def _blur(image):
+	height, width = image.shape[0] // BLUR * BLUR, image.shape[1] // BLUR * BLUR
+	return image[:height, :width].reshape(height // BLUR, BLUR, width // BLUR, BLUR, -1).mean(axis=(1, 3))
+
+def distances(first, second):
+	""" Measures the pixel and perceptual distances of two tiles.
+
+	Parameters
+	----------
+	first, second : array
+		the tiles, as returned by load_tile(). Tiles of different sizes are
+		compared over their common part.
+
+	Returns
+	-------
+	dict
+		the pixel and perceptual distances of the tiles
+	"""
+
+	height = min(first.shape[0], second.shape[0])
+	width = min(first.shape[1], second.shape[1])
+	first, second = first[:height, :width], second[:height, :width]
+	pixel = float(numpy.abs(first - second).mean() / 255)
+	delta_e = numpy.sqrt(((to_lab(_blur(first)) - to_lab(_blur(second))) ** 2).sum(axis=-1))
+	return {"pixel": round(pixel, 6), "perceptual": round(float(delta_e.mean()), 4)}
+
+def split_difficulties(pair_distances):
+	""" Sorts the common/odd tile pairs of each tile set into difficulties by
+	their perceptual distance, the most different pairs of the set being the
+	easiest.
+
+	Parameters
+	----------
+	pair_distances : dict
+		distances of each (common, odd) pair of tile names
+
+	Returns
+	-------
+	dict
+		list of [common, odd] tile names of each difficulty
+	"""
+
+	split = {difficulty: [] for difficulty in DIFFICULTIES}
+	for tileset in tilesets.tileset_list:
+		pairs = sorted((pair for pair in pair_distances if pair[0] in tileset),
+			key=lambda pair: -pair_distances[pair]["perceptual"])
+		for number, difficulty in enumerate(DIFFICULTIES):
+			first = number * len(pairs) // len(DIFFICULTIES)
+			last = (number + 1) * len(pairs) // len(DIFFICULTIES)
+			split[difficulty] += [list(pair) for pair in pairs[first:last]]
+	return split
+
+def main():
+	parser = argparse.ArgumentParser(description="Measure how different the tiles of each tile set look, "
+		"and sort the tile pairs into difficulties.")
+	parser.add_argument("--index", default=tilesets.difficulty_index_path, help="the index file to update")
+	options = parser.parse_args()
+
+	index = {"files": {}, "pairs": {}, "difficulties": {}}
+	if os.path.exists(options.index):
+		index_file = open(options.index)
+		index = json.load(index_file)
+		index_file.close()
+	try:
+		cache = texcache.TextureCache()
+	except (OSError, ValueError):
+		cache = None
+
+	paths = {name: tilesets.tile_path(name) for name in tilesets.tile_names}
+	hashes = {name: file_hash(path) for name, path in paths.items()}
+	tiles = {}
+	pairs = {}
+	pair_distances = {}
+	measured = 0
+	for tileset in tilesets.tileset_list:
+		for common in tileset:
+			for odd in tileset:
+				if common == odd:
+					continue
+				# THE DISTANCES ARE SYMMETRIC, SO BOTH ORDERS SHARE ONE KEY
+				key = ":".join(sorted((hashes[common], hashes[odd])))
+				if key not in index["pairs"]:
+					for name in (common, odd):
+						if name not in tiles:
+							tiles[name] = load_tile(paths[name], cache)
+					index["pairs"][key] = distances(tiles[common], tiles[odd])
+					measured += 1
+				pairs[key] = pair_distances[(common, odd)] = index["pairs"][key]
+
+	# PAIRS OF TILES THAT CHANGED SINCE ARE DROPPED
+	index["pairs"] = pairs
+	index["files"] = {paths[name]: hashes[name] for name in tilesets.tile_names}
+	index["difficulties"] = split_difficulties(pair_distances)
+	index_file = open(options.index, "w")
+	json.dump(index, index_file, indent=1, sort_keys=True)
+	index_file.close()
+
+	print("{} pairs measured, {} read from {}".format(measured, len(pair_distances) - measured, options.index))
+	for difficulty in DIFFICULTIES:
+		print(difficulty)
+		for common, odd in index["difficulties"][difficulty]:
+			pair = pair_distances[(common, odd)]
+			print("  {:10} {:10} perceptual {:7.2f}  pixel {:.4f}".format(common, odd,
+				pair["perceptual"], pair["pixel"]))
+
+if __name__ == "__main__":
+	main()
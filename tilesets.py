@@ -0,0 +1,164 @@
+""" Tile Sets
+This module contains the data side of the game board: the sets of game tiles,
+the table of tile IDs built from them, and the function that picks the tiles
+of one board. A board is stored as a compact array of small integer tile IDs
+together with the index of the odd tile, so it is cheap to copy, hash and log.
+This module requires the 'bundle' module, but does not require 'pyglet' to be
+installed.
+
+When the index of the 'tilediff' script exists, the common and odd tiles of a
+board are picked from the tile pairs of the current difficulty within the tile
+set picked for the board: the pairs of the set that look the most different on
+EASY, and the most alike on HARD, so every tile set shows up on every
+difficulty. Pairs whose tile files changed since the index was made are left
+out.
+
+This module can be imported and contains the following:
+	* Constants defining the layout of the game board
+	* Lists of game tile names to be randomly picked per board
+	* tile_names - a table of tile names, indexed by tile ID
+	* tileset_ids - the tile sets as tuples of tile IDs
+	* tileset_of - the tile set of each tile, indexed by tile ID
+	* tile_path - returns the path of the image file of a tile
+	* load_difficulty_pairs - reads the tile pairs of each difficulty
+	* difficulty_pairs - the tile pairs of each difficulty and tile set, as
+		tile IDs
+	* tileset_pick - randomly chooses the tiles of one game board
+"""
+
+import array, bundle, hashlib, json, random
+
+# DIMENSIONS OF THE GAME BOARD
+BOARD_COLUMNS = 6
+BOARD_ROWS = 6
+BOARD_SIZE = BOARD_COLUMNS * BOARD_ROWS
+
+# LISTS OF GAME TILES TO BE RANDOMLY PICKED PER BOARD
+# SOURCE: https://thenounproject.com/nickbluth/collection/pandas/
+Cats = ["cat1", "cat2", "cat3"]
+Dogs = ["dog1", "dog2", "dog3"]
+Octopi = ["octopus1", "octopus2", "octopus3"]
+Raccoons = ["raccoon1", "raccoon2", "raccoon3"]
+# SOURCE: https://thenounproject.com/aomam/collections/
+Pandas = ["panda1", "panda2", "panda3"]
+# LIST OF GAME TILE SETS TO BE RANDOMLY PICKED PER BOARD, AND THEIR NAMES
+tileset_list = [Cats, Dogs, Octopi, Pandas, Raccoons]
+tileset_names = ["Cats", "Dogs", "Octopi", "Pandas", "Raccoons"]
+
+# TABLE OF TILE NAMES. EACH TILE IS REFERRED TO BY ITS INDEX IN THIS TABLE
+tile_names = [name for tileset in tileset_list for name in tileset]
+# THE TILE SETS AS TUPLES OF TILE IDS
+tileset_ids = tuple(tuple(tile_names.index(name) for name in tileset) for tileset in tileset_list)
+# THE TILE SET OF EACH TILE, INDEXED BY TILE ID
+tileset_of = array.array("B", bytes(len(tile_names)))
+for index, tileset in enumerate(tileset_ids):
+	for tile in tileset:
+		tileset_of[tile] = index
+
+# ONE FULL BOARD OF EACH TILE, COPIED OVER THE BOARD WHEN IT IS REFILLED
+_filled_boards = [array.array("B", [tile]) * BOARD_SIZE for tile in range(len(tile_names))]
+
+# THE INDEX OF THE 'tilediff' SCRIPT
+difficulty_index_path = "assets/tilediff.json"
+
+def tile_path(name):
+	return "assets/gameimages/" + name + ".png"
+
+def load_difficulty_pairs(path=difficulty_index_path):
+	""" Reads the common/odd tile pairs of each difficulty from the index of
+	the 'tilediff' script, leaving out the pairs whose tiles have changed.
+
+	Parameters
+	----------
+	path : str, optional
+		path of the index
+
+	Returns
+	-------
+	dict
+		tuple of the (common, odd) tile ID pairs of each tile set, indexed
+		like tileset_ids, of each difficulty, which is empty if there is no
+		index
+	"""
+
+	try:
+		index = json.loads(bundle.read(path).decode("utf-8"))
+	except OSError:
+		return {}
+	fresh = set()
+	for name in tile_names:
+		try:
+			tile_data = bundle.read(tile_path(name))
+		except OSError:
+			continue
+		if hashlib.sha1(tile_data).hexdigest() == index["files"].get(tile_path(name)):
+			fresh.add(name)
+	pairs = {}
+	for difficulty, names in index["difficulties"].items():
+		ids = [[] for tileset in tileset_ids]
+		for common, odd in names:
+			if common in fresh and odd in fresh:
+				common, odd = tile_names.index(common), tile_names.index(odd)
+				ids[tileset_of[common]].append((common, odd))
+		if any(ids):
+			pairs[difficulty] = tuple(tuple(tileset_pairs) for tileset_pairs in ids)
+	return pairs
+
+# THE TILE PAIRS OF EACH DIFFICULTY, READ ONCE WHEN THE GAME STARTS
+difficulty_pairs = load_difficulty_pairs()
+
+def new_board(size=BOARD_SIZE):
+	""" Returns an empty board array of a number of tiles, to be filled by
+	tileset_pick().
+	"""
+
+	return array.array("B", bytes(size))
+
+def tileset_pick(tileset_ids, random_tiles=None, difficulty=None):
+	""" This function randomly chooses a set of game tiles for one game screen.
+
+	A set of 3 tiles is randomly picked from a set of 5 tile sets. Then, 2 out
+	of these 3 tiles are randomly picked to be the (a) common tile and then the
+	(b) odd tile, respectively. The tile sets themselves are never modified.
+	If the difficulty has tile pairs of the picked set in difficulty_pairs,
+	one of those pairs is picked instead.
+
+	Parameters
+	----------
+	tileset_ids : tuple
+		a tuple of tile sets, each a tuple of tile IDs, from which 1 set will
+		be picked
+	random_tiles : array, optional
+		a board array from a previous call to be refilled in place, of any
+		number of tiles. A new array of BOARD_SIZE tiles is made if it is not
+		given.
+	difficulty : str, optional
+		the difficulty of the game
+
+	Returns
+	-------
+	random_tiles : array
+		an array of the tile IDs used to create the game board
+	odd_index : int
+		the position of the odd tile in random_tiles
+	"""
+
+	if random_tiles is None:
+		random_tiles = new_board()
+	tileset = random.choice(tileset_ids)
+	pairs = difficulty_pairs.get(difficulty)
+	if pairs:
+		pairs = pairs[tileset_of[tileset[0]]]
+	if pairs:
+		default_tile, odd = random.choice(pairs)
+	else:
+		# THE COMMON TILE AND THE ODD TILE ARE NEVER THE SAME TILE
+		default_tile, odd = random.sample(tileset, 2)
+	size = len(random_tiles)
+	if size == BOARD_SIZE:
+		random_tiles[:] = _filled_boards[default_tile]
+	else:
+		random_tiles[:] = array.array("B", [default_tile]) * size
+	odd_index = random.randrange(size)
+	random_tiles[odd_index] = odd
+	return random_tiles, odd_index
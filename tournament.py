@@ -0,0 +1,329 @@
+""" Tournament Simulator
+This script simulates very many games, without pyglet, to tune the time limit
+of each difficulty and the mix of tile sets. Each simulated game runs the rules
+of the game: a board is picked by tilesets.tileset_pick() for the difficulty,
+the player finds its odd tile after a reaction time, scores a point and gets a
+new board, until the time limit runs out. The reaction times are sampled from
+the rounds of real games exported to the telemetry file of the game, for the
+difficulty and tile set of each board when there are enough such rounds, or
+else drawn from a log-normal distribution. Rounds faster than a person can
+react are left out, and no reaction time is shorter than that.
+
+The games are run in batches on a pool of processes, one per core by default.
+Each batch seeds the random number generator of its process from the seed of
+the simulation and the number of the batch, so the results only depend on the
+seed and the batch size, and not on how many processes run the batches or in
+which order they finish. A batch only sends back the count of each score, so
+the simulation scales with the number of cores. The score distribution of
+every difficulty and time limit is then printed, and can be written to a JSON
+file. This script requires the 'bundle' and 'tilesets' modules, but does not
+require 'pyglet' to be installed.
+
+This script contains the following:
+	* time_limits - the time limit of each difficulty in the game, in seconds
+	* MIN_REACTION - the shortest reaction time of a player, in seconds
+	* ReactionModel - samples the reaction times of the simulated players
+	* simulate_batch - simulates a batch of games in a worker process
+	* percentile - returns a percentile of a score distribution
+	* simulate - runs the simulation on a pool of processes
+	* main - parses the command line and prints the score distributions
+
+Usage: python tournament.py [--games N] [--workers N] [--seed SEED]
+	[--limit MODE=SECONDS[,SECONDS...]] [--tilesets NAME[,NAME...]]
+	[--telemetry FILE] [--median SECONDS] [--sigma SIGMA] [--output FILE]
+"""
+
+import argparse, bisect, csv, json, math, multiprocessing, os, random, time, bundle, tilesets
+
+# THE TIME LIMITS OF interface.easytime, interface.mediumtime AND interface.hardtime
+time_limits = {"EASY": 90, "MEDIUM": 60, "HARD": 30}
+
+# NO PERSON FINDS THE ODD TILE OF A BOARD FASTER THAN THIS
+MIN_REACTION = 0.2
+
+class ReactionModel:
+	"""
+	A class used to sample the reaction times of the simulated players, from
+	the rounds of real games or from a log-normal distribution.
+
+	...
+
+	Attributes
+	----------
+	samples : dict
+		reaction times in seconds of the real rounds, by difficulty and tile
+		set index, by difficulty with a tile set of None, and of every round
+		by (None, None)
+	min_samples : int
+		fewest real rounds to sample from for a difficulty or tile set
+	median : float
+		median of the log-normal reaction times, in seconds
+	sigma : float
+		standard deviation of the logarithm of the log-normal reaction times
+
+	Methods
+	-------
+	load_telemetry(path)
+		reads the rounds of the telemetry file of the game
+	sample(mode, tileset)
+		returns one reaction time
+	"""
+
+	__slots__ = ("samples", "min_samples", "median", "sigma")
+
+	def __init__(self, median=1.5, sigma=0.5, min_samples=30):
+		self.samples = {}
+		self.min_samples = min_samples
+		self.median = median
+		self.sigma = sigma
+
+	def load_telemetry(self, path):
+		""" Reads the rounds of the telemetry file of the game, with the reaction
+		time, difficulty and tile set of each, leaving out the rounds faster
+		than MIN_REACTION, which were not played by a person.
+
+		Parameters
+		----------
+		path : str
+			path of the telemetry CSV file
+
+		Returns
+		-------
+		int
+			number of rounds read
+		"""
+
+		telemetry_file = open(path, newline="")
+		try:
+			rounds = 0
+			for row in csv.DictReader(telemetry_file):
+				seconds = float(row["reaction_ms"]) / 1000
+				if seconds < MIN_REACTION or row["tileset"] not in tilesets.tileset_names:
+					continue
+				tileset = tilesets.tileset_names.index(row["tileset"])
+				for key in ((row["mode"], tileset), (row["mode"], None), (None, None)):
+					self.samples.setdefault(key, []).append(seconds)
+				rounds += 1
+			return rounds
+		finally:
+			telemetry_file.close()
+
+	def sample(self, mode, tileset):
+		""" Returns the reaction time of a player finding the odd tile of a
+		board, sampled from the real rounds of the same difficulty and tile set,
+		or of the same difficulty, or of any game, whichever is the first with
+		enough rounds, or else drawn from the log-normal distribution and
+		raised to MIN_REACTION if it is shorter.
+
+		Parameters
+		----------
+		mode : str
+			difficulty of the game
+		tileset : int
+			index of the tile set of the board
+
+		Returns
+		-------
+		float
+			the reaction time, in seconds
+		"""
+
+		for key in ((mode, tileset), (mode, None), (None, None)):
+			samples = self.samples.get(key)
+			if samples and len(samples) >= self.min_samples:
+				return random.choice(samples)
+		return max(MIN_REACTION, random.lognormvariate(math.log(self.median), self.sigma))
+
+# THE MODEL AND TILE SETS OF THE WORKER PROCESS, SET ONCE WHEN THE PROCESS STARTS
+_model = None
+_tileset_ids = ()
+
+def _start_worker(model, tileset_ids):
+	global _model, _tileset_ids
+	_model = model
+	_tileset_ids = tileset_ids
+
+def simulate_batch(task):
+	""" Simulates a batch of games of one difficulty and time limit, in a
+	worker process.
+
+	Parameters
+	----------
+	task : tuple
+		the seed of the simulation, the number of the batch, the difficulty,
+		the time limit in seconds, and the number of games
+
+	Returns
+	-------
+	tuple
+		the difficulty, the time limit, and the number of games that ended
+		with each score, by score
+	"""
+
+	seed, batch, mode, limit, games = task
+	random.seed(seed * 1000003 + batch)
+	tileset_ids = _tileset_ids
+	tileset_of = tilesets.tileset_of
+	board = tilesets.new_board()
+	sample = _model.sample
+	scores = {}
+	for game in range(games):
+		elapsed = 0.0
+		score = 0
+		while True:
+			board, odd_index = tilesets.tileset_pick(tileset_ids, board, mode)
+			elapsed += sample(mode, tileset_of[board[odd_index]])
+			if elapsed > limit:
+				break
+			score += 1
+		scores[score] = scores.get(score, 0) + 1
+	return mode, limit, scores
+
+def percentile(scores, fraction):
+	""" Returns a percentile of a score distribution.
+
+	Parameters
+	----------
+	scores : dict
+		number of games that ended with each score, by score
+	fraction : float
+		the percentile, from 0 to 1
+
+	Returns
+	-------
+	int
+		the lowest score that at least that fraction of the games reached
+	"""
+
+	values = sorted(scores)
+	cumulative = []
+	total = 0
+	for value in values:
+		total += scores[value]
+		cumulative.append(total)
+	return values[min(len(values) - 1, bisect.bisect_left(cumulative, fraction * total))]
+
+def simulate(model, limits, games, tileset_ids, seed, workers=None, batch_size=2000):
+	""" Runs the simulation on a pool of processes.
+
+	Parameters
+	----------
+	model : obj
+		the ReactionModel of the players
+	limits : list
+		difficulty and time limit in seconds of each simulation
+	games : int
+		number of games to simulate for each difficulty and time limit
+	tileset_ids : tuple
+		the tile sets the boards are picked from
+	seed : int
+		seed of the simulation
+	workers : int, optional
+		number of processes, one per core by default
+	batch_size : int, optional
+		number of games simulated in one batch
+
+	Returns
+	-------
+	dict
+		number of games that ended with each score, by difficulty and time limit
+	"""
+
+	tasks = []
+	for mode, limit in limits:
+		for first in range(0, games, batch_size):
+			tasks.append((seed, len(tasks), mode, limit, min(batch_size, games - first)))
+	results = {(mode, limit): {} for mode, limit in limits}
+	pool = multiprocessing.Pool(workers or os.cpu_count() or 1, _start_worker, (model, tileset_ids))
+	try:
+		for mode, limit, scores in pool.imap_unordered(simulate_batch, tasks):
+			totals = results[(mode, limit)]
+			for score, count in scores.items():
+				totals[score] = totals.get(score, 0) + count
+	finally:
+		pool.close()
+		pool.join()
+	return results
+
+def _positive(text):
+	value = int(text)
+	if value < 1:
+		raise argparse.ArgumentTypeError("expected a positive number, got {}".format(text))
+	return value
+
+def _limit(text):
+	mode, _, seconds = text.partition("=")
+	mode = mode.upper()
+	if mode not in time_limits or not seconds:
+		raise argparse.ArgumentTypeError("expected MODE=SECONDS[,SECONDS...] with a mode of {}".format(
+			", ".join(time_limits)))
+	return [(mode, float(value)) for value in seconds.split(",")]
+
+def main():
+	parser = argparse.ArgumentParser(description="Simulate games to tune the time limits and tile sets.")
+	parser.add_argument("--games", type=_positive, default=100000,
+		help="games simulated for each difficulty and time limit (default: %(default)s)")
+	parser.add_argument("--workers", type=_positive, help="worker processes (default: one per core)")
+	parser.add_argument("--seed", type=int, default=0, help="seed of the simulation (default: %(default)s)")
+	parser.add_argument("--batch", type=_positive, default=2000, help="games simulated in one batch (default: %(default)s)")
+	parser.add_argument("--limit", type=_limit, action="append", metavar="MODE=SECONDS[,SECONDS...]",
+		help="time limits to simulate for a difficulty, instead of its limit in the game")
+	parser.add_argument("--tilesets", metavar="NAME[,NAME...]",
+		help="the tile sets boards are picked from (default: all of them)")
+	parser.add_argument("--telemetry", default=bundle.path("assets/telemetry.csv"),
+		help="the telemetry file of real games to sample reaction times from")
+	parser.add_argument("--median", type=float, default=1.5,
+		help="median reaction time in seconds without enough real rounds (default: %(default)s)")
+	parser.add_argument("--sigma", type=float, default=0.5,
+		help="spread of the log-normal reaction times (default: %(default)s)")
+	parser.add_argument("--output", help="a JSON file to write the score distributions to")
+	options = parser.parse_args()
+
+	tileset_ids = tilesets.tileset_ids
+	if options.tilesets:
+		names = options.tilesets.split(",")
+		unknown = [name for name in names if name not in tilesets.tileset_names]
+		if unknown:
+			parser.error("unknown tile sets {}, expected some of {}".format(", ".join(unknown),
+				", ".join(tilesets.tileset_names)))
+		tileset_ids = tuple(tilesets.tileset_ids[tilesets.tileset_names.index(name)] for name in names)
+	limits = dict((mode, [(mode, limit)]) for mode, limit in time_limits.items())
+	for mode_limits in options.limit or []:
+		limits[mode_limits[0][0]] = mode_limits
+	limits = [limit for mode in time_limits for limit in limits[mode]]
+
+	model = ReactionModel(options.median, options.sigma)
+	try:
+		rounds = model.load_telemetry(options.telemetry)
+		print("{} rounds of real games read from {}".format(rounds, options.telemetry))
+	except OSError:
+		print("No telemetry at {}, using log-normal reaction times".format(options.telemetry))
+
+	start = time.perf_counter()
+	results = simulate(model, limits, options.games, tileset_ids, options.seed, options.workers,
+		options.batch)
+	elapsed = time.perf_counter() - start
+	total = options.games * len(limits)
+	print("{} games simulated in {:.2f}s ({:.0f} games/s)".format(total, elapsed,
+		total / elapsed if elapsed else 0))
+
+	print("{:<8}{:>8}{:>10}{:>8}{:>8}{:>6}{:>6}{:>6}{:>6}{:>6}{:>6}".format("MODE", "LIMIT", "GAMES",
+		"MEAN", "STDEV", "P5", "P25", "P50", "P75", "P95", "MAX"))
+	for mode, limit in limits:
+		scores = results[(mode, limit)]
+		games = sum(scores.values())
+		mean = sum(score * count for score, count in scores.items()) / games
+		variance = sum((score - mean) ** 2 * count for score, count in scores.items()) / games
+		print("{:<8}{:>7g}s{:>10}{:>8.2f}{:>8.2f}{:>6}{:>6}{:>6}{:>6}{:>6}{:>6}".format(mode, limit, games,
+			mean, math.sqrt(variance), *[percentile(scores, fraction)
+			for fraction in (0.05, 0.25, 0.5, 0.75, 0.95)], max(scores)))
+
+	if options.output:
+		output_file = open(options.output, "w")
+		json.dump([{"mode": mode, "limit": limit, "scores": {str(score): count for score, count
+			in sorted(results[(mode, limit)].items())}} for mode, limit in limits], output_file, indent=1)
+		output_file.close()
+		print("Score distributions written to {}".format(options.output))
+
+if __name__ == "__main__":
+	main()